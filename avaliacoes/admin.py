@@ -1,7 +1,7 @@
 # reune_app/avaliacoes/admin.py
 
 from django.contrib import admin
-from .models import CicloAvaliacao, Competencia, RespostaAvaliacao
+from .models import CicloAvaliacao, Competencia, RespostaAvaliacao, ResumoAvaliacao
 
 @admin.register(CicloAvaliacao)
 class CicloAvaliacaoAdmin(admin.ModelAdmin):
@@ -37,4 +37,20 @@ class RespostaAvaliacaoAdmin(admin.ModelAdmin):
 
     @admin.display(description='Avaliador', ordering='avaliador__first_name')
     def get_avaliador_name(self, obj):
-        return obj.avaliador.get_full_name() or obj.avaliador.username
\ No newline at end of file
+        return obj.avaliador.get_full_name() or obj.avaliador.username
+
+@admin.register(ResumoAvaliacao)
+class ResumoAvaliacaoAdmin(admin.ModelAdmin):
+    """
+    Configuração do painel Admin para o Resumo de Avaliações (apenas leitura).
+    Para recalcular use: python manage.py reconstruir_resumo_avaliacoes
+    """
+    list_display = ('avaliado', 'competencia', 'ciclo', 'quantidade', 'soma_notas', 'media_notas')
+    list_filter = ('ciclo', 'competencia')
+    list_select_related = ('avaliado', 'competencia', 'ciclo')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
\ No newline at end of file
@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class AvaliacoesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'avaliacoes'
\ No newline at end of file
+    name = 'avaliacoes'
+
+    def ready(self):
+        # Registra os signals que mantêm o ResumoAvaliacao atualizado
+        from . import signals  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,17 @@
+# reune_app/avaliacoes/management/commands/reconstruir_resumo_avaliacoes.py
+
+from django.core.management.base import BaseCommand
+
+from avaliacoes.resumo import reconstruir_resumo
+
+
+class Command(BaseCommand):
+    help = "Recalcula do zero a tabela ResumoAvaliacao a partir das respostas de avaliação."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ciclo', type=int, help="Reconstrói apenas o ciclo com este ID.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Tamanho dos lotes de INSERT.")
+
+    def handle(self, *args, **options):
+        total = reconstruir_resumo(ciclo_id=options['ciclo'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{total} linhas de resumo gravadas."))
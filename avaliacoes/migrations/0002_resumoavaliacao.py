@@ -0,0 +1,49 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def popular_resumo(apps, schema_editor):
+    # Preenche o resumo com as respostas que já existem no banco
+    RespostaAvaliacao = apps.get_model('avaliacoes', 'RespostaAvaliacao')
+    ResumoAvaliacao = apps.get_model('avaliacoes', 'ResumoAvaliacao')
+    agrupado = (
+        RespostaAvaliacao.objects.order_by()
+        .values('ciclo_id', 'avaliado_id', 'competencia_id')
+        .annotate(quantidade=Count('id'), soma_notas=Sum('nota'))
+    )
+    ResumoAvaliacao.objects.bulk_create(
+        (ResumoAvaliacao(**linha) for linha in agrupado.iterator(chunk_size=1000)),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avaliacoes', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoAvaliacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantidade', models.PositiveIntegerField(default=0, verbose_name='Quantidade de Respostas')),
+                ('soma_notas', models.PositiveIntegerField(default=0, verbose_name='Soma das Notas')),
+                ('avaliado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumos_avaliacao', to=settings.AUTH_USER_MODEL, verbose_name='Avaliado')),
+                ('ciclo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='avaliacoes.cicloavaliacao', verbose_name='Ciclo')),
+                ('competencia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='avaliacoes.competencia', verbose_name='Competência')),
+            ],
+            options={
+                'verbose_name': 'Resumo de Avaliação',
+                'verbose_name_plural': 'Resumos de Avaliação',
+                'unique_together': {('ciclo', 'avaliado', 'competencia')},
+            },
+        ),
+        migrations.RunPython(popular_resumo, migrations.RunPython.noop),
+    ]
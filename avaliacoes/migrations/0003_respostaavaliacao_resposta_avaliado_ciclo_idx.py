@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avaliacoes', '0002_resumoavaliacao'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='respostaavaliacao',
+            index=models.Index(fields=['avaliado', 'ciclo'], name='resposta_avaliado_ciclo_idx'),
+        ),
+    ]
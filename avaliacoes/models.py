@@ -56,6 +56,41 @@ class RespostaAvaliacao(models.Model):
         verbose_name_plural = "Respostas de Avaliação"
         # Garante que um avaliador só pode avaliar uma competência de um avaliado uma vez por ciclo
         unique_together = ('ciclo', 'avaliado', 'avaliador', 'competencia')
+        indexes = [
+            # Relatório de avaliação de um colaborador: filter(avaliado=, ciclo=).
+            # O índice do unique_together começa pelo ciclo e serve o relatório coletivo
+            models.Index(fields=['avaliado', 'ciclo'], name='resposta_avaliado_ciclo_idx'),
+        ]
 
     def __str__(self):
-        return f"Avaliação de {self.avaliado} por {self.avaliador} - {self.competencia.nome}"
\ No newline at end of file
+        return f"Avaliação de {self.avaliado} por {self.avaliador} - {self.competencia.nome}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Guarda os valores carregados do banco para que os signals saibam
+        # qual era a nota/chave antiga quando a resposta for editada
+        instance = super().from_db(db, field_names, values)
+        instance._valores_originais = dict(zip(field_names, values))
+        return instance
+
+# Resumo (contagem e soma das notas) por ciclo, avaliado e competência.
+# Mantido de forma incremental pelos signals de RespostaAvaliacao, para que o
+# relatório de avaliação não precise agrupar todas as respostas a cada chamada.
+class ResumoAvaliacao(models.Model):
+    ciclo = models.ForeignKey(CicloAvaliacao, on_delete=models.CASCADE, verbose_name="Ciclo")
+    avaliado = models.ForeignKey(User, on_delete=models.CASCADE, related_name='resumos_avaliacao', verbose_name="Avaliado")
+    competencia = models.ForeignKey(Competencia, on_delete=models.CASCADE, verbose_name="Competência")
+    quantidade = models.PositiveIntegerField(default=0, verbose_name="Quantidade de Respostas")
+    soma_notas = models.PositiveIntegerField(default=0, verbose_name="Soma das Notas")
+
+    class Meta:
+        verbose_name = "Resumo de Avaliação"
+        verbose_name_plural = "Resumos de Avaliação"
+        unique_together = ('ciclo', 'avaliado', 'competencia')
+
+    def __str__(self):
+        return f"Resumo de {self.avaliado} - {self.competencia} ({self.ciclo})"
+
+    @property
+    def media_notas(self):
+        return self.soma_notas / self.quantidade if self.quantidade else None
\ No newline at end of file
@@ -0,0 +1,103 @@
+# reune_app/avaliacoes/resumo.py
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import RespostaAvaliacao, ResumoAvaliacao
+
+
+def aplicar_deltas(deltas):
+    """
+    Aplica variações de contagem/soma na tabela de resumo.
+    `deltas` é um dicionário {(ciclo_id, avaliado_id, competencia_id): (delta_quantidade, delta_soma)}.
+
+    Cada chave vira um UPDATE com F() (atômico mesmo com gravações concorrentes).
+    A linha só é criada quando a variação é positiva: remoções nunca recriam um
+    resumo que já foi apagado junto com o ciclo, o usuário ou a competência.
+    """
+    for (ciclo_id, avaliado_id, competencia_id), (delta_quantidade, delta_soma) in deltas.items():
+        if not delta_quantidade and not delta_soma:
+            continue
+        filtro = ResumoAvaliacao.objects.filter(
+            ciclo_id=ciclo_id, avaliado_id=avaliado_id, competencia_id=competencia_id
+        )
+        atualizados = filtro.update(
+            quantidade=F('quantidade') + delta_quantidade,
+            soma_notas=F('soma_notas') + delta_soma,
+        )
+        if atualizados or delta_quantidade <= 0:
+            continue
+        try:
+            with transaction.atomic():
+                ResumoAvaliacao.objects.create(
+                    ciclo_id=ciclo_id, avaliado_id=avaliado_id, competencia_id=competencia_id,
+                    quantidade=delta_quantidade, soma_notas=delta_soma,
+                )
+        except IntegrityError:
+            # Outra requisição criou a linha no meio do caminho: basta somar
+            filtro.update(
+                quantidade=F('quantidade') + delta_quantidade,
+                soma_notas=F('soma_notas') + delta_soma,
+            )
+
+
+def travar_resumos(ciclo_id, chaves):
+    """
+    Cria (zeradas) as linhas de resumo que faltam para as chaves
+    {(avaliado_id, competencia_id)} do ciclo e trava todas com SELECT ... FOR
+    UPDATE até o fim da transação. Chamado antes de ler as respostas que já
+    existem: dois envios concorrentes do mesmo formulário esperam um pelo
+    outro, em vez de calcular os mesmos deltas e contar as notas duas vezes.
+    """
+    ResumoAvaliacao.objects.bulk_create(
+        [
+            ResumoAvaliacao(ciclo_id=ciclo_id, avaliado_id=avaliado_id, competencia_id=competencia_id)
+            for avaliado_id, competencia_id in chaves
+        ],
+        ignore_conflicts=True,
+    )
+    # Sempre na ordem da pk, para que dois lotes não se travem mutuamente
+    list(
+        ResumoAvaliacao.objects.select_for_update()
+        .filter(
+            ciclo_id=ciclo_id,
+            avaliado_id__in={avaliado_id for avaliado_id, _ in chaves},
+            competencia_id__in={competencia_id for _, competencia_id in chaves},
+        )
+        .order_by('pk')
+        .values_list('pk', flat=True)
+    )
+
+
+def somar_delta(deltas, chave, delta_quantidade, delta_soma):
+    """
+    Acumula uma variação no dicionário de deltas (usado pelos envios em lote).
+    """
+    quantidade, soma = deltas.get(chave, (0, 0))
+    deltas[chave] = (quantidade + delta_quantidade, soma + delta_soma)
+
+
+def reconstruir_resumo(ciclo_id=None, batch_size=1000):
+    """
+    Apaga e recalcula a tabela de resumo a partir de RespostaAvaliacao.
+    Retorna o número de linhas de resumo gravadas.
+    """
+    respostas = RespostaAvaliacao.objects.all()
+    resumos = ResumoAvaliacao.objects.all()
+    if ciclo_id is not None:
+        respostas = respostas.filter(ciclo_id=ciclo_id)
+        resumos = resumos.filter(ciclo_id=ciclo_id)
+
+    agrupado = (
+        respostas.order_by()
+        .values('ciclo_id', 'avaliado_id', 'competencia_id')
+        .annotate(quantidade=Count('id'), soma_notas=Sum('nota'))
+    )
+
+    with transaction.atomic():
+        resumos.delete()
+        novos = ResumoAvaliacao.objects.bulk_create(
+            (ResumoAvaliacao(**linha) for linha in agrupado.iterator(chunk_size=batch_size)),
+            batch_size=batch_size,
+        )
+    return len(novos)
@@ -5,18 +5,19 @@ from .models import CicloAvaliacao, Competencia, RespostaAvaliacao
 
 # Reutilizando o serializer de Usuário que já criamos
 from usuarios.serializers import UserSerializer
+from reune.serializers import DynamicFieldsMixin
 
-class CicloAvaliacaoSerializer(serializers.ModelSerializer):
+class CicloAvaliacaoSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = CicloAvaliacao
         fields = ['id', 'titulo', 'data_inicio', 'data_fim', 'status']
 
-class CompetenciaSerializer(serializers.ModelSerializer):
+class CompetenciaSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Competencia
         fields = ['id', 'nome', 'descricao']
 
-class RespostaAvaliacaoSerializer(serializers.ModelSerializer):
+class RespostaAvaliacaoSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # Usando serializers aninhados para uma resposta mais completa e informativa
     avaliado = UserSerializer(read_only=True)
     avaliador = UserSerializer(read_only=True)
@@ -34,4 +35,28 @@ class RespostaAvaliacaoSerializer(serializers.ModelSerializer):
             'nota',
             'justificativa',
             'data_resposta'
-        ]
\ No newline at end of file
+        ]
+
+class ItemRespostaLoteSerializer(serializers.Serializer):
+    """
+    Uma linha do formulário de avaliação enviado em lote.
+    """
+    avaliado = serializers.IntegerField()
+    competencia = serializers.IntegerField()
+    nota = serializers.IntegerField(min_value=1, max_value=5)
+    justificativa = serializers.CharField(required=False, allow_blank=True, allow_null=True, default='')
+
+class RespostaAvaliacaoLoteSerializer(serializers.Serializer):
+    """
+    O formulário inteiro de uma avaliação: um ciclo e todas as respostas dele.
+    """
+    ciclo = serializers.IntegerField()
+    respostas = ItemRespostaLoteSerializer(many=True, allow_empty=False)
+
+    def validate_respostas(self, respostas):
+        chaves = [(item['avaliado'], item['competencia']) for item in respostas]
+        if len(chaves) != len(set(chaves)):
+            raise serializers.ValidationError(
+                "Cada par (avaliado, competência) só pode aparecer uma vez no lote."
+            )
+        return respostas
\ No newline at end of file
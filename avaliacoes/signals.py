@@ -0,0 +1,66 @@
+# reune_app/avaliacoes/signals.py
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from reune.cache import versionar_modelos
+from .models import CicloAvaliacao, Competencia, RespostaAvaliacao
+from .resumo import aplicar_deltas, somar_delta
+
+# Versões usadas pelo cache de respostas e pelos ETags (ver reune/cache.py)
+versionar_modelos(CicloAvaliacao, Competencia, RespostaAvaliacao)
+
+
+CAMPOS_RESUMO = ('ciclo_id', 'avaliado_id', 'competencia_id', 'nota')
+
+
+def _chave(ciclo_id, avaliado_id, competencia_id):
+    return (ciclo_id, avaliado_id, competencia_id)
+
+
+def _valores_atuais(instance):
+    return {campo: getattr(instance, campo) for campo in CAMPOS_RESUMO}
+
+
+@receiver(pre_save, sender=RespostaAvaliacao)
+def carregar_valores_originais(sender, instance, raw=False, **kwargs):
+    # Uma instância que não veio do banco (ex: montada com a pk, ou gravada por
+    # bulk_create) não tem os valores antigos: sem eles, a edição contaria duas vezes
+    if raw or instance.pk is None or getattr(instance, '_valores_originais', None):
+        return
+    instance._valores_originais = (
+        RespostaAvaliacao.objects.filter(pk=instance.pk).values(*CAMPOS_RESUMO).first() or {}
+    )
+
+
+@receiver(post_save, sender=RespostaAvaliacao)
+def atualizar_resumo_ao_salvar(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    deltas = {}
+    originais = getattr(instance, '_valores_originais', None) or {}
+    if not created and all(campo in originais for campo in CAMPOS_RESUMO):
+        # Edição: remove a contribuição antiga antes de somar a nova
+        somar_delta(
+            deltas,
+            _chave(originais['ciclo_id'], originais['avaliado_id'], originais['competencia_id']),
+            -1, -originais['nota'],
+        )
+    somar_delta(
+        deltas,
+        _chave(instance.ciclo_id, instance.avaliado_id, instance.competencia_id),
+        1, instance.nota,
+    )
+    aplicar_deltas(deltas)
+    instance._valores_originais = _valores_atuais(instance)
+
+
+@receiver(post_delete, sender=RespostaAvaliacao)
+def atualizar_resumo_ao_apagar(sender, instance, **kwargs):
+    originais = getattr(instance, '_valores_originais', None) or {}
+    if not all(campo in originais for campo in CAMPOS_RESUMO):
+        originais = _valores_atuais(instance)
+    aplicar_deltas({
+        _chave(originais['ciclo_id'], originais['avaliado_id'], originais['competencia_id']):
+            (-1, -originais['nota']),
+    })
@@ -0,0 +1,196 @@
+# reune_app/avaliacoes/tests.py
+
+import io
+import unittest
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from .models import CicloAvaliacao, Competencia, RespostaAvaliacao, ResumoAvaliacao
+
+URL_LOTE = '/api/avaliacoes/respostas/lote/'
+
+
+class RespostaAvaliacaoLoteTests(APITestCase):
+    """
+    POST /api/avaliacoes/respostas/lote/ nos dois caminhos do upsert: o
+    bulk_create(update_conflicts=True) e o bulk_create + bulk_update dos bancos
+    sem ON CONFLICT (SQL Server), com o resumo atualizado pelos deltas.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.avaliador = User.objects.create(username='avaliador')
+        cls.avaliado = User.objects.create(username='avaliado')
+        cls.ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+        cls.comunicacao = Competencia.objects.create(nome='Comunicação', descricao='-')
+        cls.lideranca = Competencia.objects.create(nome='Liderança', descricao='-')
+
+    def setUp(self):
+        self.client.force_authenticate(self.avaliador)
+
+    def enviar(self, *respostas):
+        response = self.client.post(URL_LOTE, {
+            'ciclo': self.ciclo.pk,
+            'respostas': [
+                {'avaliado': self.avaliado.pk, 'competencia': competencia.pk, 'nota': nota, 'justificativa': f'nota {nota}'}
+                for competencia, nota in respostas
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        return [resultado['status'] for resultado in response.data['resultados']]
+
+    def resumo(self, competencia):
+        linha = ResumoAvaliacao.objects.get(ciclo=self.ciclo, avaliado=self.avaliado, competencia=competencia)
+        return linha.quantidade, linha.soma_notas
+
+    def verificar_upsert(self):
+        # Outro avaliador já respondeu a mesma competência: entra no resumo junto
+        outro = User.objects.create(username='outro')
+        RespostaAvaliacao.objects.create(
+            ciclo=self.ciclo, avaliado=self.avaliado, avaliador=outro, competencia=self.comunicacao, nota=2
+        )
+
+        self.assertEqual(self.enviar((self.comunicacao, 3), (self.lideranca, 5)), ['criada', 'criada'])
+        self.assertEqual(self.resumo(self.comunicacao), (2, 5))
+        self.assertEqual(self.resumo(self.lideranca), (1, 5))
+
+        # O mesmo (avaliador, avaliado, competência) com outra nota atualiza a resposta
+        self.assertEqual(self.enviar((self.comunicacao, 4), (self.lideranca, 5)), ['atualizada', 'atualizada'])
+        respostas = RespostaAvaliacao.objects.filter(avaliador=self.avaliador)
+        self.assertEqual(respostas.count(), 2)
+        resposta = respostas.get(competencia=self.comunicacao)
+        self.assertEqual((resposta.nota, resposta.justificativa), (4, 'nota 4'))
+        self.assertEqual(self.resumo(self.comunicacao), (2, 6))
+        self.assertEqual(self.resumo(self.lideranca), (1, 5))
+
+    @unittest.skipUnless(connection.features.supports_update_conflicts_with_target, "O banco não tem ON CONFLICT.")
+    def test_upsert_com_on_conflict(self):
+        self.verificar_upsert()
+
+    def test_upsert_sem_on_conflict(self):
+        manager = RespostaAvaliacao.objects
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False), \
+                mock.patch.object(manager, 'bulk_update', wraps=manager.bulk_update) as bulk_update:
+            self.verificar_upsert()
+        self.assertEqual(bulk_update.call_count, 2)
+
+    def test_trava_o_resumo_antes_de_ler_as_respostas(self):
+        # Dois envios concorrentes do mesmo formulário: o segundo espera o
+        # primeiro terminar antes de ler as respostas e calcular os deltas
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=QuerySet.select_for_update) as trava, \
+                CaptureQueriesContext(connection) as consultas:
+            self.enviar((self.comunicacao, 3), (self.lideranca, 5))
+        self.assertEqual([chamada.args[0].model for chamada in trava.call_args_list], [ResumoAvaliacao])
+
+        tabela_resumo, tabela_respostas = ResumoAvaliacao._meta.db_table, RespostaAvaliacao._meta.db_table
+        selects = [consulta['sql'] for consulta in consultas if consulta['sql'].startswith('SELECT')]
+        leitura_resumo = next(n for n, sql in enumerate(selects) if f'FROM "{tabela_resumo}"' in sql)
+        leitura_respostas = next(n for n, sql in enumerate(selects) if f'FROM "{tabela_respostas}"' in sql)
+        self.assertLess(leitura_resumo, leitura_respostas)
+        # As linhas criadas para a trava recebem as notas normalmente
+        self.assertEqual(self.resumo(self.comunicacao), (1, 3))
+        self.assertEqual(self.resumo(self.lideranca), (1, 5))
+
+    def test_lote_invalido_nao_grava_nada(self):
+        inexistente = Competencia(pk=self.lideranca.pk + 100)
+        response = self.client.post(URL_LOTE, {
+            'ciclo': self.ciclo.pk,
+            'respostas': [
+                {'avaliado': self.avaliado.pk, 'competencia': competencia.pk, 'nota': 4}
+                for competencia in (self.comunicacao, inexistente)
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('competencia', response.data['respostas'][1])
+        self.assertFalse(RespostaAvaliacao.objects.exists())
+        self.assertFalse(ResumoAvaliacao.objects.exists())
+
+
+class ResumoAvaliacaoTests(TestCase):
+    """
+    ResumoAvaliacao mantido pelos signals de RespostaAvaliacao e reconstruído
+    pelo comando reconstruir_resumo_avaliacoes.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.avaliador = User.objects.create(username='avaliador')
+        cls.avaliado = User.objects.create(username='avaliado')
+        cls.ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+        cls.comunicacao = Competencia.objects.create(nome='Comunicação', descricao='-')
+        cls.lideranca = Competencia.objects.create(nome='Liderança', descricao='-')
+
+    def resposta(self, competencia, nota, avaliador=None):
+        return RespostaAvaliacao.objects.create(
+            ciclo=self.ciclo, avaliado=self.avaliado, avaliador=avaliador or self.avaliador, competencia=competencia, nota=nota
+        )
+
+    def resumos(self):
+        return {
+            linha.competencia_id: (linha.quantidade, linha.soma_notas)
+            for linha in ResumoAvaliacao.objects.filter(ciclo=self.ciclo, avaliado=self.avaliado)
+        }
+
+    def test_resumo_incremental(self):
+        resposta = self.resposta(self.comunicacao, 3)
+        self.resposta(self.comunicacao, 5, User.objects.create(username='outro'))
+        self.assertEqual(self.resumos(), {self.comunicacao.pk: (2, 8)})
+
+        resposta.nota = 4
+        resposta.save()
+        self.assertEqual(self.resumos(), {self.comunicacao.pk: (2, 9)})
+
+        # Trocar a competência move a contribuição de uma linha para a outra
+        resposta.competencia = self.lideranca
+        resposta.save()
+        self.assertEqual(self.resumos(), {self.comunicacao.pk: (1, 5), self.lideranca.pk: (1, 4)})
+
+        resposta.delete()
+        self.assertEqual(self.resumos(), {self.comunicacao.pk: (1, 5), self.lideranca.pk: (0, 0)})
+
+    def test_edicao_de_instancia_que_nao_veio_do_banco(self):
+        criada, = RespostaAvaliacao.objects.bulk_create([
+            RespostaAvaliacao(ciclo=self.ciclo, avaliado=self.avaliado, avaliador=self.avaliador, competencia=self.comunicacao, nota=2)
+        ])
+        # bulk_create não dispara signals: o resumo parte do comando
+        call_command('reconstruir_resumo_avaliacoes', stdout=io.StringIO())
+        self.assertEqual(self.resumos(), {self.comunicacao.pk: (1, 2)})
+
+        criada.nota = 5
+        criada.save()
+        self.assertEqual(self.resumos(), {self.comunicacao.pk: (1, 5)})
+
+        montada = RespostaAvaliacao(
+            pk=criada.pk, ciclo=self.ciclo, avaliado=self.avaliado, avaliador=self.avaliador,
+            competencia=self.comunicacao, nota=1, data_resposta=criada.data_resposta,
+        )
+        montada.save()
+        self.assertEqual(self.resumos(), {self.comunicacao.pk: (1, 1)})
+
+    def test_comando_reconstroi_o_resumo(self):
+        self.resposta(self.comunicacao, 3)
+        self.resposta(self.lideranca, 4)
+        outro_ciclo = CicloAvaliacao.objects.create(titulo='Outro', data_inicio=date(2024, 7, 1), data_fim=date(2024, 12, 31))
+        RespostaAvaliacao.objects.create(
+            ciclo=outro_ciclo, avaliado=self.avaliado, avaliador=self.avaliador, competencia=self.comunicacao, nota=1
+        )
+        # Gravações fora dos signals (ex: SQL direto) deixam o resumo errado
+        ResumoAvaliacao.objects.update(quantidade=9, soma_notas=99)
+
+        saida = io.StringIO()
+        call_command('reconstruir_resumo_avaliacoes', ciclo=self.ciclo.pk, stdout=saida)
+        self.assertIn('2 linhas', saida.getvalue())
+        self.assertEqual(self.resumos(), {self.comunicacao.pk: (1, 3), self.lideranca.pk: (1, 4)})
+        # Só o ciclo pedido é reconstruído
+        self.assertEqual(ResumoAvaliacao.objects.get(ciclo=outro_ciclo).quantidade, 9)
+
+        call_command('reconstruir_resumo_avaliacoes', stdout=io.StringIO())
+        self.assertEqual(ResumoAvaliacao.objects.get(ciclo=outro_ciclo).quantidade, 1)
@@ -1,24 +1,35 @@
 # reune_app/avaliacoes/views.py
 
-from rest_framework import viewsets
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from .models import CicloAvaliacao, Competencia, RespostaAvaliacao
-from .serializers import CicloAvaliacaoSerializer, CompetenciaSerializer, RespostaAvaliacaoSerializer
+from .resumo import aplicar_deltas, somar_delta, travar_resumos
+from .serializers import CicloAvaliacaoSerializer, CompetenciaSerializer, RespostaAvaliacaoSerializer, RespostaAvaliacaoLoteSerializer
+from busca.indice import indexar
+from reune.cache import invalidar_modelo
+from reune.mixins import ExportacaoMixin, MedicaoConsultasMixin, QuerysetOtimizadoMixin, RespostaCondicionalMixin, RespostaEmCacheMixin
+from reune.politicas import Liderado, Proprio
 
-class CicloAvaliacaoViewSet(viewsets.ModelViewSet):
+class CicloAvaliacaoViewSet(MedicaoConsultasMixin, RespostaCondicionalMixin, RespostaEmCacheMixin, QuerysetOtimizadoMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar e editar Ciclos de Avaliação.
     """
     queryset = CicloAvaliacao.objects.all()
     serializer_class = CicloAvaliacaoSerializer
+    ordering = ('-data_inicio', '-id')
 
-class CompetenciaViewSet(viewsets.ModelViewSet):
+class CompetenciaViewSet(MedicaoConsultasMixin, RespostaCondicionalMixin, RespostaEmCacheMixin, QuerysetOtimizadoMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar e editar Competências.
     """
     queryset = Competencia.objects.all()
     serializer_class = CompetenciaSerializer
+    ordering = ('nome', 'id')
 
-class RespostaAvaliacaoViewSet(viewsets.ModelViewSet):
+class RespostaAvaliacaoViewSet(MedicaoConsultasMixin, ExportacaoMixin, RespostaCondicionalMixin, QuerysetOtimizadoMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar e editar Respostas de Avaliação.
     """
@@ -26,4 +37,134 @@ class RespostaAvaliacaoViewSet(viewsets.ModelViewSet):
     queryset = RespostaAvaliacao.objects.select_related(
         'ciclo', 'avaliado', 'avaliador', 'competencia'
     ).all()
-    serializer_class = RespostaAvaliacaoSerializer
\ No newline at end of file
+    serializer_class = RespostaAvaliacaoSerializer
+    ordering = ('-data_resposta', '-id')
+    campos_validador = ('data_resposta',)
+    modelos_validador = (RespostaAvaliacao, User, CicloAvaliacao, Competencia)
+    # Quem respondeu e os líderes do avaliado (o avaliado não vê as justificativas)
+    politica_linhas = Proprio('avaliador') | Liderado('avaliado')
+    # Exportação em streaming: /api/avaliacoes/respostas/export/?ciclo_id=2&format=csv
+    nome_exportacao = 'respostas_avaliacao'
+    campos_exportacao = (
+        'id', 'ciclo_id', 'ciclo__titulo', 'avaliado_id', 'avaliado__username', 'avaliador_id',
+        'avaliador__username', 'competencia_id', 'competencia__nome', 'nota', 'justificativa', 'data_resposta',
+    )
+    filtros_exportacao = {
+        'ciclo_id': 'ciclo_id', 'avaliado_id': 'avaliado_id', 'competencia_id': 'competencia_id',
+    }
+    LIMITE_LOTE = 200  # Máximo de respostas aceitas por formulário enviado em lote
+
+    @action(detail=False, methods=['post'], url_path='lote')
+    def lote(self, request):
+        """
+        Salva o formulário inteiro de uma avaliação em uma única transação.
+        Exemplo de URL: POST /api/avaliacoes/respostas/lote/
+        Corpo: {"ciclo": 2, "respostas": [{"avaliado": 5, "competencia": 1, "nota": 4, "justificativa": "..."}]}
+
+        O avaliador é sempre o usuário logado. Se ele já respondeu alguma das
+        competências neste ciclo, a resposta é atualizada (upsert) em vez de falhar.
+        """
+        serializer = RespostaAvaliacaoLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ciclo_id = serializer.validated_data['ciclo']
+        itens = serializer.validated_data['respostas']
+
+        if len(itens) > self.LIMITE_LOTE:
+            return Response(
+                {"error": f"O lote aceita no máximo {self.LIMITE_LOTE} respostas."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not CicloAvaliacao.objects.filter(pk=ciclo_id).exists():
+            return Response(
+                {"error": f"Ciclo de avaliação com id={ciclo_id} não encontrado."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Valida todas as chaves estrangeiras do lote com uma consulta por tabela
+        avaliados_validos = set(User.objects.filter(
+            pk__in={item['avaliado'] for item in itens}
+        ).values_list('pk', flat=True))
+        competencias_validas = set(Competencia.objects.filter(
+            pk__in={item['competencia'] for item in itens}
+        ).values_list('pk', flat=True))
+
+        erros = []
+        for item in itens:
+            erro = {}
+            if item['avaliado'] not in avaliados_validos:
+                erro['avaliado'] = [f"Usuário com id={item['avaliado']} não encontrado."]
+            if item['competencia'] not in competencias_validas:
+                erro['competencia'] = [f"Competência com id={item['competencia']} não encontrada."]
+            erros.append(erro)
+        if any(erros):
+            return Response({"respostas": erros}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            travar_resumos(ciclo_id, {(item['avaliado'], item['competencia']) for item in itens})
+            # Descobre quais respostas já existem para classificar cada linha
+            existentes = {
+                (avaliado_id, competencia_id): (pk, nota)
+                for pk, avaliado_id, competencia_id, nota in RespostaAvaliacao.objects.filter(
+                    ciclo_id=ciclo_id,
+                    avaliador=request.user,
+                    avaliado_id__in={item['avaliado'] for item in itens},
+                    competencia_id__in={item['competencia'] for item in itens},
+                ).values_list('pk', 'avaliado_id', 'competencia_id', 'nota')
+            }
+
+            objetos = [
+                RespostaAvaliacao(
+                    ciclo_id=ciclo_id,
+                    avaliado_id=item['avaliado'],
+                    avaliador=request.user,
+                    competencia_id=item['competencia'],
+                    nota=item['nota'],
+                    justificativa=item['justificativa'],
+                ) for item in itens
+            ]
+
+            if connection.features.supports_update_conflicts_with_target:
+                # INSERT ... ON CONFLICT DO UPDATE: um único comando para o lote todo
+                RespostaAvaliacao.objects.bulk_create(
+                    objetos,
+                    update_conflicts=True,
+                    unique_fields=['ciclo', 'avaliado', 'avaliador', 'competencia'],
+                    update_fields=['nota', 'justificativa'],
+                )
+            else:
+                # Bancos sem ON CONFLICT (ex: SQL Server): INSERT em lote dos novos
+                # e UPDATE em lote dos que já existiam
+                for obj in objetos:
+                    obj.pk = existentes.get((obj.avaliado_id, obj.competencia_id), (None, None))[0]
+                RespostaAvaliacao.objects.bulk_create([obj for obj in objetos if obj.pk is None])
+                RespostaAvaliacao.objects.bulk_update(
+                    [obj for obj in objetos if obj.pk is not None], ['nota', 'justificativa']
+                )
+
+            # bulk_create/bulk_update não disparam signals: atualiza o resumo aqui
+            deltas = {}
+            for item in itens:
+                chave = (ciclo_id, item['avaliado'], item['competencia'])
+                if (item['avaliado'], item['competencia']) in existentes:
+                    nota_antiga = existentes[(item['avaliado'], item['competencia'])][1]
+                    somar_delta(deltas, chave, 0, item['nota'] - nota_antiga)
+                else:
+                    somar_delta(deltas, chave, 1, item['nota'])
+            aplicar_deltas(deltas)
+            # As justificativas novas ou alteradas entram no índice de busca
+            indexar(RespostaAvaliacao.objects.filter(
+                ciclo_id=ciclo_id,
+                avaliador=request.user,
+                avaliado_id__in={item['avaliado'] for item in itens},
+                competencia_id__in={item['competencia'] for item in itens},
+            ))
+            invalidar_modelo(RespostaAvaliacao)
+
+        resultados = [
+            {
+                'avaliado': item['avaliado'],
+                'competencia': item['competencia'],
+                'status': 'atualizada' if (item['avaliado'], item['competencia']) in existentes else 'criada',
+            } for item in itens
+        ]
+        return Response({'ciclo': ciclo_id, 'resultados': resultados}, status=status.HTTP_200_OK)
\ No newline at end of file
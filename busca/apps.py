@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class BuscaConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'busca'
+
+    def ready(self):
+        # Registra os signals que mantêm o índice de busca em dia
+        from . import signals  # noqa: F401
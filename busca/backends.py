@@ -0,0 +1,139 @@
+# reune_app/busca/backends.py
+
+from django.db.models import Q, Value
+from django.db.models.expressions import RawSQL
+
+
+class BackendBusca:
+    """
+    Índice textual sobre a tabela de DocumentoBusca. Cada banco tem o seu:
+    o backend cria/remove o índice (na migração) e transforma os termos
+    pesquisados num filtro com a coluna 'relevancia' (maior = melhor).
+    """
+
+    def criar_indice(self, schema_editor, model):
+        pass
+
+    def remover_indice(self, schema_editor, model):
+        pass
+
+    def buscar(self, queryset, termos):
+        raise NotImplementedError
+
+
+class BackendSimples(BackendBusca):
+    """
+    Sem índice textual (ex: PostgreSQL, enquanto não houver um backend próprio):
+    icontains em uma única tabela, com os mais recentes primeiro.
+    """
+
+    def buscar(self, queryset, termos):
+        filtro = Q()
+        for termo in termos:
+            filtro &= Q(texto__icontains=termo)
+        return queryset.filter(filtro).annotate(relevancia=Value(0.0)).order_by('-data', '-id')
+
+
+class BackendFTS5(BackendBusca):
+    """
+    SQLite: uma tabela virtual FTS5 com "external content" apontando para a
+    tabela de DocumentoBusca, mantida por triggers (qualquer INSERT, UPDATE ou
+    DELETE, inclusive em lote, atualiza o índice na mesma transação). Acentos e
+    maiúsculas são ignorados (unicode61 remove_diacritics) e a ordem é o bm25.
+    """
+
+    def _nomes(self, model):
+        tabela = model._meta.db_table
+        return tabela, f'{tabela}_fts'
+
+    def criar_indice(self, schema_editor, model):
+        tabela, fts = self._nomes(model)
+        comandos = [
+            f"CREATE VIRTUAL TABLE {fts} USING fts5(texto, content='{tabela}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')",
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {tabela} BEGIN "
+            f"INSERT INTO {fts}(rowid, texto) VALUES (new.id, new.texto); END",
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {tabela} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, texto) VALUES ('delete', old.id, old.texto); END",
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {tabela} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, texto) VALUES ('delete', old.id, old.texto); "
+            f"INSERT INTO {fts}(rowid, texto) VALUES (new.id, new.texto); END",
+            # Indexa o que já estiver na tabela
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        ]
+        for comando in comandos:
+            schema_editor.execute(comando)
+
+    def remover_indice(self, schema_editor, model):
+        _, fts = self._nomes(model)
+        for sufixo in ('_ai', '_ad', '_au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}{sufixo}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+    def buscar(self, queryset, termos):
+        tabela, fts = self._nomes(queryset.model)
+        # Cada termo vira um prefixo entre aspas ("feedb"*): nada do que o
+        # usuário digitou é interpretado como operador do FTS5
+        consulta = ' '.join(f'"{termo}"*' for termo in termos)
+        # JOIN com a tabela virtual: o MATCH escolhe as linhas pelo índice e o
+        # filtro de permissão é aplicado sobre elas, numa consulta só
+        return queryset.extra(
+            tables=[fts],
+            where=[f'{fts}.rowid = {tabela}.id', f'{fts} MATCH %s'],
+            params=[consulta],
+            select={'relevancia': f'-{fts}.rank'},
+            order_by=['-relevancia', '-id'],
+        )
+
+
+class BackendSQLServer(BackendBusca):
+    """
+    SQL Server: índice full-text (idioma 1046, português do Brasil) sobre a
+    coluna texto, pesquisado com CONTAINSTABLE. O índice é atualizado pelo
+    próprio servidor (CHANGE_TRACKING AUTO), com alguns segundos de atraso.
+    """
+    catalogo = 'reune_busca'
+
+    def criar_indice(self, schema_editor, model):
+        tabela = model._meta.db_table
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sys.indexes WHERE object_id = OBJECT_ID(%s) AND is_primary_key = 1", [tabela]
+            )
+            chave_primaria = cursor.fetchone()[0]
+        schema_editor.execute(
+            f"IF NOT EXISTS (SELECT 1 FROM sys.fulltext_catalogs WHERE name = '{self.catalogo}') "
+            f"CREATE FULLTEXT CATALOG {self.catalogo}"
+        )
+        schema_editor.execute(
+            f"CREATE FULLTEXT INDEX ON {tabela} (texto LANGUAGE 1046) KEY INDEX {chave_primaria} "
+            f"ON {self.catalogo} WITH CHANGE_TRACKING AUTO"
+        )
+
+    def remover_indice(self, schema_editor, model):
+        schema_editor.execute(f"DROP FULLTEXT INDEX ON {model._meta.db_table}")
+
+    def buscar(self, queryset, termos):
+        tabela = queryset.model._meta.db_table
+        consulta = ' AND '.join(f'"{termo}*"' for termo in termos)
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT [KEY] FROM CONTAINSTABLE({tabela}, texto, %s)", [consulta])
+        ).annotate(
+            relevancia=RawSQL(
+                f"SELECT ft.[RANK] FROM CONTAINSTABLE({tabela}, texto, %s) AS ft WHERE ft.[KEY] = {tabela}.id",
+                [consulta],
+            )
+        ).order_by('-relevancia', '-id')
+
+
+BACKENDS = {
+    'sqlite': BackendFTS5,
+    'microsoft': BackendSQLServer,  # vendor do mssql-django
+}
+
+
+def backend_para(connection):
+    """
+    O backend de busca do banco da conexão (BackendSimples se não houver um próprio).
+    """
+    return BACKENDS.get(connection.vendor, BackendSimples)()
@@ -0,0 +1,160 @@
+# reune_app/busca/indice.py
+
+import re
+import unicodedata
+from collections import namedtuple
+from datetime import date, datetime, time
+from itertools import islice
+
+from django.db import connections, router
+from django.db.models import Q
+from django.utils import timezone
+
+from avaliacoes.models import RespostaAvaliacao
+from clima.models import RegistroHumor
+from feedback.models import Feedback
+from okr.models import CheckIn
+from usuarios.visibilidade import filtro_visiveis
+from .backends import backend_para
+from .models import DocumentoBusca
+
+Tipo = DocumentoBusca.TipoChoices
+Visibilidade = DocumentoBusca.VisibilidadeChoices
+
+TAMANHO_LOTE = 1000
+# Termos considerados por busca e tamanho mínimo de cada um
+MAXIMO_TERMOS = 8
+MINIMO_LETRAS = 2
+
+# De onde vem cada tipo de documento: o model, a coluna de texto, o autor, o
+# dono e a data (caminhos para values_list) e quem pode ver o resultado
+Fonte = namedtuple('Fonte', ['tipo', 'model', 'texto', 'autor', 'dono', 'data', 'visibilidade'])
+
+FONTES = {
+    fonte.model: fonte for fonte in (
+        Fonte(Tipo.FEEDBACK, Feedback, 'texto', 'emissor_id', 'receptor_id', 'data_criacao', Visibilidade.PRIVADO),
+        Fonte(
+            Tipo.CHECKIN, CheckIn, 'comentario', 'colaborador_id', 'resultado_chave__objetivo__responsavel_id',
+            'data_checkin', Visibilidade.EQUIPE,
+        ),
+        Fonte(
+            Tipo.AVALIACAO, RespostaAvaliacao, 'justificativa', 'avaliador_id', 'avaliado_id',
+            'data_resposta', Visibilidade.LIDERANCA,
+        ),
+        Fonte(Tipo.HUMOR, RegistroHumor, 'comentario', 'colaborador_id', 'colaborador_id', 'data_registro', Visibilidade.EQUIPE),
+    )
+}
+
+
+def _em_lotes(iteravel, tamanho):
+    iterador = iter(iteravel)
+    while lote := list(islice(iterador, tamanho)):
+        yield lote
+
+
+def _momento(data):
+    # RegistroHumor guarda só a data: vira o início do dia
+    if isinstance(data, date) and not isinstance(data, datetime):
+        return timezone.make_aware(datetime.combine(data, time.min))
+    return data
+
+
+def indexar(queryset, tamanho_lote=TAMANHO_LOTE):
+    """
+    (Re)indexa os registros do queryset, de um dos models de FONTES: apaga os
+    documentos antigos e insere os novos em lote. Registros sem texto ficam
+    fora do índice. Retorna o número de documentos gravados.
+    """
+    fonte = FONTES[queryset.model]
+    linhas = queryset.order_by('pk').values_list('pk', fonte.texto, fonte.autor, fonte.dono, fonte.data)
+    total = 0
+    for lote in _em_lotes(linhas.iterator(chunk_size=tamanho_lote), tamanho_lote):
+        remover(fonte.model, [linha[0] for linha in lote])
+        documentos = DocumentoBusca.objects.bulk_create([
+            DocumentoBusca(
+                tipo=fonte.tipo, objeto_id=pk, texto=texto.strip(), autor_id=autor_id, dono_id=dono_id,
+                visibilidade=fonte.visibilidade, data=_momento(data),
+            ) for pk, texto, autor_id, dono_id, data in lote if texto and texto.strip()
+        ])
+        total += len(documentos)
+    return total
+
+
+def remover(model, ids):
+    """
+    Tira do índice os documentos dos registros `ids` do model.
+    """
+    DocumentoBusca.objects.filter(tipo=FONTES[model].tipo, objeto_id__in=ids).delete()
+
+
+def reindexar(tipos=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Reconstrói o índice do zero (só dos `tipos` informados, se houver), a
+    partir das tabelas de origem. Retorna {tipo: documentos gravados}.
+    """
+    totais = {}
+    for fonte in FONTES.values():
+        if tipos and fonte.tipo not in tipos:
+            continue
+        DocumentoBusca.objects.filter(tipo=fonte.tipo).delete()
+        totais[fonte.tipo] = indexar(fonte.model.objects.all(), tamanho_lote)
+    return totais
+
+
+def termos_da_busca(texto):
+    """
+    As palavras pesquisadas, em minúsculas: no máximo MAXIMO_TERMOS, com pelo
+    menos MINIMO_LETRAS cada. Pontuação e operadores são descartados.
+    """
+    termos = [termo for termo in re.findall(r'\w+', texto.lower()) if len(termo) >= MINIMO_LETRAS]
+    return list(dict.fromkeys(termos))[:MAXIMO_TERMOS]
+
+
+def filtro_permissao(usuario):
+    """
+    Os documentos que o usuário pode ver: os que escreveu, os que são dele
+    (exceto justificativas de avaliação) e os dos colaboradores das equipes que
+    lidera, incluindo as subequipes (exceto feedbacks, que ficam entre emissor e receptor).
+    """
+    proprios = Q(autor_id=usuario.pk) | Q(
+        dono_id=usuario.pk, visibilidade__in=[Visibilidade.PRIVADO, Visibilidade.EQUIPE]
+    )
+    dos_liderados = filtro_visiveis(usuario, 'dono', incluir_proprio=False)
+    return proprios | (dos_liderados & Q(visibilidade__in=[Visibilidade.EQUIPE, Visibilidade.LIDERANCA]))
+
+
+def buscar(usuario, termos, tipos=None, limite=20):
+    """
+    Queryset (ainda não executado) com os `limite` documentos mais relevantes
+    para os termos entre os que o usuário pode ver, em uma única consulta.
+    """
+    queryset = DocumentoBusca.objects.filter(filtro_permissao(usuario))
+    if tipos:
+        queryset = queryset.filter(tipo__in=tipos)
+    backend = backend_para(connections[router.db_for_read(DocumentoBusca)])
+    return backend.buscar(queryset, termos).values(
+        'tipo', 'objeto_id', 'texto', 'autor_id', 'dono_id', 'data', 'relevancia'
+    )[:limite]
+
+
+def _dobrar(texto):
+    # Sem acentos e em minúsculas, com o mesmo comprimento do original
+    return ''.join(unicodedata.normalize('NFKD', letra)[:1].lower()[:1] or letra for letra in texto)
+
+
+def trecho(texto, termos, tamanho=160):
+    """
+    O pedaço do texto em volta do primeiro termo encontrado (ignorando acentos),
+    com reticências onde foi cortado.
+    """
+    if len(texto) <= tamanho:
+        return texto
+    dobrado = _dobrar(texto)
+    posicoes = [posicao for posicao in (dobrado.find(_dobrar(termo)) for termo in termos) if posicao >= 0]
+    inicio = max(0, min(posicoes, default=0) - tamanho // 3)
+    if inicio:
+        # Começa numa palavra inteira
+        espaco = texto.find(' ', inicio)
+        inicio = espaco + 1 if 0 <= espaco < inicio + 20 else inicio
+    fim = min(len(texto), inicio + tamanho)
+    return ('…' if inicio else '') + texto[inicio:fim].strip() + ('…' if fim < len(texto) else '')
@@ -0,0 +1,24 @@
+# reune_app/busca/management/commands/reindexar_busca.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from busca.indice import TAMANHO_LOTE, Tipo, reindexar
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstrói o índice de busca textual (feedbacks, check-ins, avaliações e humor) "
+        "a partir das tabelas de origem. Use depois de cargas que não disparam signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tipo', action='append', choices=Tipo.values, help="Só este tipo (pode repetir).")
+        parser.add_argument('--batch-size', type=int, default=TAMANHO_LOTE, help="Registros por INSERT.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size deve ser maior que zero.")
+        totais = reindexar(options['tipo'], tamanho_lote=options['batch_size'])
+        for tipo, total in totais.items():
+            self.stdout.write(f"{tipo}: {total}")
+        self.stdout.write(self.style.SUCCESS("Índice de busca reconstruído."))
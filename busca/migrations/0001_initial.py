@@ -0,0 +1,35 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentoBusca',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('feedback', 'Feedback'), ('checkin', 'Check-in'), ('avaliacao', 'Avaliação'), ('humor', 'Humor')], max_length=20, verbose_name='Tipo')),
+                ('objeto_id', models.PositiveBigIntegerField(verbose_name='ID do Registro')),
+                ('texto', models.TextField(verbose_name='Texto')),
+                ('visibilidade', models.CharField(choices=[('privado', 'Autor e dono'), ('equipe', 'Autor, dono e líderes'), ('lideranca', 'Autor e líderes do dono')], max_length=20, verbose_name='Visibilidade')),
+                ('data', models.DateTimeField(blank=True, null=True, verbose_name='Data')),
+                ('autor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Autor')),
+                ('dono', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Dono')),
+            ],
+            options={
+                'verbose_name': 'Documento de Busca',
+                'verbose_name_plural': 'Documentos de Busca',
+                'unique_together': {('tipo', 'objeto_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:40
+
+from django.db import migrations
+
+from busca.backends import backend_para
+
+
+def criar_indice(apps, schema_editor):
+    # FTS5 no SQLite, full-text no SQL Server (ver busca/backends.py)
+    backend_para(schema_editor.connection).criar_indice(schema_editor, apps.get_model('busca', 'DocumentoBusca'))
+
+
+def remover_indice(apps, schema_editor):
+    backend_para(schema_editor.connection).remover_indice(schema_editor, apps.get_model('busca', 'DocumentoBusca'))
+
+
+class Migration(migrations.Migration):
+    # O SQL Server não cria índices full-text dentro de uma transação
+    atomic = False
+
+    dependencies = [
+        ('busca', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
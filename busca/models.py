@@ -0,0 +1,41 @@
+# reune_app/busca/models.py
+
+from django.db import models
+from django.contrib.auth.models import User
+
+
+# Um texto pesquisável (feedback, comentário de check-in, justificativa de
+# avaliação ou comentário de humor), copiado do registro de origem pelos signals
+# de busca/signals.py. O índice textual (FTS5 no SQLite, full-text no SQL
+# Server) é criado sobre esta tabela pela migração 0002 (ver busca/backends.py).
+class DocumentoBusca(models.Model):
+    class TipoChoices(models.TextChoices):
+        FEEDBACK = 'feedback', 'Feedback'
+        CHECKIN = 'checkin', 'Check-in'
+        AVALIACAO = 'avaliacao', 'Avaliação'
+        HUMOR = 'humor', 'Humor'
+
+    class VisibilidadeChoices(models.TextChoices):
+        # Só o autor e o dono (ex: emissor e receptor de um feedback)
+        PRIVADO = 'privado', 'Autor e dono'
+        # Autor, dono e os líderes do dono (check-ins, humor)
+        EQUIPE = 'equipe', 'Autor, dono e líderes'
+        # Autor e os líderes do dono, mas não o dono (justificativas de avaliação)
+        LIDERANCA = 'lideranca', 'Autor e líderes do dono'
+
+    tipo = models.CharField(max_length=20, choices=TipoChoices.choices, verbose_name="Tipo")
+    objeto_id = models.PositiveBigIntegerField(verbose_name="ID do Registro")
+    texto = models.TextField(verbose_name="Texto")
+    # Quem escreveu e de quem é o registro: definem quem pode ver o resultado
+    autor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', verbose_name="Autor")
+    dono = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+', verbose_name="Dono")
+    visibilidade = models.CharField(max_length=20, choices=VisibilidadeChoices.choices, verbose_name="Visibilidade")
+    data = models.DateTimeField(null=True, blank=True, verbose_name="Data")
+
+    class Meta:
+        verbose_name = "Documento de Busca"
+        verbose_name_plural = "Documentos de Busca"
+        unique_together = ('tipo', 'objeto_id')
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.objeto_id}"
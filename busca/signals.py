@@ -0,0 +1,59 @@
+# reune_app/busca/signals.py
+
+from django.db.models import Subquery
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from avaliacoes.models import CicloAvaliacao
+from okr.models import CheckIn, Objetivo, ResultadoChave
+from okr.signals import excluido_em_cascata
+from .indice import FONTES, Tipo, indexar, remover
+from .models import DocumentoBusca
+
+
+def indexar_registro(sender, instance, raw=False, **kwargs):
+    # Texto, autor ou dono podem ter mudado: o documento é refeito (3 consultas)
+    if not raw:
+        indexar(sender.objects.filter(pk=instance.pk))
+
+
+def remover_registro(sender, instance, origin=None, **kwargs):
+    # Check-ins excluídos junto com o KR saem do índice de uma vez (ver abaixo)
+    if sender is CheckIn and excluido_em_cascata(origin, ResultadoChave, Objetivo, CicloAvaliacao):
+        return
+    remover(sender, [instance.pk])
+
+
+for model in FONTES:
+    post_save.connect(indexar_registro, sender=model, dispatch_uid=f'busca_indexar_{model._meta.label_lower}')
+    post_delete.connect(remover_registro, sender=model, dispatch_uid=f'busca_remover_{model._meta.label_lower}')
+
+
+@receiver(pre_delete, sender=ResultadoChave)
+def remover_checkins_do_resultado(sender, instance, **kwargs):
+    # Antes da exclusão os check-ins ainda existem: um DELETE por KR, não por check-in
+    remover(CheckIn, CheckIn.objects.filter(resultado_chave_id=instance.pk).values('pk'))
+
+
+# O dono de um check-in é o responsável pelo objetivo: se o objetivo muda de
+# responsável, ou o KR muda de objetivo, os documentos acompanham (um UPDATE)
+
+@receiver(post_save, sender=Objetivo)
+def atualizar_dono_checkins_do_objetivo(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    checkins = CheckIn.objects.filter(resultado_chave__objetivo_id=instance.pk).values('pk')
+    DocumentoBusca.objects.filter(tipo=Tipo.CHECKIN, objeto_id__in=Subquery(checkins)).update(
+        dono_id=instance.responsavel_id
+    )
+
+
+@receiver(post_save, sender=ResultadoChave)
+def atualizar_dono_checkins_do_resultado(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    checkins = CheckIn.objects.filter(resultado_chave_id=instance.pk).values('pk')
+    responsavel = Objetivo.objects.filter(pk=instance.objetivo_id).values('responsavel_id')
+    DocumentoBusca.objects.filter(tipo=Tipo.CHECKIN, objeto_id__in=Subquery(checkins)).update(
+        dono_id=Subquery(responsavel)
+    )
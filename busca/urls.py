@@ -0,0 +1,9 @@
+# reune_app/busca/urls.py
+
+from django.urls import path
+from .views import busca
+
+urlpatterns = [
+    # View assíncrona (ASGI): /api/busca/?q=
+    path('', busca, name='busca'),
+]
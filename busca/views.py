@@ -0,0 +1,53 @@
+# reune_app/busca/views.py
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework import status
+
+from reune.assincrono import api_assincrona, ler_limite, listar
+from .indice import MINIMO_LETRAS, Tipo, buscar, termos_da_busca, trecho
+
+
+@api_assincrona('busca')
+async def busca(request, usuario):
+    """
+    Busca textual em feedbacks, comentários de check-in, justificativas de
+    avaliação e comentários de humor, pelo índice de busca/indice.py: os
+    resultados vêm ordenados por relevância e só entre o que o usuário pode ver.
+    Exemplo de URL: /api/busca/?q=entrega+atrasada&tipos=feedback,checkin&limite=20
+
+    Cada palavra é buscada como prefixo ("entreg" acha "entrega" e "entregue"),
+    sem diferenciar acentos e maiúsculas, e todas precisam aparecer no texto.
+    """
+    q = request.GET.get('q', '').strip()
+    termos = termos_da_busca(q)
+    if not termos:
+        return JsonResponse(
+            {"error": f"Informe o parâmetro 'q' com pelo menos uma palavra de {MINIMO_LETRAS} letras."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    tipos = [tipo.strip() for tipo in request.GET.get('tipos', '').split(',') if tipo.strip()]
+    invalidos = sorted(set(tipos) - set(Tipo.values))
+    if invalidos:
+        return JsonResponse(
+            {"error": f"Tipos inválidos: {invalidos}. Use {Tipo.values}."}, status=status.HTTP_400_BAD_REQUEST
+        )
+    limite = ler_limite(request, 20, 100)
+
+    # ids_visiveis() lê o cache e, na falta dele, o banco: fica numa thread
+    queryset = await sync_to_async(buscar)(usuario, termos, tipos, limite)
+    documentos = await listar(queryset)
+    return {
+        'q': q,
+        'resultados': [
+            {
+                'tipo': documento['tipo'],
+                'id': documento['objeto_id'],
+                'trecho': trecho(documento['texto'], termos),
+                'autor_id': documento['autor_id'],
+                'dono_id': documento['dono_id'],
+                'data': documento['data'],
+                'relevancia': round(float(documento['relevancia']), 4),
+            } for documento in documentos
+        ],
+    }
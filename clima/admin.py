@@ -1,7 +1,7 @@
 # reune_app/clima/admin.py
 
 from django.contrib import admin
-from .models import RegistroHumor
+from .models import RegistroHumor, TendenciaHumor
 
 @admin.register(RegistroHumor)
 class RegistroHumorAdmin(admin.ModelAdmin):
@@ -19,4 +19,21 @@ class RegistroHumorAdmin(admin.ModelAdmin):
         return obj.colaborador.get_full_name() or obj.colaborador.username
 
     # A linha que causava o erro foi removida daqui.
-    # O título da coluna 'Humor' já é definido automaticamente pelo verbose_name no models.py
\ No newline at end of file
+    # O título da coluna 'Humor' já é definido automaticamente pelo verbose_name no models.py
+
+@admin.register(TendenciaHumor)
+class TendenciaHumorAdmin(admin.ModelAdmin):
+    """
+    Configuração do painel Admin para as Tendências de Humor (apenas leitura).
+    Para recalcular use: python manage.py reconstruir_tendencias_humor
+    """
+    list_display = ('inicio', 'granularidade', 'equipe', 'quantidade', 'soma_humor')
+    list_filter = ('granularidade', 'equipe')
+    list_select_related = ('equipe',)
+    date_hierarchy = 'inicio'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
\ No newline at end of file
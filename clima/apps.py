@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class ClimaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'clima'
\ No newline at end of file
+    name = 'clima'
+
+    def ready(self):
+        # Registra os signals que mantêm a TendenciaHumor atualizada
+        from . import signals  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,16 @@
+# reune_app/clima/management/commands/reconstruir_tendencias_humor.py
+
+from django.core.management.base import BaseCommand
+
+from clima.tendencias import reconstruir_tendencias
+
+
+class Command(BaseCommand):
+    help = "Recalcula do zero as tendências de humor (diárias, semanais e mensais) a partir dos registros."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Tamanho dos lotes de INSERT.")
+
+    def handle(self, *args, **options):
+        total = reconstruir_tendencias(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{total} baldes de tendência gravados."))
@@ -0,0 +1,74 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+
+def popular_equipe_e_tendencias(apps, schema_editor):
+    # Registros antigos recebem a equipe atual do colaborador e as tendências
+    # são calculadas a partir deles
+    RegistroHumor = apps.get_model('clima', 'RegistroHumor')
+    TendenciaHumor = apps.get_model('clima', 'TendenciaHumor')
+    Colaborador = apps.get_model('usuarios', 'Colaborador')
+
+    RegistroHumor.objects.update(equipe_id=Subquery(
+        Colaborador.objects.filter(usuario_id=OuterRef('colaborador_id')).values('equipe_id')[:1]
+    ))
+
+    truncamentos = {'dia': TruncDay, 'semana': TruncWeek, 'mes': TruncMonth}
+    histograma = {f'humor_{valor}': Count('id', filter=Q(humor=valor)) for valor in range(1, 6)}
+    for granularidade, truncamento in truncamentos.items():
+        agrupado = (
+            RegistroHumor.objects.order_by()
+            .annotate(periodo=truncamento('data_registro'))
+            .values('periodo', 'equipe_id')
+            .annotate(quantidade=Count('id'), soma_humor=Sum('humor'), **histograma)
+        )
+        TendenciaHumor.objects.bulk_create(
+            (
+                TendenciaHumor(granularidade=granularidade, inicio=linha.pop('periodo'), **linha)
+                for linha in agrupado.iterator(chunk_size=1000)
+            ),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clima', '0001_initial'),
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registrohumor',
+            name='equipe',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='registros_humor', to='usuarios.equipe', verbose_name='Equipe'),
+        ),
+        migrations.CreateModel(
+            name='TendenciaHumor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularidade', models.CharField(choices=[('dia', 'Diária'), ('semana', 'Semanal'), ('mes', 'Mensal')], max_length=10, verbose_name='Granularidade')),
+                ('inicio', models.DateField(verbose_name='Início do Período')),
+                ('quantidade', models.PositiveIntegerField(default=0, verbose_name='Quantidade de Registros')),
+                ('soma_humor', models.PositiveIntegerField(default=0, verbose_name='Soma dos Humores')),
+                ('humor_1', models.PositiveIntegerField(default=0, verbose_name='Muito Triste')),
+                ('humor_2', models.PositiveIntegerField(default=0, verbose_name='Triste')),
+                ('humor_3', models.PositiveIntegerField(default=0, verbose_name='Neutro')),
+                ('humor_4', models.PositiveIntegerField(default=0, verbose_name='Feliz')),
+                ('humor_5', models.PositiveIntegerField(default=0, verbose_name='Muito Feliz')),
+                ('equipe', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tendencias_humor', to='usuarios.equipe', verbose_name='Equipe')),
+            ],
+            options={
+                'verbose_name': 'Tendência de Humor',
+                'verbose_name_plural': 'Tendências de Humor',
+                'ordering': ['granularidade', 'inicio'],
+                'unique_together': {('granularidade', 'inicio', 'equipe')},
+            },
+        ),
+        migrations.RunPython(popular_equipe_e_tendencias, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clima', '0002_registrohumor_equipe_tendenciahumor'),
+        ('usuarios', '0002_equipe_pai_hierarquiaequipe'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registrohumor',
+            index=models.Index(fields=['equipe', 'data_registro'], name='humor_equipe_data_idx'),
+        ),
+    ]
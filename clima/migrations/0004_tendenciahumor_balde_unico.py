@@ -0,0 +1,48 @@
+# Generated by Django 5.0.14 on 2026-10-18 12:16
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+CONTADORES = ['quantidade', 'soma_humor'] + [f'humor_{valor}' for valor in range(1, 6)]
+
+
+def juntar_baldes_sem_equipe(apps, schema_editor):
+    # O unique_together não impedia baldes repetidos sem equipe (NULL != NULL):
+    # os contadores repetidos são somados no primeiro balde e os demais apagados
+    TendenciaHumor = apps.get_model('clima', 'TendenciaHumor')
+    repetidos = (
+        TendenciaHumor.objects.filter(equipe__isnull=True).order_by()
+        .values('granularidade', 'inicio')
+        .annotate(baldes=Count('id'), primeiro=Min('id'), **{f'total_{campo}': Sum(campo) for campo in CONTADORES})
+        .filter(baldes__gt=1)
+    )
+    for balde in repetidos:
+        baldes = TendenciaHumor.objects.filter(
+            equipe__isnull=True, granularidade=balde['granularidade'], inicio=balde['inicio']
+        )
+        baldes.filter(pk=balde['primeiro']).update(**{campo: balde[f'total_{campo}'] for campo in CONTADORES})
+        baldes.exclude(pk=balde['primeiro']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clima', '0003_registrohumor_humor_equipe_data_idx'),
+        ('usuarios', '0002_equipe_pai_hierarquiaequipe'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='tendenciahumor',
+            unique_together=set(),
+        ),
+        migrations.RunPython(juntar_baldes_sem_equipe, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='tendenciahumor',
+            constraint=models.UniqueConstraint(condition=models.Q(('equipe__isnull', False)), fields=('granularidade', 'inicio', 'equipe'), name='tendencia_balde_equipe_unico'),
+        ),
+        migrations.AddConstraint(
+            model_name='tendenciahumor',
+            constraint=models.UniqueConstraint(condition=models.Q(('equipe__isnull', True)), fields=('granularidade', 'inicio'), name='tendencia_balde_sem_equipe_unico'),
+        ),
+    ]
@@ -14,6 +14,9 @@ class RegistroHumor(models.Model):
         MUITO_FELIZ = 5, 'Muito Feliz'
 
     colaborador = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Colaborador")
+    # Equipe do colaborador no momento do registro. Fica gravada para que as
+    # tendências por equipe não mudem quando alguém troca de equipe depois.
+    equipe = models.ForeignKey('usuarios.Equipe', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='registros_humor', verbose_name="Equipe")
     data_registro = models.DateField(auto_now_add=True, verbose_name="Data do Registro")
     humor = models.IntegerField(choices=HumorChoices.choices, verbose_name="Humor")
     comentario = models.TextField(blank=True, null=True, verbose_name="Comentário")
@@ -24,6 +27,58 @@ class RegistroHumor(models.Model):
         # Garante que cada colaborador só pode registrar o humor uma vez por dia
         unique_together = ('colaborador', 'data_registro')
         ordering = ['-data_registro']
+        indexes = [
+            # Registros de uma equipe num período (exportação e recálculo das tendências)
+            models.Index(fields=['equipe', 'data_registro'], name='humor_equipe_data_idx'),
+        ]
 
     def __str__(self):
-        return f"Humor de {self.colaborador.username} em {self.data_registro.strftime('%d/%m/%Y')}"
\ No newline at end of file
+        return f"Humor de {self.colaborador.username} em {self.data_registro.strftime('%d/%m/%Y')}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Guarda os valores carregados para que os signals saibam o humor antigo
+        instance = super().from_db(db, field_names, values)
+        instance._valores_originais = dict(zip(field_names, values))
+        return instance
+
+# Série temporal pré-agregada do humor, por equipe, em baldes de dia/semana/mês.
+# Mantida de forma incremental pelos signals de RegistroHumor, para que os
+# gráficos de clima leiam poucas linhas em vez de todos os registros.
+class TendenciaHumor(models.Model):
+    class GranularidadeChoices(models.TextChoices):
+        DIA = 'dia', 'Diária'
+        SEMANA = 'semana', 'Semanal'
+        MES = 'mes', 'Mensal'
+
+    granularidade = models.CharField(max_length=10, choices=GranularidadeChoices.choices, verbose_name="Granularidade")
+    inicio = models.DateField(verbose_name="Início do Período")
+    equipe = models.ForeignKey('usuarios.Equipe', on_delete=models.CASCADE, null=True, blank=True, related_name='tendencias_humor', verbose_name="Equipe")
+    quantidade = models.PositiveIntegerField(default=0, verbose_name="Quantidade de Registros")
+    soma_humor = models.PositiveIntegerField(default=0, verbose_name="Soma dos Humores")
+    # Histograma: quantos registros de cada valor de HumorChoices
+    humor_1 = models.PositiveIntegerField(default=0, verbose_name="Muito Triste")
+    humor_2 = models.PositiveIntegerField(default=0, verbose_name="Triste")
+    humor_3 = models.PositiveIntegerField(default=0, verbose_name="Neutro")
+    humor_4 = models.PositiveIntegerField(default=0, verbose_name="Feliz")
+    humor_5 = models.PositiveIntegerField(default=0, verbose_name="Muito Feliz")
+
+    class Meta:
+        verbose_name = "Tendência de Humor"
+        verbose_name_plural = "Tendências de Humor"
+        ordering = ['granularidade', 'inicio']
+        constraints = [
+            # Um balde por equipe e período. No SQL NULL é diferente de NULL, então
+            # o total sem equipe precisa de uma restrição própria
+            models.UniqueConstraint(
+                fields=['granularidade', 'inicio', 'equipe'], condition=models.Q(equipe__isnull=False),
+                name='tendencia_balde_equipe_unico',
+            ),
+            models.UniqueConstraint(
+                fields=['granularidade', 'inicio'], condition=models.Q(equipe__isnull=True),
+                name='tendencia_balde_sem_equipe_unico',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Humor {self.get_granularidade_display()} de {self.inicio.strftime('%d/%m/%Y')} ({self.equipe or 'Sem equipe'})"
\ No newline at end of file
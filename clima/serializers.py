@@ -3,8 +3,9 @@
 from rest_framework import serializers
 from .models import RegistroHumor
 from usuarios.serializers import UserSerializer
+from reune.serializers import DynamicFieldsMixin
 
-class RegistroHumorSerializer(serializers.ModelSerializer):
+class RegistroHumorSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # Campo extra para mostrar o texto do humor (ex: "Feliz") e não só o número (ex: 4)
     humor_texto = serializers.CharField(source='get_humor_display', read_only=True)
     colaborador = UserSerializer(read_only=True)
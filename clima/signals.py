@@ -0,0 +1,71 @@
+# reune_app/clima/signals.py
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from reune.cache import versionar_modelos
+from reune.eventos import publicar_apos_commit
+from usuarios.models import Colaborador
+from usuarios.visibilidade import usuarios_que_veem
+from .models import RegistroHumor
+from .tendencias import aplicar_registro
+
+# Versões usadas pelos ETags de /api/clima/registros-humor/ (ver reune/cache.py)
+versionar_modelos(RegistroHumor)
+
+
+def _valores_atuais(instance):
+    return {
+        'equipe_id': instance.equipe_id,
+        'data_registro': instance.data_registro,
+        'humor': instance.humor,
+    }
+
+
+@receiver(pre_save, sender=RegistroHumor)
+def preencher_equipe(sender, instance, raw=False, **kwargs):
+    # Grava a equipe atual do colaborador no momento do registro
+    if raw or instance.pk is not None or instance.equipe_id is not None:
+        return
+    instance.equipe_id = Colaborador.objects.filter(
+        usuario_id=instance.colaborador_id
+    ).values_list('equipe_id', flat=True).first()
+
+
+@receiver(post_save, sender=RegistroHumor)
+def atualizar_tendencias_ao_salvar(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    originais = getattr(instance, '_valores_originais', None) or {}
+    atuais = _valores_atuais(instance)
+    if not created:
+        if all(originais.get(campo) == valor for campo, valor in atuais.items()):
+            return
+        if all(campo in originais for campo in atuais):
+            aplicar_registro(originais['equipe_id'], originais['data_registro'], originais['humor'], -1)
+    aplicar_registro(instance.equipe_id, instance.data_registro, instance.humor, 1)
+    instance._valores_originais = atuais
+
+
+@receiver(post_save, sender=RegistroHumor)
+def publicar_registro(sender, instance, created, raw=False, **kwargs):
+    # O comentário não vai no evento: só o humor, para o colaborador e os líderes acima dele
+    if not created or raw:
+        return
+    dados = {
+        'id': instance.pk,
+        'colaborador_id': instance.colaborador_id,
+        'equipe_id': instance.equipe_id,
+        'data_registro': instance.data_registro,
+        'humor': instance.humor,
+    }
+    publicar_apos_commit('humor.registrado', dados, lambda: usuarios_que_veem(instance.colaborador_id))
+
+
+@receiver(post_delete, sender=RegistroHumor)
+def atualizar_tendencias_ao_apagar(sender, instance, **kwargs):
+    originais = getattr(instance, '_valores_originais', None) or {}
+    atuais = _valores_atuais(instance)
+    if not all(campo in originais for campo in atuais):
+        originais = atuais
+    aplicar_registro(originais['equipe_id'], originais['data_registro'], originais['humor'], -1)
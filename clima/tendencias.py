@@ -0,0 +1,95 @@
+# reune_app/clima/tendencias.py
+
+import datetime
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from .models import RegistroHumor, TendenciaHumor
+
+GRANULARIDADES = TendenciaHumor.GranularidadeChoices
+VALORES_HUMOR = [valor for valor, _ in RegistroHumor.HumorChoices.choices]
+
+
+def inicio_do_periodo(data, granularidade):
+    """
+    Devolve a data que identifica o balde: o próprio dia, a segunda-feira da
+    semana ou o primeiro dia do mês.
+    """
+    if granularidade == GRANULARIDADES.SEMANA:
+        return data - datetime.timedelta(days=data.weekday())
+    if granularidade == GRANULARIDADES.MES:
+        return data.replace(day=1)
+    return data
+
+
+def aplicar_registro(equipe_id, data, humor, sinal):
+    """
+    Soma (sinal=1) ou subtrai (sinal=-1) um registro de humor nos três baldes
+    (dia, semana, mês) da equipe, com UPDATEs atômicos via F().
+    """
+    for granularidade in GRANULARIDADES.values:
+        filtro = TendenciaHumor.objects.filter(
+            granularidade=granularidade,
+            inicio=inicio_do_periodo(data, granularidade),
+            equipe_id=equipe_id,
+        )
+        variacoes = {
+            'quantidade': F('quantidade') + sinal,
+            'soma_humor': F('soma_humor') + sinal * humor,
+            f'humor_{humor}': F(f'humor_{humor}') + sinal,
+        }
+        if filtro.update(**variacoes) or sinal < 0:
+            continue
+        try:
+            with transaction.atomic():
+                TendenciaHumor.objects.create(
+                    granularidade=granularidade,
+                    inicio=inicio_do_periodo(data, granularidade),
+                    equipe_id=equipe_id,
+                    quantidade=1,
+                    soma_humor=humor,
+                    **{f'humor_{humor}': 1},
+                )
+        except IntegrityError:
+            # Outra requisição criou o balde no meio do caminho
+            filtro.update(**variacoes)
+
+
+def reconstruir_tendencias(batch_size=1000):
+    """
+    Apaga e recalcula todas as tendências a partir de RegistroHumor.
+    Retorna o número de baldes gravados.
+    """
+    truncamentos = {
+        GRANULARIDADES.DIA: TruncDay('data_registro'),
+        GRANULARIDADES.SEMANA: TruncWeek('data_registro'),
+        GRANULARIDADES.MES: TruncMonth('data_registro'),
+    }
+    histograma = {
+        f'humor_{valor}': Count('id', filter=Q(humor=valor)) for valor in VALORES_HUMOR
+    }
+
+    with transaction.atomic():
+        TendenciaHumor.objects.all().delete()
+        total = 0
+        for granularidade, truncamento in truncamentos.items():
+            agrupado = (
+                RegistroHumor.objects.order_by()
+                .annotate(periodo=truncamento)
+                .values('periodo', 'equipe_id')
+                .annotate(quantidade=Count('id'), soma_humor=Sum('humor'), **histograma)
+            )
+            novos = TendenciaHumor.objects.bulk_create(
+                (
+                    TendenciaHumor(
+                        granularidade=granularidade,
+                        inicio=linha.pop('periodo'),
+                        **linha,
+                    ) for linha in agrupado.iterator(chunk_size=batch_size)
+                ),
+                batch_size=batch_size,
+            )
+            total += len(novos)
+    return total
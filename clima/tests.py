@@ -0,0 +1,144 @@
+# reune_app/clima/tests.py
+
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from usuarios.models import Colaborador, Equipe
+from .models import RegistroHumor, TendenciaHumor
+from .tendencias import aplicar_registro
+
+URL_TENDENCIAS = '/api/clima/tendencias/'
+URL_FEED = '/api/clima/feed/'
+
+
+class TendenciaHumorPermissaoTests(APITestCase):
+    """
+    /api/clima/tendencias/?equipe=: a série de uma equipe só para os membros,
+    os líderes dela ou de uma equipe acima e os administradores.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.diretor = User.objects.create(username='diretor')
+        cls.membro = User.objects.create(username='membro')
+        cls.outro = User.objects.create(username='outro')
+        cls.admin = User.objects.create(username='admin', is_staff=True)
+        diretoria = Equipe.objects.create(nome='Diretoria', lider=cls.diretor)
+        cls.equipe = Equipe.objects.create(nome='Equipe', equipe_pai=diretoria)
+        cls.outra_equipe = Equipe.objects.create(nome='Outra')
+        Colaborador.objects.create(usuario=cls.membro, equipe=cls.equipe, data_admissao=date(2023, 1, 1))
+        Colaborador.objects.create(usuario=cls.outro, equipe=cls.outra_equipe, data_admissao=date(2023, 1, 1))
+        RegistroHumor.objects.create(colaborador=cls.membro, humor=2)
+
+    def status_tendencia(self, usuario, equipe):
+        self.client.force_authenticate(usuario)
+        return self.client.get(URL_TENDENCIAS, {'equipe': equipe.pk}).status_code
+
+    def test_equipe_restrita_a_membros_e_lideres(self):
+        for usuario, status_esperado in ((self.membro, 200), (self.diretor, 200), (self.admin, 200), (self.outro, 403)):
+            with self.subTest(usuario=usuario.username):
+                self.assertEqual(self.status_tendencia(usuario, self.equipe), status_esperado)
+
+        self.client.force_authenticate(self.membro)
+        periodos = self.client.get(URL_TENDENCIAS, {'equipe': self.equipe.pk}).data['periodos']
+        self.assertEqual([periodo['quantidade'] for periodo in periodos], [1])
+
+    def test_total_de_todas_as_equipes_continua_aberto(self):
+        self.client.force_authenticate(self.outro)
+        self.assertEqual(self.client.get(URL_TENDENCIAS).status_code, 200)
+
+
+class FeedHumorTests(TestCase):
+    """
+    GET /api/clima/feed/: os últimos registros do usuário, se ele registrou
+    hoje e a tendência diária da equipe dele.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.membro = User.objects.create(username='membro')
+        cls.sem_equipe = User.objects.create(username='sem_equipe')
+        cls.equipe = Equipe.objects.create(nome='Equipe')
+        Colaborador.objects.create(usuario=cls.membro, equipe=cls.equipe, data_admissao=date(2023, 1, 1))
+
+    def registrar(self, usuario, dias_atras, humor=4):
+        # O auto_now_add grava hoje; a data muda num save seguinte, que também move a tendência
+        registro = RegistroHumor.objects.create(colaborador=usuario, humor=humor)
+        if dias_atras:
+            registro.data_registro = timezone.localdate() - timedelta(days=dias_atras)
+            registro.save()
+        return registro
+
+    def feed(self, usuario, **params):
+        self.client.force_login(usuario)
+        response = self.client.get(URL_FEED, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_feed_do_usuario(self):
+        ontem = self.registrar(self.membro, 1, humor=2)
+        dados = self.feed(self.membro)
+        self.assertFalse(dados['registrou_hoje'])
+        self.assertEqual([registro['id'] for registro in dados['registros']], [ontem.pk])
+        self.assertEqual(dados['registros'][0]['humor_texto'], 'Triste')
+        self.assertEqual(dados['equipe'], self.equipe.pk)
+        # O balde de hoje ficou vazio quando o registro mudou de data
+        self.assertEqual(dados['tendencia_equipe'], [
+            {'inicio': ontem.data_registro.isoformat(), 'quantidade': 1, 'media_humor': 2.0},
+            {'inicio': timezone.localdate().isoformat(), 'quantidade': 0, 'media_humor': None},
+        ])
+
+        hoje = self.registrar(self.membro, 0, humor=5)
+        dados = self.feed(self.membro)
+        self.assertTrue(dados['registrou_hoje'])
+        self.assertEqual([registro['id'] for registro in dados['registros']], [hoje.pk, ontem.pk])
+        # A tendência vem em ordem cronológica
+        self.assertEqual([periodo['media_humor'] for periodo in dados['tendencia_equipe']], [2.0, 5.0])
+
+    def test_sem_equipe_nao_tem_tendencia(self):
+        self.registrar(self.sem_equipe, 0)
+        dados = self.feed(self.sem_equipe)
+        self.assertEqual((dados['equipe'], dados['tendencia_equipe']), (None, []))
+        self.assertEqual(len(dados['registros']), 1)
+
+    def test_exige_login(self):
+        response = self.client.get(URL_FEED)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response.headers)
+
+    def test_limite(self):
+        for dias_atras in range(94, -1, -1):
+            self.registrar(self.membro, dias_atras)
+        for limite, esperado in ((None, 14), (3, 3), (200, 90), (-1, 0), ('abc', 14)):
+            with self.subTest(limite=limite):
+                dados = self.feed(self.membro, **({} if limite is None else {'limite': limite}))
+                self.assertEqual((len(dados['registros']), len(dados['tendencia_equipe'])), (esperado, esperado))
+
+
+class TendenciaHumorBaldeUnicoTests(TestCase):
+    """
+    Um único balde por granularidade, início e equipe, também para o total
+    sem equipe (equipe NULL).
+    """
+
+    def test_balde_repetido_e_recusado(self):
+        equipe = Equipe.objects.create(nome='Equipe')
+        for equipe_id in (equipe.pk, None):
+            with self.subTest(equipe=equipe_id):
+                TendenciaHumor.objects.create(granularidade='dia', inicio=date(2024, 1, 1), equipe_id=equipe_id)
+                with self.assertRaises(IntegrityError), transaction.atomic():
+                    TendenciaHumor.objects.create(granularidade='dia', inicio=date(2024, 1, 1), equipe_id=equipe_id)
+        # Outro período ou outra granularidade continuam livres
+        TendenciaHumor.objects.create(granularidade='semana', inicio=date(2024, 1, 1))
+        TendenciaHumor.objects.create(granularidade='dia', inicio=date(2024, 1, 2))
+
+    def test_aplicar_registro_sem_equipe_usa_um_balde(self):
+        for humor in (2, 4):
+            aplicar_registro(None, date(2024, 1, 1), humor, 1)
+        balde = TendenciaHumor.objects.get(granularidade='dia', inicio=date(2024, 1, 1), equipe__isnull=True)
+        self.assertEqual((balde.quantidade, balde.soma_humor), (2, 6))
@@ -2,11 +2,14 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import RegistroHumorViewSet
+from .views import RegistroHumorViewSet, TendenciaHumorViewSet, feed_humor
 
 router = DefaultRouter()
 router.register(r'registros-humor', RegistroHumorViewSet, basename='registrohumor')
+router.register(r'tendencias', TendenciaHumorViewSet, basename='tendenciahumor')
 
 urlpatterns = [
+    # View assíncrona (ASGI) da tela inicial
+    path('feed/', feed_humor, name='feed-humor'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
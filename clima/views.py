@@ -1,17 +1,174 @@
 # reune_app/clima/views.py
 
-from rest_framework import viewsets
-from .models import RegistroHumor
+import asyncio
+
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import viewsets, status
+from rest_framework.response import Response
+from .models import RegistroHumor, TendenciaHumor
 from .serializers import RegistroHumorSerializer
+from django.contrib.auth.models import User
+from usuarios.models import Colaborador
+from usuarios.visibilidade import ve_equipe
+from reune.assincrono import api_assincrona, ler_limite, listar
+from reune.mixins import ExportacaoMixin, MedicaoConsultasMixin, QuerysetOtimizadoMixin, RespostaCondicionalMixin
+from reune.politicas import Visivel
 
-class RegistroHumorViewSet(viewsets.ModelViewSet):
+class RegistroHumorViewSet(MedicaoConsultasMixin, ExportacaoMixin, RespostaCondicionalMixin, QuerysetOtimizadoMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar e registrar o humor dos colaboradores.
     """
     queryset = RegistroHumor.objects.select_related('colaborador').all()
     serializer_class = RegistroHumorSerializer
+    ordering = ('-data_registro', '-id')
+    campos_validador = ('data_registro',)
+    modelos_validador = (RegistroHumor, User)
+    # Os registros do próprio usuário e os dos membros das equipes que ele lidera
+    politica_linhas = Visivel('colaborador')
+    # Exportação em streaming: /api/clima/registros-humor/export/?equipe_id=3&inicio=2024-01-01
+    nome_exportacao = 'registros_humor'
+    campos_exportacao = (
+        'id', 'colaborador_id', 'colaborador__username', 'equipe_id', 'data_registro', 'humor', 'comentario',
+    )
+    filtros_exportacao = {
+        'colaborador_id': 'colaborador_id', 'equipe_id': 'equipe_id',
+        'inicio': 'data_registro__gte', 'fim': 'data_registro__lte',
+    }
 
     # Futuramente, quando tivermos autenticação, o colaborador
     # será pego automaticamente do usuário que fez a requisição.
     # def perform_create(self, serializer):
-    #     serializer.save(colaborador=self.request.user)
\ No newline at end of file
+    #     serializer.save(colaborador=self.request.user)
+
+class TendenciaHumorViewSet(MedicaoConsultasMixin, viewsets.ViewSet):
+    """
+    Série temporal do humor lida da tabela pré-agregada TendenciaHumor.
+    Exemplo de URL: /api/clima/tendencias/?granularidade=semana&equipe=3&inicio=2025-01-01&fim=2025-06-30
+
+    Sem 'equipe' soma todas as equipes. Sem 'inicio'/'fim' devolve os últimos
+    'limite' períodos (padrão 30, máximo 366). O custo é proporcional ao número
+    de períodos, não ao número de registros.
+
+    A série de uma equipe só é liberada para os membros dela e para os líderes
+    dela ou de uma equipe acima (e administradores): numa equipe pequena, um
+    período diário mostra o humor de cada pessoa.
+    """
+    limite_padrao = 30
+    limite_maximo = 366
+
+    def list(self, request):
+        granularidade = request.query_params.get('granularidade', TendenciaHumor.GranularidadeChoices.DIA)
+        if granularidade not in TendenciaHumor.GranularidadeChoices.values:
+            return Response(
+                {"error": f"Granularidade inválida. Use uma de: {', '.join(TendenciaHumor.GranularidadeChoices.values)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        tendencias = TendenciaHumor.objects.filter(granularidade=granularidade)
+
+        equipe_id = request.query_params.get('equipe')
+        if equipe_id:
+            if not equipe_id.isdigit():
+                return Response(
+                    {"error": "O parâmetro 'equipe' deve ser o ID de uma equipe."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if not request.user.is_staff and not ve_equipe(request.user, equipe_id):
+                return Response(
+                    {"error": "Apenas membros e líderes da equipe podem ver a tendência de humor dela."},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            tendencias = tendencias.filter(equipe_id=equipe_id)
+
+        for parametro, lookup in (('inicio', 'inicio__gte'), ('fim', 'inicio__lte')):
+            valor = request.query_params.get(parametro)
+            if valor:
+                data = parse_date(valor)
+                if data is None:
+                    return Response(
+                        {"error": f"O parâmetro '{parametro}' deve estar no formato AAAA-MM-DD."},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                tendencias = tendencias.filter(**{lookup: data})
+
+        try:
+            limite = min(int(request.query_params.get('limite', self.limite_padrao)), self.limite_maximo)
+        except ValueError:
+            limite = self.limite_padrao
+
+        colunas_humor = [f'humor_{valor}' for valor in RegistroHumor.HumorChoices.values]
+        periodos = list(
+            tendencias.values('inicio').annotate(
+                total=Sum('quantidade'),
+                soma=Sum('soma_humor'),
+                **{f'total_{coluna}': Sum(coluna) for coluna in colunas_humor}
+            ).order_by('-inicio')[:max(limite, 0)]
+        )
+        periodos.reverse()
+
+        return Response({
+            'granularidade': granularidade,
+            'equipe': int(equipe_id) if equipe_id else None,
+            'periodos': [
+                {
+                    'inicio': periodo['inicio'],
+                    'quantidade': periodo['total'],
+                    'media_humor': round(periodo['soma'] / periodo['total'], 2) if periodo['total'] else None,
+                    'histograma': {
+                        label: periodo[f'total_humor_{valor}']
+                        for valor, label in RegistroHumor.HumorChoices.choices
+                    },
+                } for periodo in periodos
+            ],
+        })
+
+
+@api_assincrona('registrohumor.feed')
+async def feed_humor(request, usuario):
+    """
+    Feed de clima da tela inicial, numa única chamada assíncrona: os últimos
+    registros de humor do usuário, se ele já registrou hoje e a tendência diária
+    da equipe dele (lida do TendenciaHumor).
+    Exemplo de URL: /api/clima/feed/?limite=14
+    """
+    limite = ler_limite(request, 14, 90)
+
+    async def tendencia_da_equipe():
+        try:
+            equipe_id = await Colaborador.objects.values_list('equipe_id', flat=True).aget(usuario_id=usuario.pk)
+        except Colaborador.DoesNotExist:
+            equipe_id = None
+        if equipe_id is None:
+            return None, []
+        periodos = await listar(
+            TendenciaHumor.objects.filter(granularidade=TendenciaHumor.GranularidadeChoices.DIA, equipe_id=equipe_id)
+            .order_by('-inicio').values('inicio', 'quantidade', 'soma_humor')[:limite]
+        )
+        periodos.reverse()
+        return equipe_id, [
+            {
+                'inicio': periodo['inicio'],
+                'quantidade': periodo['quantidade'],
+                'media_humor': round(periodo['soma_humor'] / periodo['quantidade'], 2) if periodo['quantidade'] else None,
+            } for periodo in periodos
+        ]
+
+    registros, registrou_hoje, (equipe_id, tendencia) = await asyncio.gather(
+        listar(
+            RegistroHumor.objects.filter(colaborador_id=usuario.pk).order_by('-data_registro', '-id')
+            .values('id', 'data_registro', 'humor', 'comentario')[:limite]
+        ),
+        RegistroHumor.objects.filter(colaborador_id=usuario.pk, data_registro=timezone.localdate()).aexists(),
+        tendencia_da_equipe(),
+    )
+    for registro in registros:
+        registro['humor_texto'] = RegistroHumor.HumorChoices(registro['humor']).label
+
+    return {
+        'registrou_hoje': registrou_hoje,
+        'registros': registros,
+        'equipe': equipe_id,
+        'tendencia_equipe': tendencia,
+    }
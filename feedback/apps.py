@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FeedbackConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'feedback'
+
+    def ready(self):
+        # Registra os signals que versionam os models para os ETags
+        from . import signals  # noqa: F401
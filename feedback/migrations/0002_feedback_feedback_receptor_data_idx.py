@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['receptor', '-data_criacao'], name='feedback_receptor_data_idx'),
+        ),
+    ]
@@ -13,6 +13,10 @@ class Feedback(models.Model):
         verbose_name = "Feedback"
         verbose_name_plural = "Feedbacks"
         ordering = ['-data_criacao']
+        indexes = [
+            # Feedbacks recebidos por um colaborador, mais recentes primeiro
+            models.Index(fields=['receptor', '-data_criacao'], name='feedback_receptor_data_idx'),
+        ]
 
     def __str__(self):
         return f"Feedback de {self.emissor.username} para {self.receptor.username} em {self.data_criacao.strftime('%d/%m/%Y')}"
\ No newline at end of file
@@ -3,9 +3,10 @@
 from rest_framework import serializers
 from .models import Feedback
 from usuarios.serializers import UserSerializer
+from reune.serializers import DynamicFieldsMixin
 from django.contrib.auth.models import User # <-- Verifique se este import existe
 
-class FeedbackSerializer(serializers.ModelSerializer):
+class FeedbackSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     emissor = UserSerializer(read_only=True)
     receptor = UserSerializer(read_only=True)
 
@@ -0,0 +1,25 @@
+# reune_app/feedback/signals.py
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from reune.cache import versionar_modelos
+from reune.eventos import publicar_apos_commit
+from .models import Feedback
+
+# Versões usadas pelos ETags de /api/feedback/feedbacks/ (ver reune/cache.py)
+versionar_modelos(Feedback)
+
+
+@receiver(post_save, sender=Feedback)
+def publicar_feedback(sender, instance, created, raw=False, **kwargs):
+    # Avisa o receptor pelo stream de eventos (/api/eventos/stream/)
+    if not created or raw:
+        return
+    dados = {
+        'id': instance.pk,
+        'emissor_id': instance.emissor_id,
+        'receptor_id': instance.receptor_id,
+        'data_criacao': instance.data_criacao,
+    }
+    publicar_apos_commit('feedback.criado', dados, lambda: {instance.receptor_id})
@@ -1,3 +1,95 @@
+# reune_app/feedback/tests.py
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from .models import Feedback
+
+URL_FEEDBACKS = '/api/feedback/feedbacks/'
+URL_CAIXA = '/api/feedback/caixa/'
+
+
+class EnvioFeedbackTests(APITestCase):
+    """
+    POST /api/feedback/feedbacks/: o emissor é o usuário logado e o feedback só
+    aparece para quem enviou e quem recebeu.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        # O primeiro usuário do banco não pode virar o emissor de todo feedback
+        cls.primeiro = User.objects.create(username='primeiro')
+        cls.emissor = User.objects.create(username='emissor')
+        cls.receptor = User.objects.create(username='receptor')
+
+    def setUp(self):
+        # A visibilidade fica em cache e os IDs se repetem entre os testes
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def ids(self, usuario):
+        self.client.force_authenticate(usuario)
+        response = self.client.get(URL_FEEDBACKS)
+        self.assertEqual(response.status_code, 200)
+        return {item['id'] for item in response.data['results']}
+
+    def test_emissor_e_o_usuario_logado(self):
+        self.client.force_authenticate(self.emissor)
+        response = self.client.post(URL_FEEDBACKS, {'receptor_id': self.receptor.pk, 'texto': 'Valeu'}, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        feedback = Feedback.objects.get(pk=response.data['id'])
+        self.assertEqual((feedback.emissor, feedback.receptor), (self.emissor, self.receptor))
+
+        self.assertEqual(self.ids(self.emissor), {feedback.pk})
+        self.assertEqual(self.ids(self.receptor), {feedback.pk})
+        self.assertEqual(self.ids(self.primeiro), set())
+
+
+class CaixaFeedbacksTests(TestCase):
+    """
+    GET /api/feedback/caixa/: os últimos feedbacks recebidos pelo usuário e os
+    totais de recebidos e enviados.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='usuario', first_name='Ana')
+        cls.colega = User.objects.create(username='colega', first_name='Bruno', last_name='Lima')
+
+    def caixa(self, **params):
+        self.client.force_login(self.usuario)
+        response = self.client.get(URL_CAIXA, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_caixa_do_usuario(self):
+        antigo = Feedback.objects.create(emissor=self.colega, receptor=self.usuario, texto='Primeiro')
+        recente = Feedback.objects.create(emissor=self.colega, receptor=self.usuario, texto='Segundo')
+        Feedback.objects.create(emissor=self.usuario, receptor=self.colega, texto='Enviado')
+        Feedback.objects.create(emissor=self.colega, receptor=self.colega, texto='De outra pessoa')
+
+        dados = self.caixa()
+        self.assertEqual((dados['total_recebidos'], dados['total_enviados']), (2, 1))
+        self.assertEqual([feedback['id'] for feedback in dados['recebidos']], [recente.pk, antigo.pk])
+        self.assertEqual(dados['recebidos'][0]['emissor'], {
+            'id': self.colega.pk, 'username': 'colega', 'first_name': 'Bruno', 'last_name': 'Lima',
+        })
+        self.assertEqual(dados['recebidos'][0]['texto'], 'Segundo')
+
+    def test_exige_login(self):
+        response = self.client.get(URL_CAIXA)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response.headers)
 
-# Create your tests here.
+    def test_limite(self):
+        Feedback.objects.bulk_create([
+            Feedback(emissor=self.colega, receptor=self.usuario, texto=f'Feedback {n}') for n in range(110)
+        ])
+        for limite, esperado in ((None, 20), (3, 3), (500, 100), (-1, 0), ('abc', 20)):
+            with self.subTest(limite=limite):
+                dados = self.caixa(**({} if limite is None else {'limite': limite}))
+                self.assertEqual(len(dados['recebidos']), esperado)
+                # Os totais não dependem do limite
+                self.assertEqual(dados['total_recebidos'], 110)
@@ -2,11 +2,13 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import FeedbackViewSet
+from .views import FeedbackViewSet, caixa_feedbacks
 
 router = DefaultRouter()
 router.register(r'feedbacks', FeedbackViewSet, basename='feedback')
 
 urlpatterns = [
+    # View assíncrona (ASGI) da tela inicial
+    path('caixa/', caixa_feedbacks, name='caixa-feedbacks'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,21 +1,73 @@
 # reune_app/feedback/views.py
 
+import asyncio
+
 from rest_framework import viewsets
 from .models import Feedback
 from .serializers import FeedbackSerializer # <-- A linha que causa o erro
+from django.contrib.auth.models import User
+from reune.assincrono import api_assincrona, ler_limite, listar
+from reune.mixins import ExportacaoMixin, MedicaoConsultasMixin, QuerysetOtimizadoMixin, RespostaCondicionalMixin
+from reune.politicas import Proprio
 
-class FeedbackViewSet(viewsets.ModelViewSet):
+class FeedbackViewSet(MedicaoConsultasMixin, ExportacaoMixin, RespostaCondicionalMixin, QuerysetOtimizadoMixin, viewsets.ModelViewSet):
     """
     API endpoint para enviar e visualizar feedbacks.
     """
     queryset = Feedback.objects.select_related('emissor', 'receptor').all()
     serializer_class = FeedbackSerializer
+    ordering = ('-data_criacao', '-id')
+    campos_validador = ('data_criacao',)
+    modelos_validador = (Feedback, User)
+    # Um feedback fica entre quem enviou e quem recebeu
+    politica_linhas = Proprio('emissor') | Proprio('receptor')
+    # Exportação em streaming: /api/feedback/feedbacks/export/?receptor_id=5&format=csv
+    nome_exportacao = 'feedbacks'
+    campos_exportacao = (
+        'id', 'emissor_id', 'emissor__username', 'receptor_id', 'receptor__username', 'texto', 'data_criacao',
+    )
+    filtros_exportacao = {
+        'emissor_id': 'emissor_id', 'receptor_id': 'receptor_id',
+        'inicio': 'data_criacao__date__gte', 'fim': 'data_criacao__date__lte',
+    }
 
     def perform_create(self, serializer):
-        # Quando tivermos segurança, o emissor será o usuário logado
-        # serializer.save(emissor=self.request.user)
-        
-        # Solução temporária:
-        from django.contrib.auth.models import User
-        primeiro_usuario = User.objects.first()
-        serializer.save(emissor=primeiro_usuario)
\ No newline at end of file
+        # O emissor é sempre o usuário logado, nunca um campo do corpo
+        serializer.save(emissor=self.request.user)
+
+
+@api_assincrona('feedback.caixa')
+async def caixa_feedbacks(request, usuario):
+    """
+    Caixa de entrada de feedbacks, numa única chamada assíncrona: os mais
+    recentes recebidos pelo usuário e os totais de recebidos e enviados.
+    Exemplo de URL: /api/feedback/caixa/?limite=20
+    """
+    limite = ler_limite(request, 20, 100)
+    recebidos, total_recebidos, total_enviados = await asyncio.gather(
+        listar(
+            Feedback.objects.filter(receptor_id=usuario.pk).order_by('-data_criacao', '-id').values(
+                'id', 'texto', 'data_criacao',
+                'emissor_id', 'emissor__username', 'emissor__first_name', 'emissor__last_name',
+            )[:limite]
+        ),
+        Feedback.objects.filter(receptor_id=usuario.pk).acount(),
+        Feedback.objects.filter(emissor_id=usuario.pk).acount(),
+    )
+    return {
+        'total_recebidos': total_recebidos,
+        'total_enviados': total_enviados,
+        'recebidos': [
+            {
+                'id': feedback['id'],
+                'emissor': {
+                    'id': feedback['emissor_id'],
+                    'username': feedback['emissor__username'],
+                    'first_name': feedback['emissor__first_name'],
+                    'last_name': feedback['emissor__last_name'],
+                },
+                'texto': feedback['texto'],
+                'data_criacao': feedback['data_criacao'],
+            } for feedback in recebidos
+        ],
+    }
@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class OkrConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'okr'
\ No newline at end of file
+    name = 'okr'
+
+    def ready(self):
+        # Registra os signals que versionam os models para os ETags
+        from . import signals  # noqa: F401
\ No newline at end of file
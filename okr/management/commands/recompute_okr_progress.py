@@ -0,0 +1,38 @@
+# reune_app/okr/management/commands/recompute_okr_progress.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from avaliacoes.models import CicloAvaliacao
+from okr.models import Objetivo, ResultadoChave
+from okr.progresso import TAMANHO_LOTE, reconstruir_progresso
+from okr.resumo import reconstruir_resumo_okr
+from reune.cache import invalidar_modelo
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula do zero as colunas de resumo e o progresso de todos os Resultados-Chave "
+        "(a partir do último check-in) e dos Objetivos (média dos KRs), em lotes. "
+        "Use --ciclo para limitar a um ciclo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ciclo', type=int, help="ID do ciclo de avaliação (padrão: todos).")
+        parser.add_argument('--batch-size', type=int, default=TAMANHO_LOTE, help="Ids por UPDATE.")
+
+    def handle(self, *args, **options):
+        ciclo_id = options['ciclo']
+        if ciclo_id is not None and not CicloAvaliacao.objects.filter(pk=ciclo_id).exists():
+            raise CommandError(f"Ciclo de avaliação com id={ciclo_id} não encontrado.")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size deve ser maior que zero.")
+
+        # O progresso parte do valor_atual do resumo: reconstrói o resumo antes
+        reconstruir_resumo_okr(ciclo_id, batch_size=options['batch_size'])
+        total_resultados, total_objetivos = reconstruir_progresso(ciclo_id, batch_size=options['batch_size'])
+        # update() não dispara signals: troca as versões usadas nos ETags
+        invalidar_modelo(ResultadoChave)
+        invalidar_modelo(Objetivo)
+        self.stdout.write(self.style.SUCCESS(
+            f"Progresso recalculado: {total_resultados} resultados-chave e {total_objetivos} objetivos."
+        ))
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avaliacoes', '0003_respostaavaliacao_resposta_avaliado_ciclo_idx'),
+        ('okr', '0003_objetivo_progresso'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='checkin',
+            index=models.Index(fields=['resultado_chave', '-data_checkin', '-id'], name='checkin_kr_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='objetivo',
+            index=models.Index(fields=['responsavel', '-data_criacao'], name='objetivo_resp_data_idx'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:35
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+
+
+def popular_resumo(apps, schema_editor):
+    # Preenche as colunas de resumo com os check-ins e KRs que já existem no banco
+    Objetivo = apps.get_model('okr', 'Objetivo')
+    ResultadoChave = apps.get_model('okr', 'ResultadoChave')
+    CheckIn = apps.get_model('okr', 'CheckIn')
+
+    ultimo = CheckIn.objects.filter(resultado_chave=OuterRef('pk')).order_by('-data_checkin', '-id')
+    total_checkins = (
+        CheckIn.objects.filter(resultado_chave=OuterRef('pk')).order_by()
+        .values('resultado_chave').annotate(total=Count('id')).values('total')
+    )
+    ResultadoChave.objects.update(
+        num_checkins=Coalesce(Subquery(total_checkins), Value(0)),
+        ultimo_checkin_em=Subquery(ultimo.values('data_checkin')[:1]),
+        ultima_nota_confianca=Subquery(ultimo.values('nota_confianca')[:1]),
+        valor_atual=Subquery(ultimo.values('valor_atual')[:1]),
+    )
+
+    decimal = models.DecimalField(max_digits=3, decimal_places=2)
+    resultados = ResultadoChave.objects.filter(objetivo=OuterRef('pk')).order_by().values('objetivo')
+    Objetivo.objects.update(
+        num_resultados=Coalesce(Subquery(resultados.annotate(total=Count('id')).values('total')), Value(0)),
+        confianca_media=Subquery(
+            resultados.annotate(media=Avg(Cast('ultima_nota_confianca', decimal))).values('media'), output_field=decimal
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('okr', '0004_checkin_kr_data_idx_objetivo_resp_data_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='objetivo',
+            name='confianca_media',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=3, null=True, verbose_name='Confiança Média'),
+        ),
+        migrations.AddField(
+            model_name='objetivo',
+            name='num_resultados',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Número de Resultados-Chave'),
+        ),
+        migrations.AddField(
+            model_name='resultadochave',
+            name='num_checkins',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Número de Check-ins'),
+        ),
+        migrations.AddField(
+            model_name='resultadochave',
+            name='ultima_nota_confianca',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='Última Nota de Confiança'),
+        ),
+        migrations.AddField(
+            model_name='resultadochave',
+            name='ultimo_checkin_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Último Check-in'),
+        ),
+        migrations.AddField(
+            model_name='resultadochave',
+            name='valor_atual',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=18, null=True, verbose_name='Valor Atual'),
+        ),
+        migrations.RunPython(popular_resumo, migrations.RunPython.noop),
+    ]
@@ -5,8 +5,25 @@ from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from avaliacoes.models import CicloAvaliacao # Importa o ciclo de outro app
 
+
+class ColunasResumoMixin:
+    """
+    As colunas em `campos_resumo` são mantidas só por UPDATEs com F() (ver
+    okr/resumo.py). O save() de uma instância já existente não as grava, para
+    que uma cópia carregada antes de um check-in não apague o resumo.
+    """
+    campos_resumo = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.campos_resumo
+            ]
+        super().save(*args, **kwargs)
+
 # Modelo para os Objetivos
-class Objetivo(models.Model):
+class Objetivo(ColunasResumoMixin, models.Model):
     titulo = models.CharField(max_length=500, verbose_name="Título do Objetivo")
     descricao = models.TextField(blank=True, null=True, verbose_name="Descrição")
     responsavel = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Responsável")
@@ -14,18 +31,28 @@ class Objetivo(models.Model):
     ciclo = models.ForeignKey(CicloAvaliacao, on_delete=models.CASCADE, verbose_name="Ciclo")
     data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Criação")
     progresso = models.DecimalField(max_digits=5, decimal_places=2, default=0.0, verbose_name="Progresso (%)")
+    # Resumo mantido pelos signals (ver okr/resumo.py), sem consultar os KRs
+    num_resultados = models.PositiveIntegerField(default=0, editable=False, verbose_name="Número de Resultados-Chave")
+    confianca_media = models.DecimalField(
+        max_digits=3, decimal_places=2, null=True, blank=True, editable=False, verbose_name="Confiança Média"
+    )
+    campos_resumo = ('num_resultados', 'confianca_media')
 
     
     class Meta:
         verbose_name = "Objetivo"
         verbose_name_plural = "Objetivos"
         ordering = ['-data_criacao']
+        indexes = [
+            # Listagem filtrada pela visibilidade (responsavel IN ...), mais recentes primeiro
+            models.Index(fields=['responsavel', '-data_criacao'], name='objetivo_resp_data_idx'),
+        ]
 
     def __str__(self):
         return self.titulo
 
 # Modelo para os Resultados-Chave de um Objetivo
-class ResultadoChave(models.Model):
+class ResultadoChave(ColunasResumoMixin, models.Model):
     class TipoChoices(models.TextChoices):
         PERCENTUAL = 'Percentual', '%'
         FINANCEIRO = 'Financeiro', 'R$'
@@ -37,6 +64,16 @@ class ResultadoChave(models.Model):
     valor_inicial = models.DecimalField(max_digits=18, decimal_places=2, default=0.0, verbose_name="Valor Inicial")
     valor_alvo = models.DecimalField(max_digits=18, decimal_places=2, verbose_name="Valor Alvo")
     progresso = models.DecimalField(max_digits=5, decimal_places=2, default=0.0, verbose_name="Progresso (%)")
+    # Resumo dos check-ins mantido pelos signals (ver okr/resumo.py); sem check-ins os campos do último ficam nulos
+    num_checkins = models.PositiveIntegerField(default=0, editable=False, verbose_name="Número de Check-ins")
+    ultimo_checkin_em = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Último Check-in")
+    ultima_nota_confianca = models.PositiveSmallIntegerField(
+        null=True, blank=True, editable=False, verbose_name="Última Nota de Confiança"
+    )
+    valor_atual = models.DecimalField(
+        max_digits=18, decimal_places=2, null=True, blank=True, editable=False, verbose_name="Valor Atual"
+    )
+    campos_resumo = ('num_checkins', 'ultimo_checkin_em', 'ultima_nota_confianca', 'valor_atual')
 
     class Meta:
         verbose_name = "Resultado-Chave"
@@ -53,6 +90,13 @@ class ResultadoChave(models.Model):
     def __str__(self):
         return self.descricao
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Guarda os valores carregados para que os signals saibam se o alvo mudou
+        instance = super().from_db(db, field_names, values)
+        instance._valores_originais = dict(zip(field_names, values))
+        return instance
+
 # Modelo para os Check-ins de progresso de um Resultado-Chave
 class CheckIn(models.Model):
     resultado_chave = models.ForeignKey(ResultadoChave, related_name='checkins', on_delete=models.CASCADE, verbose_name="Resultado-Chave")
@@ -70,6 +114,10 @@ class CheckIn(models.Model):
         verbose_name = "Check-in"
         verbose_name_plural = "Check-ins"
         ordering = ['-data_checkin']
+        indexes = [
+            # Histórico de um KR e os últimos N check-ins por KR (ROW_NUMBER), do mais recente
+            models.Index(fields=['resultado_chave', '-data_checkin', '-id'], name='checkin_kr_data_idx'),
+        ]
 
     def __str__(self):
         return f"Check-in de {self.colaborador} em {self.data_checkin.strftime('%d/%m/%Y')}"
\ No newline at end of file
@@ -15,4 +15,5 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
 
         # Permissões de escrita (PUT, PATCH, DELETE) só são permitidas
         # se o 'responsavel' pelo objeto for o mesmo usuário que fez a requisição.
-        return obj.responsavel == request.user
\ No newline at end of file
+        # Compara os IDs para não buscar o usuário responsável no banco.
+        return obj.responsavel_id == request.user.pk
\ No newline at end of file
@@ -0,0 +1,112 @@
+# reune_app/okr/progresso.py
+
+from decimal import Decimal
+from itertools import islice
+
+from django.db.models import Avg, Case, DecimalField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import Objetivo, ResultadoChave
+
+# Ids por UPDATE: o CASE usa 2 parâmetros por KR e o SQL Server aceita ~2100
+TAMANHO_LOTE = 500
+
+
+def calcular_progresso(valor_inicial, valor_alvo, valor_atual):
+    """
+    Calcula o progresso (0 a 100) de um Resultado-Chave a partir do valor atual.
+    """
+    try:
+        range_total = valor_alvo - valor_inicial
+        range_atual = valor_atual - valor_inicial
+        if range_total == 0:
+            progresso = Decimal('100.00') if range_atual >= 0 else Decimal('0.00')
+        else:
+            progresso = (range_atual / range_total) * 100
+        return max(Decimal('0.00'), min(progresso, Decimal('100.00'))).quantize(Decimal('0.01'))
+    except (ValueError, TypeError):
+        return Decimal('0.00')
+
+
+def atualizar_progresso_resultados(progressos):
+    """
+    Grava o progresso de vários Resultados-Chave com um único UPDATE.
+    `progressos` é um dicionário {id_do_resultado_chave: progresso}.
+    """
+    if not progressos:
+        return 0
+    return ResultadoChave.objects.filter(pk__in=progressos.keys()).update(
+        progresso=Case(
+            *[When(pk=pk, then=Value(valor)) for pk, valor in progressos.items()],
+            output_field=DecimalField(max_digits=5, decimal_places=2),
+        )
+    )
+
+
+def recalcular_progresso_objetivos(objetivo_ids):
+    """
+    Recalcula o progresso (média dos KRs) de vários Objetivos com um único UPDATE,
+    usando uma subquery correlacionada em vez de um aggregate por objetivo.
+    """
+    media_krs = (
+        ResultadoChave.objects.filter(objetivo=OuterRef('pk'))
+        .order_by()
+        .values('objetivo')
+        .annotate(media=Avg('progresso'))
+        .values('media')
+    )
+    return Objetivo.objects.filter(pk__in=objetivo_ids).update(
+        progresso=Coalesce(
+            Subquery(media_krs, output_field=DecimalField(max_digits=5, decimal_places=2)),
+            Value(Decimal('0.00')),
+            output_field=DecimalField(max_digits=5, decimal_places=2),
+        )
+    )
+
+
+def recalcular_progresso_resultados(resultado_ids):
+    """
+    Recalcula o progresso de vários Resultados-Chave a partir do valor do
+    check-in mais recente de cada um, já guardado em ResultadoChave.valor_atual
+    (sem check-ins, vale o valor inicial): uma consulta e um UPDATE, sem ler os
+    check-ins. Retorna os ids dos Objetivos desses KRs, que também precisam ser recalculados.
+    """
+    linhas = ResultadoChave.objects.filter(pk__in=resultado_ids).values_list(
+        'pk', 'objetivo_id', 'valor_inicial', 'valor_alvo', 'valor_atual'
+    )
+
+    progressos, objetivo_ids = {}, set()
+    for pk, objetivo_id, valor_inicial, valor_alvo, valor_atual in linhas:
+        if valor_atual is None:
+            valor_atual = valor_inicial
+        progressos[pk] = calcular_progresso(valor_inicial, valor_alvo, valor_atual)
+        objetivo_ids.add(objetivo_id)
+    atualizar_progresso_resultados(progressos)
+    return objetivo_ids
+
+
+def em_lotes(ids, tamanho=TAMANHO_LOTE):
+    iterador = iter(ids)
+    while lote := list(islice(iterador, tamanho)):
+        yield lote
+
+
+def reconstruir_progresso(ciclo_id=None, batch_size=TAMANHO_LOTE):
+    """
+    Recalcula do zero o progresso de todos os KRs e Objetivos (de um ciclo, se
+    informado), em lotes. Retorna (KRs recalculados, Objetivos recalculados).
+    """
+    resultados = ResultadoChave.objects.order_by('pk')
+    objetivos = Objetivo.objects.order_by('pk')
+    if ciclo_id is not None:
+        resultados = resultados.filter(objetivo__ciclo_id=ciclo_id)
+        objetivos = objetivos.filter(ciclo_id=ciclo_id)
+
+    total_resultados = total_objetivos = 0
+    for lote in em_lotes(resultados.values_list('pk', flat=True).iterator(chunk_size=batch_size), batch_size):
+        recalcular_progresso_resultados(lote)
+        total_resultados += len(lote)
+    # Todos os objetivos, inclusive os que ficaram sem KRs (progresso 0)
+    for lote in em_lotes(objetivos.values_list('pk', flat=True).iterator(chunk_size=batch_size), batch_size):
+        total_objetivos += recalcular_progresso_objetivos(lote)
+    return total_resultados, total_objetivos
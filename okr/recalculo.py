@@ -0,0 +1,105 @@
+# reune_app/okr/recalculo.py
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from reune.cache import invalidar_modelo
+from .models import Objetivo, ResultadoChave
+from .progresso import em_lotes, recalcular_progresso_objetivos, recalcular_progresso_resultados
+
+logger = logging.getLogger(__name__)
+
+
+class FilaRecalculo:
+    """
+    Fila local (no processo) para recalcular o progresso de KRs e Objetivos fora
+    da requisição. Os signals marcam o que ficou desatualizado; depois do commit
+    os ids entram em dois conjuntos e uma única thread de fundo recalcula tudo o
+    que estiver pendente, em lotes (ver okr/progresso.py).
+
+    Como são conjuntos, vários check-ins no mesmo KR antes do processamento
+    geram um único recálculo, e a `espera` junta as gravações de requisições
+    próximas numa rodada só.
+
+    Com settings.OKR_RECALCULO_SINCRONO = True o recálculo roda logo no commit,
+    na própria thread (útil em testes e scripts).
+    """
+
+    def __init__(self, espera=0.2, tamanho_lote=500):
+        self.espera = espera
+        self.tamanho_lote = tamanho_lote
+        self._trava = threading.Lock()
+        self._resultados = set()
+        self._objetivos = set()
+        self._agendada = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='recalculo-okr')
+
+    def marcar(self, resultados=(), objetivos=()):
+        """
+        Marca KRs e Objetivos para recálculo quando a transação atual for
+        confirmada. Num rollback nada é marcado, e a thread nunca lê o banco
+        antes das alterações estarem visíveis.
+        """
+        resultados, objetivos = set(resultados), set(objetivos)
+        if resultados or objetivos:
+            transaction.on_commit(lambda: self._enfileirar(resultados, objetivos))
+
+    def _enfileirar(self, resultados, objetivos):
+        sincrono = getattr(settings, 'OKR_RECALCULO_SINCRONO', False)
+        with self._trava:
+            self._resultados |= resultados
+            self._objetivos |= objetivos
+            # Uma rodada já agendada vai pegar estes ids também
+            agendar = not sincrono and not self._agendada
+            if agendar:
+                self._agendada = True
+        if sincrono:
+            self.processar()
+        elif agendar:
+            self._executor.submit(self._executar)
+
+    def _executar(self):
+        time.sleep(self.espera)
+        with self._trava:
+            self._agendada = False
+        try:
+            self.processar()
+        except Exception:
+            logger.exception("Falha ao recalcular o progresso dos OKRs.")
+        finally:
+            # Fecha as conexões abertas por esta thread
+            connections.close_all()
+
+    def processar(self):
+        """
+        Recalcula tudo o que está pendente e retorna (KRs, Objetivos) recalculados.
+        """
+        with self._trava:
+            resultados, self._resultados = self._resultados, set()
+            objetivos, self._objetivos = self._objetivos, set()
+        if not resultados and not objetivos:
+            return 0, 0
+
+        for lote in em_lotes(sorted(resultados), self.tamanho_lote):
+            objetivos |= recalcular_progresso_resultados(lote)
+        for lote in em_lotes(sorted(objetivos), self.tamanho_lote):
+            recalcular_progresso_objetivos(lote)
+        # update() não dispara signals: troca as versões usadas nos ETags aqui
+        invalidar_modelo(ResultadoChave)
+        invalidar_modelo(Objetivo)
+        return len(resultados), len(objetivos)
+
+    def aguardar(self):
+        """
+        Bloqueia até a thread terminar o que já foi agendado.
+        """
+        # Uma thread só, em ordem: quando esta tarefa vazia roda, as anteriores acabaram
+        self._executor.submit(lambda: None).result()
+
+
+fila = FilaRecalculo()
@@ -0,0 +1,133 @@
+# reune_app/okr/resumo.py
+
+from collections import Counter, defaultdict
+
+from django.db.models import Avg, Count, DecimalField, F, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+
+from .models import CheckIn, Objetivo, ResultadoChave
+from .progresso import TAMANHO_LOTE, em_lotes
+
+# Colunas de resumo mantidas em ResultadoChave e Objetivo (ver okr/models.py), para
+# que as listagens mostrem "último check-in" e "confiança" sem ler a tabela de CheckIn
+
+
+def _ultimo_checkin():
+    """
+    Subqueries com os dados do check-in mais recente de cada KR (índice
+    checkin_kr_data_idx). Sem check-ins, todas voltam NULL.
+    """
+    ultimo = CheckIn.objects.filter(resultado_chave=OuterRef('pk')).order_by('-data_checkin', '-id')
+    return {
+        'ultimo_checkin_em': Subquery(ultimo.values('data_checkin')[:1]),
+        'ultima_nota_confianca': Subquery(ultimo.values('nota_confianca')[:1]),
+        'valor_atual': Subquery(ultimo.values('valor_atual')[:1]),
+    }
+
+
+def atualizar_confianca_objetivos(objetivo_ids):
+    """
+    Recalcula a confiança média (média da última nota de cada KR) de vários
+    Objetivos com um único UPDATE.
+    """
+    decimal = DecimalField(max_digits=3, decimal_places=2)
+    media = (
+        ResultadoChave.objects.filter(objetivo=OuterRef('pk'))
+        .order_by()
+        .values('objetivo')
+        # Sem o CAST o SQL Server faz a média de inteiros com divisão inteira
+        .annotate(media=Avg(Cast('ultima_nota_confianca', decimal)))
+        .values('media')
+    )
+    return Objetivo.objects.filter(pk__in=objetivo_ids).update(confianca_media=Subquery(media, output_field=decimal))
+
+
+def _aplicar_checkins(checkins, sinal):
+    # KRs com a mesma quantidade de check-ins somam o mesmo delta: um UPDATE por grupo
+    por_quantidade = defaultdict(list)
+    for resultado_id, quantidade in Counter(checkin.resultado_chave_id for checkin in checkins).items():
+        por_quantidade[quantidade].append(resultado_id)
+
+    for quantidade, resultado_ids in por_quantidade.items():
+        for lote in em_lotes(resultado_ids, TAMANHO_LOTE):
+            ResultadoChave.objects.filter(pk__in=lote).update(
+                num_checkins=F('num_checkins') + sinal * quantidade, **_ultimo_checkin()
+            )
+
+    resultado_ids = {checkin.resultado_chave_id for checkin in checkins}
+    objetivo_ids = set(ResultadoChave.objects.filter(pk__in=resultado_ids).values_list('objetivo_id', flat=True))
+    atualizar_confianca_objetivos(objetivo_ids)
+
+
+def registrar_checkins(checkins):
+    """
+    Atualiza os resumos depois de check-ins criados (um só pelo signal, vários
+    pelo endpoint em lote): num_checkins sobe com F() e os campos do último
+    check-in são relidos no mesmo UPDATE, então gravações concorrentes não se perdem.
+    """
+    if checkins:
+        _aplicar_checkins(checkins, 1)
+
+
+def remover_checkins(checkins):
+    """
+    Atualiza os resumos depois de check-ins excluídos: o último check-in
+    passa a ser o mais recente que sobrou.
+    """
+    if checkins:
+        _aplicar_checkins(checkins, -1)
+
+
+def atualizar_checkins(checkins):
+    """
+    Atualiza os resumos depois de check-ins editados: a contagem não muda,
+    só os campos do último check-in são relidos.
+    """
+    if checkins:
+        _aplicar_checkins(checkins, 0)
+
+
+def somar_resultados(objetivo_id, delta):
+    """
+    Soma `delta` ao num_resultados de um Objetivo e recalcula a confiança média.
+    """
+    Objetivo.objects.filter(pk=objetivo_id).update(num_resultados=F('num_resultados') + delta)
+    atualizar_confianca_objetivos([objetivo_id])
+
+
+def reconstruir_resumo_okr(ciclo_id=None, batch_size=TAMANHO_LOTE):
+    """
+    Recalcula do zero as colunas de resumo de KRs e Objetivos (de um ciclo, se
+    informado), em lotes. Usado pelo recompute_okr_progress e depois de cargas
+    com bulk_create. Retorna (KRs, Objetivos) atualizados.
+    """
+    resultados = ResultadoChave.objects.order_by('pk')
+    objetivos = Objetivo.objects.order_by('pk')
+    if ciclo_id is not None:
+        resultados = resultados.filter(objetivo__ciclo_id=ciclo_id)
+        objetivos = objetivos.filter(ciclo_id=ciclo_id)
+
+    total_checkins = (
+        CheckIn.objects.filter(resultado_chave=OuterRef('pk'))
+        .order_by()
+        .values('resultado_chave')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    total_resultados = (
+        ResultadoChave.objects.filter(objetivo=OuterRef('pk'))
+        .order_by()
+        .values('objetivo')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+
+    total_krs = total_objetivos = 0
+    for lote in em_lotes(resultados.values_list('pk', flat=True).iterator(chunk_size=batch_size), batch_size):
+        total_krs += ResultadoChave.objects.filter(pk__in=lote).update(
+            num_checkins=Coalesce(Subquery(total_checkins), Value(0)), **_ultimo_checkin()
+        )
+    for lote in em_lotes(objetivos.values_list('pk', flat=True).iterator(chunk_size=batch_size), batch_size):
+        Objetivo.objects.filter(pk__in=lote).update(num_resultados=Coalesce(Subquery(total_resultados), Value(0)))
+        total_objetivos += atualizar_confianca_objetivos(lote)
+    return total_krs, total_objetivos
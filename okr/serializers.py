@@ -5,58 +5,54 @@ from .models import Objetivo, ResultadoChave, CheckIn
 
 # Importando o UserSerializer do app de usuarios para reutilizá-lo
 from usuarios.serializers import UserSerializer
+from reune.serializers import DynamicFieldsMixin
 
-class CheckInSerializer(serializers.ModelSerializer):
+class CheckInSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # Mostra os dados do colaborador ao invés de apenas o ID
     colaborador = UserSerializer(read_only=True)
 
     class Meta:
         model = CheckIn
-        fields = ['id', 'valor_atual', 'nota_confianca', 'comentario', 'data_checkin', 'colaborador']
-        # Definimos campos que podem ser preenchidos ao criar um novo check-in via API
+        fields = ['id', 'resultado_chave', 'valor_atual', 'nota_confianca', 'comentario', 'data_checkin', 'colaborador']
+        # O colaborador é sempre o usuário logado
         extra_kwargs = {
-            'colaborador': {'read_only': True} # O colaborador será o usuário logado, futuramente
+            'colaborador': {'read_only': True}
         }
 
 
-class ResultadoChaveSerializer(serializers.ModelSerializer):
+class ResultadoChaveSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # Aninhando os check-ins dentro de cada resultado-chave
     checkins = CheckInSerializer(many=True, read_only=True)
 
     class Meta:
         model = ResultadoChave
-        fields = ['id', 'descricao', 'tipo', 'valor_inicial', 'valor_alvo', 'checkins']
+        fields = [
+            'id', 'objetivo', 'descricao', 'tipo', 'valor_inicial', 'valor_alvo', 'progresso',
+            'num_checkins', 'ultimo_checkin_em', 'ultima_nota_confianca', 'valor_atual', 'checkins',
+        ]
+        # O progresso e o resumo dos check-ins são apenas leitura, pois são calculados automaticamente
+        read_only_fields = ['progresso', 'num_checkins', 'ultimo_checkin_em', 'ultima_nota_confianca', 'valor_atual']
 
 
-class ObjetivoSerializer(serializers.ModelSerializer):
+class ObjetivoSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # Aninhando os resultados-chave e mostrando os dados do responsável
     resultados_chave = ResultadoChaveSerializer(many=True, read_only=True)
     responsavel = UserSerializer(read_only=True)
 
     class Meta:
         model = Objetivo
-        fields = ['id', 'titulo', 'descricao', 'ciclo', 'data_criacao', 'responsavel', 'resultados_chave']
-        read_only_fields = ['progresso']
-
-        # reune_app/okr/serializers.py
-
-class CheckInSerializer(serializers.ModelSerializer):
-    colaborador = UserSerializer(read_only=True)
-
-    class Meta:
-        model = CheckIn
-        # AQUI ESTÁ A CORREÇÃO: Adicionamos 'resultado_chave' à lista
-        fields = ['id', 'resultado_chave', 'valor_atual', 'nota_confianca', 'comentario', 'data_checkin', 'colaborador']
-        extra_kwargs = {
-            'colaborador': {'read_only': True}
-        }
-
-class ResultadoChaveSerializer(serializers.ModelSerializer):
-    checkins = CheckInSerializer(many=True, read_only=True)
-
-    class Meta:
-        model = ResultadoChave
-        # ADICIONE 'progresso' À LISTA ABAIXO
-        fields = ['id', 'descricao', 'tipo', 'valor_inicial', 'valor_alvo', 'progresso', 'checkins']
-        # O campo progresso será apenas para leitura, pois é calculado automaticamente
-        read_only_fields = ['progresso']
\ No newline at end of file
+        fields = [
+            'id', 'titulo', 'descricao', 'ciclo', 'data_criacao', 'progresso', 'num_resultados', 'confianca_media',
+            'responsavel', 'resultados_chave',
+        ]
+        read_only_fields = ['progresso', 'num_resultados', 'confianca_media']
+
+class CheckInLoteSerializer(serializers.Serializer):
+    """
+    Um item do envio em lote de check-ins. O resultado-chave chega como ID simples
+    e é validado de uma vez só na view, evitando uma consulta por item.
+    """
+    resultado_chave = serializers.IntegerField()
+    valor_atual = serializers.DecimalField(max_digits=18, decimal_places=2)
+    nota_confianca = serializers.IntegerField(min_value=1, max_value=5)
+    comentario = serializers.CharField()
\ No newline at end of file
@@ -0,0 +1,130 @@
+# reune_app/okr/signals.py
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from avaliacoes.models import CicloAvaliacao
+from reune.cache import versionar_modelos
+from reune.eventos import canal
+from usuarios.visibilidade import usuarios_que_veem
+from .models import CheckIn, Objetivo, ResultadoChave
+from .recalculo import fila
+from .resumo import atualizar_checkins, registrar_checkins, remover_checkins, somar_resultados
+
+# Versões usadas pelos ETags das APIs de OKR (ver reune/cache.py)
+versionar_modelos(Objetivo, ResultadoChave, CheckIn)
+
+
+def publicar_checkins(checkins):
+    """
+    Publica 'checkin.criado' para o autor de cada check-in e para quem vê o
+    objetivo (o responsável e os líderes acima dele), depois do commit. Usado
+    pelo signal e pelo endpoint em lote, já que bulk_create não dispara signals.
+    """
+    checkins = list(checkins)
+
+    def publicar():
+        kr_ids = {checkin.resultado_chave_id for checkin in checkins}
+        resultados = {
+            pk: (objetivo_id, responsavel_id) for pk, objetivo_id, responsavel_id in
+            ResultadoChave.objects.filter(pk__in=kr_ids).values_list('pk', 'objetivo_id', 'objetivo__responsavel_id')
+        }
+        interessados = {}
+        for checkin in checkins:
+            objetivo_id, responsavel_id = resultados[checkin.resultado_chave_id]
+            if responsavel_id not in interessados:
+                interessados[responsavel_id] = usuarios_que_veem(responsavel_id)
+            canal.publicar('checkin.criado', {
+                'id': checkin.pk,
+                'resultado_chave_id': checkin.resultado_chave_id,
+                'objetivo_id': objetivo_id,
+                'colaborador_id': checkin.colaborador_id,
+                'valor_atual': checkin.valor_atual,
+                'data_checkin': checkin.data_checkin,
+            }, interessados[responsavel_id] | {checkin.colaborador_id})
+
+    transaction.on_commit(publicar)
+
+
+@receiver(post_save, sender=CheckIn)
+def publicar_checkin(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        publicar_checkins([instance])
+
+
+# Colunas de resumo (ver okr/resumo.py): atualizadas na mesma transação da gravação
+
+@receiver(post_save, sender=CheckIn)
+def resumir_checkin_salvo(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        registrar_checkins([instance])
+    else:
+        atualizar_checkins([instance])
+
+
+def excluido_em_cascata(origin, *modelos):
+    """
+    Se a exclusão partiu de uma instância (ou queryset) de um dos `modelos`, o
+    pai também está sendo excluído e não adianta atualizar o resumo dele.
+    """
+    modelo = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(modelo, modelos)
+
+
+@receiver(post_delete, sender=CheckIn)
+def resumir_checkin_excluido(sender, instance, origin=None, **kwargs):
+    # Excluir um KR com N check-ins não faz N atualizações do próprio KR
+    if not excluido_em_cascata(origin, ResultadoChave, Objetivo, CicloAvaliacao):
+        remover_checkins([instance])
+
+
+# Definido antes de marcar_resultado_alterado, que atualiza os _valores_originais
+@receiver(post_save, sender=ResultadoChave)
+def contar_resultado_salvo(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    anterior = (getattr(instance, '_valores_originais', None) or {}).get('objetivo_id')
+    if created:
+        somar_resultados(instance.objetivo_id, 1)
+    elif anterior is not None and anterior != instance.objetivo_id:
+        somar_resultados(anterior, -1)
+        somar_resultados(instance.objetivo_id, 1)
+
+
+@receiver(post_delete, sender=ResultadoChave)
+def contar_resultado_excluido(sender, instance, origin=None, **kwargs):
+    if not excluido_em_cascata(origin, Objetivo, CicloAvaliacao):
+        somar_resultados(instance.objetivo_id, -1)
+
+
+# Recálculo do progresso (ver okr/recalculo.py): qualquer check-in, KR ou alvo
+# alterado marca o que precisa ser recalculado, fora da requisição
+
+@receiver(post_save, sender=CheckIn)
+@receiver(post_delete, sender=CheckIn)
+def marcar_resultado_do_checkin(sender, instance, raw=False, **kwargs):
+    if not raw:
+        fila.marcar(resultados=[instance.resultado_chave_id])
+
+
+@receiver(post_save, sender=ResultadoChave)
+def marcar_resultado_alterado(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    originais = getattr(instance, '_valores_originais', None) or {}
+    campos = ('objetivo_id', 'valor_inicial', 'valor_alvo')
+    if not created and all(campo in originais and originais[campo] == getattr(instance, campo) for campo in campos):
+        return
+    # Se o KR mudou de objetivo, o antigo também precisa da nova média
+    objetivos = {originais['objetivo_id']} if originais.get('objetivo_id') else set()
+    fila.marcar(resultados=[instance.pk], objetivos=objetivos)
+    instance._valores_originais = {**originais, **{campo: getattr(instance, campo) for campo in campos}}
+
+
+@receiver(post_delete, sender=ResultadoChave)
+def marcar_objetivo_do_resultado(sender, instance, **kwargs):
+    fila.marcar(objetivos=[instance.objetivo_id])
@@ -0,0 +1,299 @@
+# reune_app/okr/tests.py
+
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from avaliacoes.models import CicloAvaliacao
+from busca.indice import Tipo
+from busca.models import DocumentoBusca
+from reune.orcamento_consultas import OrcamentoConsultasMixin
+from .models import CheckIn, Objetivo, ResultadoChave
+from .views import CheckInViewSet
+
+URL_LOTE = '/api/okr/checkins/bulk/'
+URL_PAINEL = '/api/okr/painel/'
+
+
+@override_settings(OKR_RECALCULO_SINCRONO=True)
+class CheckInLoteTests(OrcamentoConsultasMixin, APITestCase):
+    """
+    POST /api/okr/checkins/bulk/: vários check-ins numa transação, com o resumo
+    e o progresso dos KRs e Objetivos atualizados depois do bulk_create.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='usuario')
+        ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+        cls.objetivo = Objetivo.objects.create(titulo='Objetivo', responsavel=cls.usuario, ciclo=ciclo)
+        cls.primeiro, cls.segundo = [
+            ResultadoChave.objects.create(
+                objetivo=cls.objetivo, descricao=f'KR {n}', tipo='Numérico', valor_inicial=0, valor_alvo=10
+            ) for n in range(2)
+        ]
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.usuario)
+
+    def checkin(self, resultado, valor, nota=4):
+        return {'resultado_chave': resultado.pk, 'valor_atual': str(valor), 'nota_confianca': nota, 'comentario': 'ok'}
+
+    def enviar(self, itens):
+        # O recálculo do progresso roda no commit (OKR_RECALCULO_SINCRONO)
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(URL_LOTE, itens, format='json')
+
+    def test_lote_atualiza_resumo_e_progresso(self):
+        response = self.enviar([
+            self.checkin(self.primeiro, 3, 2), self.checkin(self.primeiro, 7, 4), self.checkin(self.segundo, 5, 5),
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(set(CheckIn.objects.values_list('colaborador_id', flat=True)), {self.usuario.pk})
+
+        self.primeiro.refresh_from_db()
+        self.segundo.refresh_from_db()
+        self.objetivo.refresh_from_db()
+        # O último check-in de cada KR define o valor atual e o progresso
+        self.assertEqual(
+            (self.primeiro.num_checkins, str(self.primeiro.valor_atual), str(self.primeiro.progresso)), (2, '7.00', '70.00')
+        )
+        self.assertEqual((self.segundo.num_checkins, str(self.segundo.progresso)), (1, '50.00'))
+        self.assertEqual((str(self.objetivo.progresso), str(self.objetivo.confianca_media)), ('60.00', '4.50'))
+
+    def test_limite_e_formato_do_lote(self):
+        excesso = [self.checkin(self.primeiro, 1)] * (CheckInViewSet.LIMITE_LOTE + 1)
+        for corpo in (excesso, [], {'resultado_chave': self.primeiro.pk}):
+            with self.subTest(corpo=type(corpo).__name__, tamanho=len(corpo)):
+                response = self.enviar(corpo)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
+        self.assertFalse(CheckIn.objects.exists())
+
+    def test_resultado_inexistente_nao_grava_nada(self):
+        inexistente = ResultadoChave(pk=self.segundo.pk + 100)
+        response = self.enviar([self.checkin(self.primeiro, 5), self.checkin(inexistente, 5)])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(inexistente.pk), response.data['error'])
+        self.assertFalse(CheckIn.objects.exists())
+        self.primeiro.refresh_from_db()
+        self.assertEqual((self.primeiro.num_checkins, self.primeiro.valor_atual), (0, None))
+
+        # Item inválido: o serializer recusa o lote inteiro
+        response = self.enviar([self.checkin(self.primeiro, 5), self.checkin(self.segundo, 'x')])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(CheckIn.objects.exists())
+
+    def test_consultas_nao_crescem_com_o_lote(self):
+        _, pequeno = self.contar_consultas(URL_LOTE, 'post', data=[self.checkin(self.primeiro, 1)] * 2, format='json')
+        itens = [self.checkin(resultado, n) for n in range(10) for resultado in (self.primeiro, self.segundo)]
+        response, grande = self.contar_consultas(URL_LOTE, 'post', data=itens, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(grande), len(pequeno), '\n'.join(grande))
+
+
+class ExclusaoEmCascataTests(TestCase):
+    """
+    Excluir um KR ou Objetivo apaga os check-ins em cascata sem atualizar, a
+    cada check-in, o resumo de um pai que também está sendo excluído.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='usuario')
+        cls.ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+
+    def objetivo_com_checkins(self, quantidade):
+        objetivo = Objetivo.objects.create(titulo='Objetivo', responsavel=self.usuario, ciclo=self.ciclo)
+        resultados = [
+            ResultadoChave.objects.create(
+                objetivo=objetivo, descricao=f'KR {n}', tipo='Numérico', valor_inicial=0, valor_alvo=10
+            ) for n in range(2)
+        ]
+        for n, resultado in enumerate(resultados):
+            for _ in range(quantidade):
+                CheckIn.objects.create(
+                    resultado_chave=resultado, colaborador=self.usuario, valor_atual=1, nota_confianca=2 + n, comentario='ok'
+                )
+        return objetivo, resultados
+
+    def consultas_ao_excluir(self, instancia):
+        with CaptureQueriesContext(connection) as consultas:
+            instancia.delete()
+        return len(consultas)
+
+    def assertIndiceSoComCheckinsExistentes(self):
+        indexados = DocumentoBusca.objects.filter(tipo=Tipo.CHECKIN).values_list('objeto_id', flat=True)
+        self.assertEqual(set(indexados), set(CheckIn.objects.values_list('pk', flat=True)))
+
+    def test_excluir_resultado(self):
+        objetivo, (resultado, restante) = self.objetivo_com_checkins(2)
+        pequeno = self.consultas_ao_excluir(resultado)
+        _, (grande, _) = self.objetivo_com_checkins(20)
+        self.assertEqual(self.consultas_ao_excluir(grande), pequeno)
+
+        # O Objetivo continua com o resumo certo: só o KR que sobrou
+        objetivo.refresh_from_db()
+        self.assertEqual((objetivo.num_resultados, str(objetivo.confianca_media)), (1, '3.00'))
+        restante.refresh_from_db()
+        self.assertEqual(restante.num_checkins, 2)
+        self.assertIndiceSoComCheckinsExistentes()
+
+    def test_excluir_objetivo(self):
+        pequeno = self.consultas_ao_excluir(self.objetivo_com_checkins(2)[0])
+        self.assertEqual(self.consultas_ao_excluir(self.objetivo_com_checkins(20)[0]), pequeno)
+        self.assertFalse(CheckIn.objects.exists())
+        self.assertIndiceSoComCheckinsExistentes()
+
+    def test_excluir_checkin_atualiza_o_resultado(self):
+        _, (resultado, _) = self.objetivo_com_checkins(2)
+        resultado.checkins.first().delete()
+        resultado.refresh_from_db()
+        self.assertEqual(resultado.num_checkins, 1)
+
+
+class PainelObjetivosTests(TestCase):
+    """
+    GET /api/okr/painel/: o painel assíncrono da tela inicial, do ciclo ativo
+    mais recente ou do ciclo pedido em 'ciclo_id'.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='usuario')
+        cls.outro = User.objects.create(username='outro')
+        ativo = CicloAvaliacao.StatusChoices.ATIVO
+        CicloAvaliacao.objects.create(titulo='Antigo', data_inicio=date(2023, 1, 1), data_fim=date(2023, 6, 30), status=ativo)
+        cls.ciclo = CicloAvaliacao.objects.create(titulo='Atual', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30), status=ativo)
+        cls.planejado = CicloAvaliacao.objects.create(titulo='Próximo', data_inicio=date(2024, 7, 1), data_fim=date(2024, 12, 31))
+        cls.objetivo = Objetivo.objects.create(titulo='Objetivo', responsavel=cls.usuario, ciclo=cls.ciclo)
+        cls.resultado = ResultadoChave.objects.create(
+            objetivo=cls.objetivo, descricao='KR', tipo='Numérico', valor_inicial=0, valor_alvo=10
+        )
+        cls.checkin = CheckIn.objects.create(resultado_chave=cls.resultado, colaborador=cls.usuario, valor_atual=5, nota_confianca=4)
+        # Objetivo de outra pessoa, fora da visibilidade do usuário
+        Objetivo.objects.create(titulo='Alheio', responsavel=cls.outro, ciclo=cls.ciclo)
+
+    def setUp(self):
+        # A visibilidade fica em cache e os IDs se repetem entre os testes
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_login(self.usuario)
+
+    def painel(self, **params):
+        response = self.client.get(URL_PAINEL, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_painel_do_ciclo_ativo(self):
+        dados = self.painel()
+        self.assertEqual(dados['ciclo'], {'id': self.ciclo.pk, 'titulo': 'Atual', 'status': CicloAvaliacao.StatusChoices.ATIVO})
+        self.assertEqual(dados['resumo']['total'], 1)
+        self.assertEqual([objetivo['id'] for objetivo in dados['objetivos']], [self.objetivo.pk])
+        self.assertEqual([resultado['id'] for resultado in dados['objetivos'][0]['resultados_chave']], [self.resultado.pk])
+        self.assertEqual([checkin['id'] for checkin in dados['ultimos_checkins']], [self.checkin.pk])
+        self.assertEqual(dados['ultimos_checkins'][0]['resultado_chave__descricao'], 'KR')
+
+    def test_ciclo_pedido(self):
+        dados = self.painel(ciclo_id=self.planejado.pk)
+        self.assertEqual(dados['ciclo']['id'], self.planejado.pk)
+        self.assertEqual(dados['resumo'], {'total': 0, 'concluidos': 0, 'progresso_medio': None})
+        self.assertEqual(dados['objetivos'], [])
+
+    def test_ciclo_id_invalido(self):
+        response = self.client.get(URL_PAINEL, {'ciclo_id': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+        response = self.client.get(URL_PAINEL, {'ciclo_id': self.planejado.pk + 100})
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('error', response.json())
+
+    def test_exige_login(self):
+        self.client.logout()
+        response = self.client.get(URL_PAINEL)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response.headers)
+
+    def test_limite(self):
+        Objetivo.objects.bulk_create([
+            Objetivo(titulo=f'Objetivo {n}', responsavel=self.usuario, ciclo=self.ciclo) for n in range(60)
+        ])
+        for limite, esperado in ((None, 10), (3, 3), (100, 50), (-1, 0), ('abc', 10)):
+            with self.subTest(limite=limite):
+                params = {} if limite is None else {'limite': limite}
+                self.assertEqual(len(self.painel(**params)['objetivos']), esperado)
+        # O resumo conta todos os objetivos visíveis, não só os listados
+        self.assertEqual(self.painel(limite=3)['resumo']['total'], 61)
+
+
+class UltimosCheckinsTests(APITestCase):
+    """
+    ?ultimos_checkins=N (UltimosCheckinsMixin): os check-ins aninhados em cada
+    KR das listagens de objetivos e de KRs são só os N mais recentes.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='usuario')
+        ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+        objetivo = Objetivo.objects.create(titulo='Objetivo', responsavel=cls.usuario, ciclo=ciclo)
+        cls.muitos, cls.poucos = [
+            ResultadoChave.objects.create(
+                objetivo=objetivo, descricao=f'KR {n}', tipo='Numérico', valor_inicial=0, valor_alvo=100
+            ) for n in range(2)
+        ]
+        CheckIn.objects.bulk_create(
+            [CheckIn(resultado_chave=cls.muitos, colaborador=cls.usuario, valor_atual=n, nota_confianca=3) for n in range(60)]
+            + [CheckIn(resultado_chave=cls.poucos, colaborador=cls.usuario, valor_atual=n, nota_confianca=3) for n in range(3)]
+        )
+        # O mais recente é o de menor id: a ordem é pela data, não pela inserção
+        cls.mais_recente = CheckIn.objects.filter(resultado_chave=cls.muitos).order_by('id').first()
+        CheckIn.objects.filter(pk=cls.mais_recente.pk).update(data_checkin=timezone.now() + timedelta(days=1))
+
+    def setUp(self):
+        # A visibilidade fica em cache e os IDs se repetem entre os testes
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_authenticate(self.usuario)
+
+    def esperados(self, resultado, quantidade):
+        return list(
+            CheckIn.objects.filter(resultado_chave=resultado)
+            .order_by('-data_checkin', '-id').values_list('id', flat=True)[:quantidade]
+        )
+
+    def checkins_por_kr(self, url, **parametros):
+        response = self.client.get(url, parametros)
+        self.assertEqual(response.status_code, 200)
+        resultados = response.data['results']
+        if url == '/api/okr/objetivos/':
+            resultados = resultados[0]['resultados_chave']
+        return {resultado['id']: [checkin['id'] for checkin in resultado['checkins']] for resultado in resultados}
+
+    def test_limita_os_checkins_de_cada_kr(self):
+        for url in ('/api/okr/objetivos/', '/api/okr/resultados-chave/'):
+            for parametro, quantidade in ((None, 5), (2, 2), (50, 50), (500, 50), ('abc', 5)):
+                with self.subTest(url=url, ultimos_checkins=parametro):
+                    parametros = {} if parametro is None else {'ultimos_checkins': parametro}
+                    checkins = self.checkins_por_kr(url, **parametros)
+                    self.assertEqual(checkins, {
+                        self.muitos.pk: self.esperados(self.muitos, quantidade),
+                        self.poucos.pk: self.esperados(self.poucos, quantidade),
+                    })
+                    self.assertEqual(checkins[self.muitos.pk][0], self.mais_recente.pk)
+                    self.assertEqual(len(checkins[self.poucos.pk]), min(quantidade, 3))
+
+    def test_zero_nao_consulta_os_checkins(self):
+        for url in ('/api/okr/objetivos/', '/api/okr/resultados-chave/'):
+            with self.subTest(url=url), CaptureQueriesContext(connection) as consultas:
+                checkins = self.checkins_por_kr(url, ultimos_checkins=0)
+                self.assertEqual(checkins, {self.muitos.pk: [], self.poucos.pk: []})
+            self.assertFalse([consulta['sql'] for consulta in consultas if 'FROM "okr_checkin"' in consulta['sql']])
@@ -2,7 +2,7 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ObjetivoViewSet, ResultadoChaveViewSet, CheckInViewSet
+from .views import ObjetivoViewSet, ResultadoChaveViewSet, CheckInViewSet, painel_objetivos
 
 router = DefaultRouter()
 router.register(r'objetivos', ObjetivoViewSet, basename='objetivo')
@@ -10,5 +10,7 @@ router.register(r'resultados-chave', ResultadoChaveViewSet, basename='resultadoc
 router.register(r'checkins', CheckInViewSet, basename='checkin')
 
 urlpatterns = [
+    # View assíncrona (ASGI) da tela inicial
+    path('painel/', painel_objetivos, name='painel-objetivos'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,87 +1,265 @@
 # reune_app/okr/views.py
 
 # Imports necessários
-from django.db.models import Avg
-from rest_framework import viewsets
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Avg, Count, F, Q, Window
+from django.db.models.functions import RowNumber
+from django.http import JsonResponse
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django.contrib.auth.models import User
 from .models import Objetivo, ResultadoChave, CheckIn
-from .serializers import ObjetivoSerializer, ResultadoChaveSerializer, CheckInSerializer
+from .serializers import ObjetivoSerializer, ResultadoChaveSerializer, CheckInSerializer, CheckInLoteSerializer
+from .recalculo import fila
+from .resumo import registrar_checkins
+from .signals import publicar_checkins
 from rest_framework import permissions # <-- VERIFIQUE SE ESTE IMPORT EXISTE
 from .permissions import IsOwnerOrReadOnly # <-- IMPORTE NOSSA NOVA CLASSE
+from avaliacoes.models import CicloAvaliacao
+from busca.indice import indexar
+from reune.assincrono import api_assincrona, ler_limite, listar
+from reune.cache import invalidar_modelo
+from reune.mixins import ExportacaoMixin, MedicaoConsultasMixin, QuerysetOtimizadoMixin, RespostaCondicionalMixin
+from usuarios.visibilidade import filtrar_visiveis
+
+
+def limitar_ultimos_checkins(queryset, quantidade):
+    """
+    Mantém só os `quantidade` check-ins mais recentes de cada Resultado-Chave,
+    numa única consulta com ROW_NUMBER() OVER (PARTITION BY resultado_chave_id ...).
+    """
+    return queryset.annotate(
+        posicao=Window(
+            RowNumber(),
+            partition_by=[F('resultado_chave_id')],
+            order_by=[F('data_checkin').desc(), F('id').desc()],
+        )
+    ).filter(posicao__lte=quantidade)
+
+
+class UltimosCheckinsMixin:
+    """
+    Nas listagens, os check-ins aninhados em cada KR são limitados aos N mais
+    recentes (?ultimos_checkins=N, padrão 5, máximo 50). O histórico completo
+    fica em /api/okr/resultados-chave/{id}/checkins/, paginado.
 
-class ObjetivoViewSet(viewsets.ModelViewSet):
+    Com ?ultimos_checkins=0 a lista vem vazia sem consultar a tabela de
+    check-ins: o resumo de cada KR (num_checkins, ultimo_checkin_em,
+    ultima_nota_confianca, valor_atual) já está nas colunas do próprio KR.
+    """
+    caminho_checkins = 'checkins'
+    ultimos_checkins_padrao = 5
+    ultimos_checkins_maximo = 50
+
+    def get_ajustes_prefetch(self):
+        try:
+            quantidade = int(self.request.query_params.get('ultimos_checkins', self.ultimos_checkins_padrao))
+        except ValueError:
+            quantidade = self.ultimos_checkins_padrao
+        quantidade = max(0, min(quantidade, self.ultimos_checkins_maximo))
+        if quantidade == 0:
+            # Um queryset vazio não chega a ir ao banco no prefetch
+            return {self.caminho_checkins: lambda queryset: queryset.none()}
+        return {self.caminho_checkins: lambda queryset: limitar_ultimos_checkins(queryset, quantidade)}
+
+class ObjetivoViewSet(MedicaoConsultasMixin, RespostaCondicionalMixin, UltimosCheckinsMixin, QuerysetOtimizadoMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar e editar Objetivos.
     """
     queryset = Objetivo.objects.prefetch_related('resultados_chave__checkins', 'responsavel').all()
     serializer_class = ObjetivoSerializer
+    ordering = ('-data_criacao', '-id')
+    caminho_checkins = 'resultados_chave__checkins'
+    campos_validador = ('data_criacao',)
+    modelos_validador = (Objetivo, ResultadoChave, CheckIn, User)
     # permission_classes = [IsAuthenticated] # Adicionaremos no futuro
 
-def get_queryset(self):
-        # ... (o método get_queryset que criamos antes continua exatamente o mesmo) ...
-        usuario_logado = self.request.user
-        if not usuario_logado.is_authenticated:
-            return Objetivo.objects.none()
+    def get_queryset(self):
+        # Cada usuário vê os próprios objetivos e os dos membros das equipes que
+        # lidera, incluindo as subequipes (ver usuarios/visibilidade.py)
+        return filtrar_visiveis(super().get_queryset(), self.request.user)
 
-        query_visivel = Q(responsavel=usuario_logado)
 
-        equipes_lideradas = Equipe.objects.filter(lider=usuario_logado)
-        if equipes_lideradas.exists():
-            membros_ids = []
-            for equipe in equipes_lideradas:
-                membros_ids.extend(equipe.membros.values_list('usuario_id', flat=True))
-            
-            if membros_ids:
-                query_visivel |= Q(responsavel_id__in=membros_ids)
-
-        return Objetivo.objects.filter(query_visivel).distinct()
-
-
-class ResultadoChaveViewSet(viewsets.ModelViewSet):
+class ResultadoChaveViewSet(MedicaoConsultasMixin, RespostaCondicionalMixin, UltimosCheckinsMixin, QuerysetOtimizadoMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar e editar Resultados-Chave.
     """
-    queryset = ResultadoChave.objects.prefetch_related('checkins').all()
+    # Os check-ins são buscados pelo QuerysetOtimizadoMixin (limitados aos mais recentes)
+    queryset = ResultadoChave.objects.all()
     serializer_class = ResultadoChaveSerializer
+    ordering = ('objetivo_id', 'id')
+    modelos_validador = (ResultadoChave, CheckIn, User)
     # permission_classes = [IsAuthenticated] # Adicionaremos no futuro
 
-class CheckInViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'], url_path='checkins',
+            serializer_class=CheckInSerializer, ordering=('-data_checkin', '-id'))
+    def checkins(self, request, pk=None):
+        """
+        Histórico completo de check-ins de um Resultado-Chave, paginado por cursor.
+        Exemplo de URL: /api/okr/resultados-chave/3/checkins/?page_size=20
+        """
+        resultado_chave = self.get_object()
+        queryset = self.otimizar(CheckIn.objects.filter(resultado_chave=resultado_chave))
+        pagina = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(pagina, many=True)
+        return self.get_paginated_response(serializer.data)
+
+class CheckInViewSet(MedicaoConsultasMixin, ExportacaoMixin, RespostaCondicionalMixin, QuerysetOtimizadoMixin, viewsets.ModelViewSet):
     """
     API endpoint para visualizar e editar Check-ins, com lógica de negócio customizada.
     """
     queryset = CheckIn.objects.all()
     serializer_class = CheckInSerializer
+    ordering = ('-data_checkin', '-id')
+    campos_validador = ('data_checkin',)
+    modelos_validador = (CheckIn, User)
+    # Exportação em streaming: /api/okr/checkins/export/?ciclo_id=2&format=ndjson
+    campos_exportacao = (
+        'id', 'resultado_chave_id', 'resultado_chave__objetivo_id', 'resultado_chave__objetivo__ciclo_id',
+        'colaborador_id', 'colaborador__username', 'valor_atual', 'nota_confianca', 'comentario', 'data_checkin',
+    )
+    filtros_exportacao = {
+        'ciclo_id': 'resultado_chave__objetivo__ciclo_id', 'resultado_chave_id': 'resultado_chave_id',
+        'colaborador_id': 'colaborador_id', 'inicio': 'data_checkin__date__gte', 'fim': 'data_checkin__date__lte',
+    }
+    LIMITE_LOTE = 500  # Máximo de check-ins aceitos por chamada ao endpoint em lote
     # permission_classes = [IsAuthenticated] # Adicionaremos no futuro
 
     def perform_create(self, serializer):
-        # --- Parte 1: Atualizar o Resultado-Chave ---
-        resultado_chave = serializer.validated_data['resultado_chave']
-        valor_checkin = serializer.validated_data['valor_atual']
-        
-        resultado_chave.valor_atual = valor_checkin
-        
+        # O progresso do KR e do Objetivo é recalculado fora da requisição,
+        # pela fila de okr/recalculo.py (o signal do CheckIn marca o KR)
+        serializer.save(colaborador=self.request.user)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Registra vários check-ins de uma vez (ex: a rodada semanal de um time).
+        Exemplo de URL: POST /api/okr/checkins/bulk/ com uma lista de check-ins.
+
+        Tudo acontece em uma transação com um INSERT em lote. O progresso dos
+        KRs tocados e dos seus Objetivos é recalculado depois, pela fila de
+        okr/recalculo.py, com um UPDATE para cada lote.
+        """
+        if not isinstance(request.data, list) or not request.data:
+            return Response(
+                {"error": "Envie uma lista com pelo menos um check-in."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(request.data) > self.LIMITE_LOTE:
+            return Response(
+                {"error": f"O lote aceita no máximo {self.LIMITE_LOTE} check-ins."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = CheckInLoteSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        itens = serializer.validated_data
+
+        # Confere todos os KRs do lote em uma única consulta
+        resultado_ids = {item['resultado_chave'] for item in itens}
+        inexistentes = sorted(resultado_ids - set(
+            ResultadoChave.objects.filter(pk__in=resultado_ids).values_list('pk', flat=True)
+        ))
+        if inexistentes:
+            return Response(
+                {"error": f"Resultados-chave não encontrados: {inexistentes}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            checkins = CheckIn.objects.bulk_create([
+                CheckIn(
+                    resultado_chave_id=item['resultado_chave'],
+                    colaborador=request.user,
+                    valor_atual=item['valor_atual'],
+                    nota_confianca=item['nota_confianca'],
+                    comentario=item['comentario'],
+                ) for item in itens
+            ])
+            # bulk_create não dispara signals: atualiza o resumo dos KRs e o índice
+            # de busca, troca a versão, marca os KRs para recálculo (o último
+            # check-in de cada um define o progresso) e publica os eventos aqui
+            registrar_checkins(checkins)
+            indexar(CheckIn.objects.filter(pk__in=[checkin.pk for checkin in checkins]))
+            invalidar_modelo(CheckIn)
+            fila.marcar(resultados=resultado_ids)
+            publicar_checkins(checkins)
+
+        return Response(CheckInSerializer(checkins, many=True).data, status=status.HTTP_201_CREATED)
+
+
+@api_assincrona('objetivo.painel')
+async def painel_objetivos(request, usuario):
+    """
+    Painel de OKRs da tela inicial, numa única chamada assíncrona: o resumo dos
+    objetivos visíveis (os próprios e os das equipes lideradas), os objetivos do
+    usuário com os seus KRs e os últimos check-ins que ele fez.
+    Exemplo de URL: /api/okr/painel/?ciclo_id=2&limite=10
+
+    Sem 'ciclo_id' usa o ciclo ativo mais recente. O asyncio.gather só agrupa
+    as consultas: o ORM assíncrono roda cada uma via sync_to_async numa única
+    thread, então elas vão ao banco uma de cada vez.
+    """
+    ciclos = CicloAvaliacao.objects.values('id', 'titulo', 'status')
+    ciclo_id = request.GET.get('ciclo_id')
+    if ciclo_id:
+        if not ciclo_id.isdigit():
+            return JsonResponse({"error": "O parâmetro 'ciclo_id' deve ser um número."}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            range_total = resultado_chave.valor_alvo - resultado_chave.valor_inicial
-            range_atual = valor_checkin - resultado_chave.valor_inicial
-            if range_total == 0:
-                progresso = 100.00 if range_atual >= 0 else 0.00
-            else:
-                progresso = (range_atual / range_total) * 100
-            resultado_chave.progresso = max(0, min(progresso, 100))
-        except (ValueError, TypeError):
-            resultado_chave.progresso = 0.00
-
-        resultado_chave.save()
-
-        # --- Parte 2: Atualizar o Objetivo Pai ---
-        objetivo_pai = resultado_chave.objetivo
-        
-        media_progresso = objetivo_pai.resultados_chave.aggregate(
-            media=Avg('progresso')
-        ).get('media', 0.00)
-        
-        objetivo_pai.progresso = media_progresso if media_progresso is not None else 0.00
-        objetivo_pai.save()
-
-        # --- Parte 3: Salvar o Check-in associado ao usuário da requisição ---
-        serializer.save(colaborador=self.request.user)
\ No newline at end of file
+            ciclo = await ciclos.aget(pk=ciclo_id)
+        except CicloAvaliacao.DoesNotExist:
+            return JsonResponse(
+                {"error": f"Ciclo de avaliação com id={ciclo_id} não encontrado."}, status=status.HTTP_404_NOT_FOUND
+            )
+    else:
+        ciclo = await ciclos.filter(status=CicloAvaliacao.StatusChoices.ATIVO).order_by('-data_inicio', '-id').afirst()
+
+    # ids_visiveis() lê o cache e, na falta dele, o banco: fica numa thread
+    visiveis = await sync_to_async(filtrar_visiveis)(Objetivo.objects.order_by(), usuario)
+    if ciclo is not None:
+        visiveis = visiveis.filter(ciclo_id=ciclo['id'])
+    limite = ler_limite(request, 10, 50)
+
+    async def meus_objetivos():
+        objetivos = await listar(
+            visiveis.filter(responsavel_id=usuario.pk).order_by('-data_criacao', '-id')
+            .values('id', 'titulo', 'progresso', 'num_resultados', 'confianca_media', 'ciclo_id', 'data_criacao')[:limite]
+        )
+        resultados = await listar(
+            ResultadoChave.objects.filter(objetivo_id__in=[objetivo['id'] for objetivo in objetivos])
+            .order_by('objetivo_id', 'id').values(
+                'id', 'objetivo_id', 'descricao', 'tipo', 'valor_alvo', 'progresso',
+                'valor_atual', 'ultimo_checkin_em', 'ultima_nota_confianca',
+            )
+        )
+        por_objetivo = {objetivo['id']: {**objetivo, 'resultados_chave': []} for objetivo in objetivos}
+        for resultado in resultados:
+            por_objetivo[resultado.pop('objetivo_id')]['resultados_chave'].append(resultado)
+        return list(por_objetivo.values())
+
+    resumo, objetivos, checkins = await asyncio.gather(
+        visiveis.aaggregate(
+            total=Count('id'),
+            concluidos=Count('id', filter=Q(progresso__gte=100)),
+            progresso_medio=Avg('progresso'),
+        ),
+        meus_objetivos(),
+        listar(
+            CheckIn.objects.filter(colaborador_id=usuario.pk).order_by('-data_checkin', '-id').values(
+                'id', 'resultado_chave_id', 'resultado_chave__descricao', 'valor_atual', 'nota_confianca', 'data_checkin'
+            )[:5]
+        ),
+    )
+    if resumo['progresso_medio'] is not None:
+        resumo['progresso_medio'] = round(resumo['progresso_medio'], 2)
+
+    return {
+        'ciclo': ciclo,
+        'resumo': resumo,
+        'objetivos': objetivos,
+        'ultimos_checkins': checkins,
+    }
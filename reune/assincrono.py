@@ -0,0 +1,91 @@
+# reune_app/reune/assincrono.py
+
+import functools
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponseBase, JsonResponse
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .instrumentacao import ATRIBUTO_REQUEST
+
+
+def _autenticar(request):
+    """
+    Autentica com as mesmas classes configuradas no DRF (JWT, sessão). Roda
+    numa thread (sync_to_async): a busca do usuário usa o ORM síncrono.
+    """
+    drf_request = Request(request, authenticators=[classe() for classe in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    # O setter de Request.user também preenche request.user, usado no log das consultas
+    return drf_request.user
+
+
+def _nao_autenticado(request, erro):
+    # Mesmo corpo, status e WWW-Authenticate do exception_handler do DRF, para
+    # que o cliente trate o token expirado do mesmo jeito em todos os endpoints
+    dados = erro.detail if isinstance(erro.detail, dict) else {'detail': erro.detail}
+    autenticador = api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]()
+    return JsonResponse(
+        dados, status=status.HTTP_401_UNAUTHORIZED,
+        headers={'WWW-Authenticate': autenticador.authenticate_header(request)}
+    )
+
+
+async def listar(queryset, chunk_size=200):
+    """
+    Lista os itens do queryset com o ORM assíncrono (aiterator), sem bloquear o event loop.
+    """
+    return [item async for item in queryset.aiterator(chunk_size=chunk_size)]
+
+
+def ler_limite(request, padrao, maximo, parametro='limite'):
+    """
+    Lê um inteiro da query string, limitado a [0, maximo]. Valores inválidos
+    voltam ao padrão.
+    """
+    try:
+        valor = int(request.GET.get(parametro, padrao))
+    except ValueError:
+        valor = padrao
+    return max(0, min(valor, maximo))
+
+
+def api_assincrona(endpoint):
+    """
+    Decorator para views `async def` de leitura. A view recebe (request,
+    usuario, ...) e devolve um dict, convertido em JSON, ou uma resposta pronta.
+    As chamadas ao ORM assíncrono continuam indo ao banco uma de cada vez, na
+    thread compartilhada do sync_to_async (thread_sensitive); o ganho é juntar
+    numa só requisição o que a tela pedia em várias.
+
+    Faz o que o APIView do DRF faria: aceita só GET/HEAD, exige um usuário
+    autenticado pelas DEFAULT_AUTHENTICATION_CLASSES e identifica o `endpoint`
+    (ex: 'objetivo.painel') na medição de consultas.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            medicao = getattr(request, ATRIBUTO_REQUEST, None)
+            if medicao is not None:
+                medicao.endpoint = endpoint
+
+            if request.method not in ('GET', 'HEAD'):
+                return JsonResponse(
+                    {"error": f"Método {request.method} não permitido."},
+                    status=status.HTTP_405_METHOD_NOT_ALLOWED, headers={'Allow': 'GET, HEAD'}
+                )
+            try:
+                usuario = await sync_to_async(_autenticar)(request)
+            except exceptions.AuthenticationFailed as erro:
+                return _nao_autenticado(request, erro)
+            if not usuario.is_authenticated:
+                return _nao_autenticado(request, exceptions.NotAuthenticated())
+
+            dados = await view(request, usuario, *args, **kwargs)
+            if isinstance(dados, HttpResponseBase):
+                return dados
+            return JsonResponse(dados, encoder=DjangoJSONEncoder)
+        return wrapper
+    return decorator
@@ -0,0 +1,67 @@
+# reune_app/reune/cache.py
+
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+
+
+def _chave_versao(model):
+    return f'versao:{model._meta.label_lower}'
+
+
+def _versao_inicial():
+    # Se a chave de versão for descartada pelo cache, recomeçar de um número
+    # novo (e não de 1) garante que nenhuma resposta antiga volte a valer
+    return time.time_ns()
+
+
+def versoes_modelos(models):
+    """
+    Retorna a versão atual de cada model, na mesma ordem, com uma leitura ao cache.
+    """
+    chaves = [_chave_versao(model) for model in models]
+    encontradas = cache.get_many(chaves)
+    faltando = {chave: _versao_inicial() for chave in chaves if chave not in encontradas}
+    if faltando:
+        cache.set_many(faltando, None)
+        encontradas.update(faltando)
+    return [encontradas[chave] for chave in chaves]
+
+
+def invalidar_modelo(model):
+    """
+    Troca a versão do model: todas as respostas em cache que dependem dele
+    deixam de ser encontradas (e expiram sozinhas depois).
+
+    A versão é o instante da alteração em nanossegundos (sempre crescente),
+    para servir também de Last-Modified nas respostas condicionais.
+    """
+    chave = _chave_versao(model)
+    cache.set(chave, max(time.time_ns(), (cache.get(chave) or 0) + 1), None)
+
+
+def _invalidar_ao_gravar(sender, **kwargs):
+    invalidar_modelo(sender)
+
+
+def versionar_modelos(*models):
+    """
+    Conecta post_save/post_delete dos models à troca de versão. Deve ser
+    chamado no signals.py do app dono do model.
+    """
+    for model in models:
+        uid = f'versionar:{model._meta.label_lower}'
+        post_save.connect(_invalidar_ao_gravar, sender=model, dispatch_uid=uid)
+        post_delete.connect(_invalidar_ao_gravar, sender=model, dispatch_uid=uid)
+
+
+def chave_resposta(prefixo, request, models):
+    """
+    Chave de cache de uma resposta: depende da URL completa (inclusive query
+    string, que muda ?fields=, o cursor, etc.) e da versão de cada model lido.
+    """
+    versoes = '.'.join(str(versao) for versao in versoes_modelos(models))
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'resposta:{prefixo}:{versoes}:{url}'
@@ -0,0 +1,128 @@
+# reune_app/reune/eventos.py
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque, namedtuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+# id crescente, tipo (ex: 'feedback.criado'), dados compactos e os IDs dos usuários interessados
+Evento = namedtuple('Evento', ['id', 'tipo', 'dados', 'usuarios'])
+
+
+def _agora():
+    # Em microssegundos: depois de reiniciar o processo os ids continuam crescendo
+    # e um Last-Event-ID antigo é reconhecido. As versões de reune/cache.py usam
+    # nanossegundos, mas aqui o id vai para o navegador e precisa caber num
+    # Number do JavaScript (2**53)
+    return time.time_ns() // 1000
+
+
+class Assinatura:
+    """
+    Uma conexão ouvindo o canal: a fila asyncio do event loop onde ela foi criada.
+    """
+
+    def __init__(self, usuario_id, tamanho_fila):
+        self.usuario_id = usuario_id
+        self.fila = asyncio.Queue(tamanho_fila)
+        self.atrasada = False
+        self._loop = asyncio.get_running_loop()
+
+    def entregar(self, evento):
+        # publicar() roda na thread de quem gravou (views síncronas, comandos)
+        try:
+            self._loop.call_soon_threadsafe(self._colocar, evento)
+        except RuntimeError:
+            pass  # O event loop já foi encerrado: a conexão caiu
+
+    def _colocar(self, evento):
+        try:
+            self.fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente lento demais: em vez de crescer sem limite, ele é mandado recarregar
+            self.atrasada = True
+
+
+class CanalEventos:
+    """
+    Pub/sub em memória, dentro do processo. Quem grava publica (de qualquer
+    thread) e cada conexão SSE assina com uma fila. Os últimos
+    `tamanho_historico` eventos ficam guardados para que um cliente que caiu
+    retome do Last-Event-ID sem perder nada.
+
+    Cada processo tem o seu canal: com vários workers, um evento só chega às
+    conexões do processo onde a gravação aconteceu.
+    """
+
+    def __init__(self, tamanho_historico=1000, tamanho_fila=100):
+        self.tamanho_fila = tamanho_fila
+        self._trava = threading.Lock()
+        self._historico = deque(maxlen=tamanho_historico)
+        self._assinaturas = set()
+        self._ultimo_id = _agora()
+        # Eventos com id até aqui podem ter se perdido (restart ou histórico cheio)
+        self._descartados_ate = self._ultimo_id
+
+    @property
+    def ultimo_id(self):
+        return self._ultimo_id
+
+    def publicar(self, tipo, dados, usuarios):
+        with self._trava:
+            self._ultimo_id = max(_agora(), self._ultimo_id + 1)
+            evento = Evento(self._ultimo_id, tipo, dados, frozenset(usuarios))
+            if len(self._historico) == self._historico.maxlen:
+                self._descartados_ate = self._historico[0].id
+            self._historico.append(evento)
+            assinaturas = [assinatura for assinatura in self._assinaturas if assinatura.usuario_id in evento.usuarios]
+        for assinatura in assinaturas:
+            assinatura.entregar(evento)
+        return evento
+
+    def assinar(self, usuario_id):
+        """
+        Cria uma Assinatura para o usuário. Precisa ser chamado dentro do event loop.
+        """
+        assinatura = Assinatura(usuario_id, self.tamanho_fila)
+        with self._trava:
+            self._assinaturas.add(assinatura)
+        return assinatura
+
+    def cancelar(self, assinatura):
+        with self._trava:
+            self._assinaturas.discard(assinatura)
+
+    def eventos_desde(self, ultimo_id, usuario_id):
+        """
+        Retorna (eventos, completo): os eventos do usuário com id maior que
+        `ultimo_id`. `completo` é False quando algum evento posterior a
+        `ultimo_id` já saiu do histórico e o cliente precisa recarregar os dados.
+        """
+        with self._trava:
+            eventos = [evento for evento in self._historico if evento.id > ultimo_id and usuario_id in evento.usuarios]
+            return eventos, ultimo_id >= self._descartados_ate
+
+
+canal = CanalEventos()
+
+
+def publicar_apos_commit(tipo, dados, destinatarios):
+    """
+    Publica no canal quando a transação atual for confirmada: um rollback não
+    gera evento, e o cliente que recebe o aviso já encontra a linha no banco.
+    `destinatarios` é uma função chamada nesse momento e que devolve os IDs
+    dos usuários interessados (assim as consultas só rodam se houver commit).
+    """
+    transaction.on_commit(lambda: canal.publicar(tipo, dados, destinatarios()))
+
+
+def formatar_sse(evento):
+    """
+    Um evento no formato text/event-stream (id, event e data em JSON).
+    """
+    dados = json.dumps(evento.dados, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':'))
+    return f'id: {evento.id}\nevent: {evento.tipo}\ndata: {dados}\n\n'
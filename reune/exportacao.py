@@ -0,0 +1,78 @@
+# reune_app/reune/exportacao.py
+
+import csv
+import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+TAMANHO_LOTE = 2000
+
+# Início de célula que o Excel/LibreOffice interpreta como fórmula
+INICIO_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+class _Eco:
+    """
+    "Arquivo" cujo write() devolve o que recebeu: permite usar o csv.writer
+    linha a linha, sem acumular nada em memória.
+    """
+
+    def write(self, valor):
+        return valor
+
+
+def _valor_csv(valor):
+    if isinstance(valor, (datetime.datetime, datetime.date)):
+        return valor.isoformat()
+    # Texto livre (feedback, justificativa, comentário) não pode virar fórmula
+    # na planilha de quem exporta: o apóstrofo faz a célula ser lida como texto
+    if isinstance(valor, str) and valor.startswith(INICIO_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def linhas_csv(queryset, campos, tamanho_lote=TAMANHO_LOTE):
+    """
+    Gera o CSV (cabeçalho + uma linha por registro) a partir de
+    queryset.values(*campos).iterator(), buscando `tamanho_lote` linhas por vez.
+    """
+    escritor = csv.writer(_Eco())
+    # BOM para o Excel abrir os acentos corretamente
+    yield '\ufeff' + escritor.writerow(campos)
+    for linha in queryset.values_list(*campos).iterator(chunk_size=tamanho_lote):
+        yield escritor.writerow([_valor_csv(valor) for valor in linha])
+
+
+def linhas_ndjson(queryset, campos, tamanho_lote=TAMANHO_LOTE):
+    """
+    Gera um objeto JSON por linha (NDJSON), no mesmo esquema do CSV.
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for linha in queryset.values(*campos).iterator(chunk_size=tamanho_lote):
+        yield encoder.encode(linha) + '\n'
+
+
+class CSVExportacaoRenderer(BaseRenderer):
+    """
+    Renderer usado só na negociação de conteúdo (?format=csv ou Accept: text/csv)
+    das exportações: as linhas saem direto num StreamingHttpResponse e as
+    respostas de erro são trocadas para JSON (ver ExportacaoMixin).
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+
+class NDJSONExportacaoRenderer(CSVExportacaoRenderer):
+    """
+    Como o CSVExportacaoRenderer, para ?format=ndjson ou Accept: application/x-ndjson.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+GERADORES = {
+    'csv': linhas_csv,
+    'ndjson': linhas_ndjson,
+}
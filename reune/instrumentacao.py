@@ -0,0 +1,157 @@
+# reune_app/reune/instrumentacao.py
+
+import heapq
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('reune.consultas')
+
+ATRIBUTO_REQUEST = 'medicao_consultas'
+
+
+class MedicaoConsultas:
+    """
+    Registra as consultas SQL executadas enquanto está ativa (via
+    connection.execute_wrapper): quantidade, tempo total no banco e as
+    `limite_lentas` consultas mais demoradas.
+    """
+
+    def __init__(self, limite_lentas=5):
+        self.limite_lentas = limite_lentas
+        self.total = 0
+        self.tempo = 0.0
+        self.endpoint = None
+        self._lentas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracao = time.perf_counter() - inicio
+            self.total += 1
+            self.tempo += duracao
+            # Heap de mínimo com as N mais lentas; o contador desempata e evita comparar o SQL
+            item = (duracao, self.total, sql)
+            if len(self._lentas) < self.limite_lentas:
+                heapq.heappush(self._lentas, item)
+            else:
+                heapq.heappushpop(self._lentas, item)
+
+    def mais_lentas(self):
+        """
+        Lista de (duração em segundos, sql), da mais lenta para a mais rápida.
+        """
+        return [(duracao, sql) for duracao, _, sql in sorted(self._lentas, reverse=True)]
+
+
+@contextmanager
+def medir_consultas(limite_lentas=5):
+    """
+    Context manager que mede as consultas de todos os bancos configurados.
+
+        with medir_consultas() as medicao:
+            ...
+        medicao.total, medicao.tempo, medicao.mais_lentas()
+    """
+    medicao = MedicaoConsultas(limite_lentas)
+    with ExitStack() as pilha:
+        _instalar(pilha, medicao)
+        yield medicao
+
+
+def _instalar(pilha, medicao):
+    # As conexões são por thread: o wrapper vale só para a thread que chamou
+    for connection in connections.all():
+        pilha.enter_context(connection.execute_wrapper(medicao))
+
+
+def _resumir_sql(sql, tamanho=200):
+    return ' '.join(sql.split())[:tamanho]
+
+
+def registrar_medicao(request, response, medicao, duracao):
+    """
+    Publica a medição de uma requisição: em DEBUG como cabeçalhos da resposta,
+    fora dele como um log estruturado (JSON) no logger 'reune.consultas'. Só
+    as requisições que passam de CONSULTAS_LOG_LIMITE (consultas) ou de
+    CONSULTAS_LOG_LIMITE_MS (tempo total) saem em INFO; as demais, em DEBUG.
+    """
+    if settings.DEBUG:
+        response['X-Query-Count'] = str(medicao.total)
+        response['X-Query-Time-Ms'] = f'{medicao.tempo * 1000:.1f}'
+        response['X-Request-Time-Ms'] = f'{duracao * 1000:.1f}'
+        if medicao.endpoint:
+            response['X-Endpoint'] = medicao.endpoint
+        lentas = medicao.mais_lentas()
+        if lentas:
+            response['X-Slowest-Queries'] = ' | '.join(
+                f'{tempo * 1000:.1f}ms {_resumir_sql(sql, 120)}' for tempo, sql in lentas[:3]
+            )
+        return
+
+    lenta = medicao.total >= settings.CONSULTAS_LOG_LIMITE or duracao * 1000 >= settings.CONSULTAS_LOG_LIMITE_MS
+    nivel = logging.INFO if lenta else logging.DEBUG
+    if not logger.isEnabledFor(nivel):
+        return
+    usuario = getattr(request, 'user', None)
+    logger.log(nivel, json.dumps({
+        'metodo': request.method,
+        'caminho': request.path,
+        'endpoint': medicao.endpoint,
+        'status': response.status_code,
+        'usuario': getattr(usuario, 'pk', None),
+        'consultas': medicao.total,
+        'tempo_consultas_ms': round(medicao.tempo * 1000, 1),
+        'tempo_total_ms': round(duracao * 1000, 1),
+        'consultas_lentas': [
+            {'ms': round(tempo * 1000, 1), 'sql': _resumir_sql(sql)} for tempo, sql in medicao.mais_lentas()
+        ],
+    }, ensure_ascii=False))
+
+
+class MedicaoConsultasMiddleware:
+    """
+    Mede as consultas SQL e o tempo de cada requisição (ver registrar_medicao).
+    Respostas em streaming só contam as consultas feitas antes do primeiro byte.
+
+    Funciona também no ASGI sem forçar as views assíncronas para uma thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        inicio = time.perf_counter()
+        with medir_consultas() as medicao:
+            setattr(request, ATRIBUTO_REQUEST, medicao)
+            response = self.get_response(request)
+        registrar_medicao(request, response, medicao, time.perf_counter() - inicio)
+        return response
+
+    async def __acall__(self, request):
+        # O ORM assíncrono executa as consultas via sync_to_async, na thread
+        # reservada para a requisição: o wrapper é instalado nas conexões dela
+        inicio = time.perf_counter()
+        medicao = MedicaoConsultas()
+        setattr(request, ATRIBUTO_REQUEST, medicao)
+        pilha = ExitStack()
+        await sync_to_async(_instalar)(pilha, medicao)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(pilha.close)()
+        registrar_medicao(request, response, medicao, time.perf_counter() - inicio)
+        return response
@@ -0,0 +1,117 @@
+# reune_app/reune/lote.py
+
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.http import Http404, HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.response import Response
+
+# Máximo de sub-requisições por lote e de threads para as leituras em paralelo
+LIMITE_LOTE = 20
+MAXIMO_THREADS = 4
+METODOS_LEITURA = ('GET', 'HEAD')
+METODOS = METODOS_LEITURA + ('POST', 'PUT', 'PATCH', 'DELETE')
+PREFIXO = '/api/'
+# Cabeçalhos que pertencem à requisição do lote, não às sub-requisições
+_SEM_COPIA = ('CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+
+
+def _erro(status_code, mensagem):
+    return {'status': status_code, 'cabecalhos': {}, 'corpo': {'error': mensagem}}
+
+
+def _sub_requisicao(request, metodo, url, corpo, cabecalhos):
+    """
+    HttpRequest equivalente a uma chamada do mesmo cliente: herda o META da
+    requisição do lote (host, IP, user agent), com o método, a URL, o corpo e
+    os cabeçalhos da sub-requisição. O usuário já autenticado no lote é
+    repassado pelo _force_auth_user do DRF: nem o JWT nem o CSRF são checados de novo.
+    """
+    sub = HttpRequest()
+    sub.method = metodo
+    sub.path = sub.path_info = url.path
+    sub.META = {chave: valor for chave, valor in request.META.items() if chave not in _SEM_COPIA}
+    sub.META.update(REQUEST_METHOD=metodo, PATH_INFO=url.path, QUERY_STRING=url.query)
+    for nome, valor in cabecalhos.items():
+        sub.META['HTTP_' + nome.upper().replace('-', '_')] = str(valor)
+    sub.GET = QueryDict(url.query)
+    sub.COOKIES = request.COOKIES
+
+    dados = json.dumps(corpo, cls=DjangoJSONEncoder).encode() if corpo is not None else b''
+    sub.META['CONTENT_TYPE'] = 'application/json'
+    sub.META['CONTENT_LENGTH'] = str(len(dados))
+    sub._stream = io.BytesIO(dados)
+    sub._read_started = False
+
+    sub.user = request.user
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    return sub
+
+
+def _corpo(response):
+    if isinstance(response, Response):
+        return response.data
+    if not response.content:
+        return None
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(response.content)
+    return response.content.decode(response.charset)
+
+
+def executar(request, item):
+    """
+    Executa uma sub-requisição {"metodo", "url", "corpo", "cabecalhos"} pela
+    view da rota, no mesmo processo, e devolve {"status", "cabecalhos", "corpo"}.
+    """
+    url = urlsplit(item['url'])
+    if not url.path.startswith(PREFIXO):
+        return _erro(status.HTTP_400_BAD_REQUEST, f"Só URLs de {PREFIXO} podem entrar no lote.")
+    try:
+        rota = resolve(url.path)
+    except Resolver404:
+        return _erro(status.HTTP_404_NOT_FOUND, f"Nenhuma rota para {url.path}.")
+    if rota.url_name == 'batch':
+        return _erro(status.HTTP_400_BAD_REQUEST, "Um lote não pode conter outro lote.")
+
+    sub = _sub_requisicao(request, item['metodo'], url, item.get('corpo'), item.get('cabecalhos') or {})
+    sub.resolver_match = rota
+    view = async_to_sync(rota.func) if iscoroutinefunction(rota.func) else rota.func
+    try:
+        response = view(sub, *rota.args, **rota.kwargs)
+    except Http404:
+        return _erro(status.HTTP_404_NOT_FOUND, "Não encontrado.")
+
+    if response.streaming:
+        # Exportações e o stream de eventos não cabem numa resposta JSON
+        response.close()
+        return _erro(status.HTTP_400_BAD_REQUEST, f"{url.path} responde em streaming e não pode entrar no lote.")
+    cabecalhos = {nome: valor for nome, valor in response.items() if nome not in ('Content-Type', 'Content-Length')}
+    return {'status': response.status_code, 'cabecalhos': cabecalhos, 'corpo': _corpo(response)}
+
+
+def _executar_em_thread(request, item):
+    try:
+        return executar(request, item)
+    finally:
+        # As conexões são por thread: não deixa a do worker aberta
+        connections.close_all()
+
+
+def executar_lote(request, itens, paralelo=False):
+    """
+    Executa as sub-requisições e devolve as respostas na mesma ordem. Em ordem,
+    uma de cada vez, a não ser que `paralelo` seja pedido e todas sejam
+    leituras: aí rodam em até MAXIMO_THREADS threads, cada uma com a sua conexão.
+    """
+    if paralelo and len(itens) > 1 and all(item['metodo'] in METODOS_LEITURA for item in itens):
+        with ThreadPoolExecutor(max_workers=min(MAXIMO_THREADS, len(itens))) as executor:
+            return list(executor.map(lambda item: _executar_em_thread(request, item), itens))
+    return [executar(request, item) for item in itens]
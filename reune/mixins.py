@@ -0,0 +1,248 @@
+# reune_app/reune/mixins.py
+
+import datetime
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import parse_etags
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import permissions, status
+from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .cache import chave_resposta, versoes_modelos
+from .exportacao import GERADORES, TAMANHO_LOTE, CSVExportacaoRenderer, NDJSONExportacaoRenderer
+from .instrumentacao import ATRIBUTO_REQUEST, medir_consultas, registrar_medicao
+from .serializers import otimizar_queryset
+
+
+class MedicaoConsultasMixin:
+    """
+    Mixin para ViewSets: identifica a ação (ex: 'objetivo.list') na medição de
+    consultas do MedicaoConsultasMiddleware, para que os logs agrupem por
+    endpoint e não por URL. Se a view for chamada fora do middleware (testes,
+    chamadas internas), ela mesma mede e publica as consultas.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if getattr(request, ATRIBUTO_REQUEST, None) is not None:
+            return super().dispatch(request, *args, **kwargs)
+
+        inicio = time.perf_counter()
+        with medir_consultas() as medicao:
+            setattr(request, ATRIBUTO_REQUEST, medicao)
+            response = super().dispatch(request, *args, **kwargs)
+        registrar_medicao(request, response, medicao, time.perf_counter() - inicio)
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        medicao = getattr(request, ATRIBUTO_REQUEST, None)
+        if medicao is not None:
+            medicao.endpoint = f'{getattr(self, "basename", None) or type(self).__name__}.{self.action}'
+        super().initial(request, *args, **kwargs)
+
+
+class QuerysetOtimizadoMixin:
+    """
+    Mixin para ModelViewSets: nas leituras (list/retrieve) monta o
+    select_related/prefetch_related/only() do queryset a partir dos campos que
+    o serializer vai devolver, respeitando ?fields= e ?expand=.
+
+    Para limitar os filhos de um prefetch, sobrescreva get_ajustes_prefetch().
+    """
+    acoes_otimizadas = ('list', 'retrieve')
+
+    def get_ajustes_prefetch(self):
+        return None
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, 'action', None) not in self.acoes_otimizadas:
+            return queryset
+        return self.otimizar(queryset)
+
+    def otimizar(self, queryset):
+        ordenacao = [campo.lstrip('-') for campo in getattr(self, 'ordering', None) or ()]
+        return otimizar_queryset(
+            queryset, self.get_serializer(),
+            campos_extras=ordenacao, ajustes_prefetch=self.get_ajustes_prefetch(),
+        )
+
+
+class RespostaEmCacheMixin:
+    """
+    Mixin para ViewSets de dados de referência (cargos, equipes, competências,
+    ciclos), que mudam poucas vezes por trimestre: as respostas de list/retrieve
+    ficam no cache do Django e são servidas sem consultar o banco nem serializar.
+
+    A chave inclui a versão de cada model em `modelos_cache` (o próprio model do
+    queryset, por padrão). A versão é trocada pelos signals registrados com
+    reune.cache.versionar_modelos, então qualquer gravação invalida na hora.
+    """
+    modelos_cache = ()
+    tempo_cache = 60 * 60
+
+    def get_modelos_cache(self):
+        return self.modelos_cache or (self.queryset.model,)
+
+    def list(self, request, *args, **kwargs):
+        return self._responder_com_cache(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._responder_com_cache(super().retrieve, request, *args, **kwargs)
+
+    def _responder_com_cache(self, gerar_resposta, request, *args, **kwargs):
+        # As permissões já foram checadas em initial(), antes de chegar aqui
+        chave = chave_resposta(f'{self.basename}:{self.action}', request, self.get_modelos_cache())
+        dados = cache.get(chave)
+        if dados is not None:
+            response = Response(dados)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = gerar_resposta(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(chave, response.data, self.tempo_cache)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class RespostaCondicionalMixin:
+    """
+    Mixin para ViewSets: GETs condicionais (ETag / Last-Modified) em list e
+    retrieve. Se o cliente envia If-None-Match (ou If-Modified-Since) e nada
+    mudou, a resposta é um 304 sem corpo, sem serializar nada.
+
+    O validador é barato: a versão de cada model em `modelos_validador` (trocada
+    pelos signals, ver reune.cache) e, quando `campos_validador` é informado, um
+    único aggregate com MAX() desses campos e COUNT(*) sobre o queryset já
+    filtrado, que pega também gravações em lote que não disparam signals.
+    O usuário e a URL completa entram no ETag, já que a visibilidade e os
+    parâmetros (?fields=, cursor) mudam o conteúdo.
+    """
+    campos_validador = ()
+    modelos_validador = ()
+
+    def get_modelos_validador(self):
+        return self.modelos_validador or (self.queryset.model,)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._responder_condicional(queryset, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+        return self._responder_condicional(queryset, super().retrieve, request, *args, **kwargs)
+
+    def _validadores(self, request, queryset):
+        versoes = versoes_modelos(self.get_modelos_validador())
+        datas = [datetime.datetime.fromtimestamp(max(versoes) / 1e9, tz=datetime.timezone.utc)]
+        agregados = {}
+        if self.campos_validador:
+            # Com campos de outras tabelas o JOIN repete linhas: conta só os ids distintos
+            distinto = any('__' in campo for campo in self.campos_validador)
+            agregados = queryset.order_by().aggregate(
+                total=Count('pk', distinct=distinto),
+                **{f'ultimo_{i}': Max(campo) for i, campo in enumerate(self.campos_validador)}
+            )
+            for valor in agregados.values():
+                if isinstance(valor, datetime.datetime):
+                    datas.append(valor)
+                elif isinstance(valor, datetime.date):
+                    datas.append(timezone.make_aware(datetime.datetime.combine(valor, datetime.time.min)))
+
+        partes = (
+            request.user.pk, request.build_absolute_uri(), request.accepted_renderer.format,
+            versoes, sorted(agregados.items()),
+        )
+        etag = '"%s"' % hashlib.md5(repr(partes).encode()).hexdigest()
+        return etag, int(max(datas).timestamp())
+
+    def _responder_condicional(self, queryset, gerar_resposta, request, *args, **kwargs):
+        etag, ultima_alteracao = self._validadores(request, queryset)
+
+        # If-None-Match tem precedência sobre If-Modified-Since (RFC 9110)
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match is not None:
+            recebidos = {valor.removeprefix('W/') for valor in parse_etags(if_none_match)}
+            nao_modificado = '*' in recebidos or etag in recebidos
+        else:
+            desde = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+            nao_modificado = desde is not None and ultima_alteracao <= desde
+
+        if nao_modificado:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = gerar_resposta(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(ultima_alteracao)
+        # O navegador guarda a resposta, mas revalida sempre (e recebe o 304)
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class ExportacaoMixin:
+    """
+    Mixin para ViewSets: adiciona GET .../export/ que devolve os dados crus em
+    CSV (padrão) ou NDJSON (?format=ndjson), em streaming.
+
+    As linhas vêm de queryset.values(*campos_exportacao).iterator(chunk_size=...),
+    ordenadas pela pk: a memória fica constante e o primeiro byte sai assim que
+    o primeiro lote chega do banco, qualquer que seja o tamanho da tabela.
+
+    `filtros_exportacao` mapeia parâmetros da query string para lookups do ORM,
+    ex: {'ciclo_id': 'ciclo_id', 'inicio': 'data_resposta__date__gte'}.
+    Só administradores (is_staff) podem exportar.
+    """
+    campos_exportacao = ()
+    filtros_exportacao = {}
+    nome_exportacao = None
+    tamanho_lote_exportacao = TAMANHO_LOTE
+
+    @action(detail=False, methods=['get'], url_path='export',
+            renderer_classes=[CSVExportacaoRenderer, NDJSONExportacaoRenderer],
+            permission_classes=[permissions.IsAdminUser])
+    def export(self, request):
+        """
+        Exemplo de URL: /api/avaliacoes/respostas/export/?ciclo_id=2&format=ndjson
+        """
+        filtros = {
+            lookup: request.query_params[parametro]
+            for parametro, lookup in self.filtros_exportacao.items()
+            if request.query_params.get(parametro) not in (None, '')
+        }
+        try:
+            # O ORM valida os valores ao montar o filtro, antes de começar o streaming
+            queryset = self.queryset.model._default_manager.filter(**filtros).order_by('pk')
+        except (ValueError, DjangoValidationError):
+            return Response(
+                {"error": f"Filtro inválido. Parâmetros aceitos: {sorted(self.filtros_exportacao)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        formato = request.accepted_renderer.format
+        linhas = GERADORES[formato](queryset, list(self.campos_exportacao), self.tamanho_lote_exportacao)
+        response = StreamingHttpResponse(linhas, content_type=f'{request.accepted_renderer.media_type}; charset=utf-8')
+        nome = self.nome_exportacao or self.basename
+        response['Content-Disposition'] = f'attachment; filename="{nome}.{formato}"'
+        # Não deixa proxies (nginx) acumularem a resposta antes de repassar
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if getattr(self, 'action', None) == 'export' and isinstance(response, Response):
+            # Erros da exportação (400, 401, 403) saem em JSON, não no formato pedido
+            request.accepted_renderer = JSONRenderer()
+            request.accepted_media_type = JSONRenderer.media_type
+        return super().finalize_response(request, response, *args, **kwargs)
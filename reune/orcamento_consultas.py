@@ -0,0 +1,61 @@
+# reune_app/reune/orcamento_consultas.py
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class OrcamentoConsultasMixin:
+    """
+    Mixin para TestCases de API: verifica o "orçamento" de consultas SQL de um
+    endpoint, para que uma regressão N+1 faça a suíte falhar.
+
+        class MeuTeste(OrcamentoConsultasMixin, APITestCase):
+            def test_lista(self):
+                self.assertOrcamentoConsultas('/api/okr/objetivos/', 4)
+                self.assertConsultasConstantes('/api/okr/objetivos/', criar_mais_objetivos)
+
+    O cache é limpo antes de cada teste: o banco volta ao estado inicial, mas o
+    cache (versões, respostas, visibilidade) não.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def contar_consultas(self, url, metodo='get', **kwargs):
+        """
+        Faz a requisição com self.client e retorna (response, lista de SQL executados).
+        """
+        with CaptureQueriesContext(connection) as consultas:
+            response = getattr(self.client, metodo)(url, **kwargs)
+        return response, [consulta['sql'] for consulta in consultas.captured_queries]
+
+    def assertOrcamentoConsultas(self, url, maximo, metodo='get', **kwargs):
+        response, consultas = self.contar_consultas(url, metodo, **kwargs)
+        self.assertLess(response.status_code, 400, f"{url} respondeu {response.status_code}")
+        if len(consultas) > maximo:
+            self.fail(
+                f"{url} executou {len(consultas)} consultas (orçamento: {maximo}):\n"
+                + '\n'.join(f"  {i}. {sql}" for i, sql in enumerate(consultas, 1))
+            )
+        return response
+
+    def assertConsultasConstantes(self, url, criar_mais, metodo='get', **kwargs):
+        """
+        Falha se o número de consultas do endpoint cresce quando `criar_mais()`
+        acrescenta linhas ao banco (o sintoma clássico de um N+1).
+        """
+        # Nas duas medições o cache começa vazio, como num primeiro acesso
+        cache.clear()
+        _, antes = self.contar_consultas(url, metodo, **kwargs)
+        criar_mais()
+        cache.clear()
+        response, depois = self.contar_consultas(url, metodo, **kwargs)
+        self.assertLess(response.status_code, 400, f"{url} respondeu {response.status_code}")
+        if len(depois) != len(antes):
+            self.fail(
+                f"{url} passou de {len(antes)} para {len(depois)} consultas com mais dados:\n"
+                + '\n'.join(f"  {i}. {sql}" for i, sql in enumerate(depois, 1))
+            )
+        return response
@@ -0,0 +1,171 @@
+# reune_app/reune/pagination.py
+
+import json
+from functools import reduce
+from operator import or_
+
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, _reverse_ordering
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Paginação por cursor (keyset) usada como padrão em todas as APIs.
+
+    Diferente da CursorPagination do DRF, que filtra apenas pelo primeiro campo
+    da ordenação e resolve empates com OFFSET, aqui a posição do cursor guarda
+    o valor de TODOS os campos da ordenação (ex: data + id). Assim cada página
+    é um único "WHERE (data, id) < (x, y)" sobre o índice, sem OFFSET, e o custo
+    de uma página profunda é o mesmo da primeira.
+
+    Cada ViewSet declara a sua ordenação no atributo `ordering`, que deve
+    terminar em um campo único (normalmente o 'id') para desempate.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-id',)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            reverse, current_position = self.cursor.reverse, self.cursor.position
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            nulls_largest = connections[queryset.db].features.nulls_order_largest
+            queryset = queryset.filter(self._keyset_filter(current_position, reverse, nulls_largest))
+
+        # Busca um item a mais para saber se existe uma próxima página
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(self.page[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        # A posição é exclusiva: a próxima página começa depois do último item
+        position = self._get_position_from_instance(self.page[-1], self.ordering) if self.page else self.next_position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._get_position_from_instance(self.page[0], self.ordering) if self.page else self.previous_position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            values = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def _keyset_filter(self, position, reverse, nulls_largest=False):
+        """
+        Monta o equivalente a "(a, b, c) < (x, y, z)" com ORs, já que o SQL Server
+        não suporta comparação de tuplas:
+        a < x OR (a = x AND b < y) OR (a = x AND b = y AND c < z)
+
+        NULL (null no cursor) segue a ordem do banco: o menor valor no SQLite e
+        no SQL Server, o maior no PostgreSQL (`nulls_largest`).
+        """
+        values = json.loads(position)
+        clauses = []
+        for i, order in enumerate(self.ordering):
+            attr = order.lstrip('-')
+            descending = order.startswith('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            after = self._after(attr, lookup, values[i], nulls_largest)
+            if after is None:
+                continue
+            equals = Q()
+            for j in range(i):
+                equals &= self._equals(self.ordering[j].lstrip('-'), values[j])
+            clauses.append(equals & after)
+        # Nada vem depois da posição (ex: NULL no primeiro campo, indo para o fim)
+        return reduce(or_, clauses) if clauses else Q(pk__in=[])
+
+    @staticmethod
+    def _equals(attr, value):
+        if value is None:
+            return Q(**{f'{attr}__isnull': True})
+        return Q(**{attr: value})
+
+    @staticmethod
+    def _after(attr, lookup, value, nulls_largest):
+        # Linhas estritamente depois de `value` no sentido de `lookup` (gt ou lt)
+        nulls_after = nulls_largest == (lookup == 'gt')
+        if value is None:
+            return None if nulls_after else Q(**{f'{attr}__isnull': False})
+        after = Q(**{f'{attr}__{lookup}': value})
+        if nulls_after:
+            after |= Q(**{f'{attr}__isnull': True})
+        return after
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field_name = order.lstrip('-')
+            if isinstance(instance, dict):
+                attr = instance[field_name]
+            else:
+                attr = instance
+                for part in field_name.split('__'):
+                    attr = getattr(attr, part)
+            # NULL vai como null no cursor, não como o texto "None"
+            values.append(None if attr is None else str(attr))
+        return json.dumps(values)
@@ -0,0 +1,90 @@
+# reune_app/reune/politicas.py
+
+import operator
+from functools import reduce
+
+from django.db.models import Q
+from rest_framework.filters import BaseFilterBackend
+
+from usuarios.visibilidade import filtro_visiveis
+
+
+class Regra:
+    """
+    Uma condição sobre as linhas de um queryset em função do usuário da
+    requisição. Regras se combinam com | e &, e filtro() devolve o Q
+    equivalente: a política inteira vira um único WHERE, avaliado pelo banco.
+    """
+
+    def filtro(self, usuario):
+        raise NotImplementedError
+
+    def __or__(self, outra):
+        return Ou(self, outra)
+
+    def __and__(self, outra):
+        return E(self, outra)
+
+
+class Ou(Regra):
+    operador = operator.or_
+
+    def __init__(self, *regras):
+        self.regras = regras
+
+    def filtro(self, usuario):
+        return reduce(self.operador, (regra.filtro(usuario) for regra in self.regras))
+
+
+class E(Ou):
+    operador = operator.and_
+
+
+class Proprio(Regra):
+    """
+    O `campo` (um FK para User) é o próprio usuário.
+    """
+
+    def __init__(self, campo):
+        self.campo = campo
+
+    def filtro(self, usuario):
+        return Q(**{f'{self.campo}_id': usuario.pk})
+
+
+class Visivel(Proprio):
+    """
+    O `campo` é o próprio usuário ou um membro das equipes que ele lidera,
+    incluindo as subequipes (ver usuarios/visibilidade.py).
+    """
+    incluir_proprio = True
+
+    def filtro(self, usuario):
+        return filtro_visiveis(usuario, self.campo, self.incluir_proprio)
+
+
+class Liderado(Visivel):
+    """
+    O `campo` é um membro das equipes que o usuário lidera (não ele mesmo).
+    """
+    incluir_proprio = False
+
+
+class FiltroPoliticaLinhas(BaseFilterBackend):
+    """
+    Filter backend padrão (DEFAULT_FILTER_BACKENDS): aplica a `politica_linhas`
+    da view, quando houver, ex:
+
+        politica_linhas = Proprio('avaliador') | Liderado('avaliado')
+
+    Como get_object() também passa por filter_queryset(), a política vale para
+    list, retrieve, update e destroy: uma linha fora dela responde 404.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        politica = getattr(view, 'politica_linhas', None)
+        if politica is None:
+            return queryset
+        if not request.user.is_authenticated:
+            return queryset.none()
+        return queryset.filter(politica.filtro(request.user))
@@ -0,0 +1,228 @@
+# reune_app/reune/serializers.py
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import permissions, serializers
+
+_SEM_ESPECIFICACAO = object()
+
+
+def ler_caminhos(valor):
+    """
+    Converte "id,titulo,resultados_chave.progresso" em uma árvore:
+    {'id': None, 'titulo': None, 'resultados_chave': {'progresso': None}}.
+    None significa "o campo inteiro, sem restrição abaixo dele".
+    Retorna None quando o parâmetro não foi enviado.
+    """
+    if valor is None:
+        return None
+    arvore = {}
+    for caminho in valor.split(','):
+        partes = [parte.strip() for parte in caminho.split('.') if parte.strip()]
+        if not partes:
+            continue
+        no = arvore
+        for parte in partes[:-1]:
+            if parte in no and no[parte] is None:
+                break
+            no = no.setdefault(parte, {})
+        else:
+            no[partes[-1]] = None
+    return arvore
+
+
+class DynamicFieldsMixin:
+    """
+    Permite escolher os campos devolvidos por um ModelSerializer via query string:
+
+    ?fields=id,titulo,resultados_chave.progresso
+        Devolve só os campos pedidos. Caminhos com ponto valem para os aninhados.
+    ?expand=resultados_chave,resultados_chave.checkins
+        Quando enviado, só as relações listadas vêm aninhadas. As demais viram
+        o ID (chaves estrangeiras) ou são omitidas (listas de filhos).
+
+    Sem nenhum dos dois parâmetros a resposta é a mesma de sempre. Só vale para
+    leituras (GET/HEAD); o corpo de um POST/PUT não é afetado.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        especificacao = self._especificacao_dinamica()
+        if especificacao is None:
+            return fields
+
+        campos, expandir = especificacao
+        for nome in list(fields):
+            field = fields[nome]
+            if field.write_only:
+                continue
+            if campos is not None and nome not in campos:
+                del fields[nome]
+                continue
+
+            aninhado = field.child if isinstance(field, serializers.ListSerializer) else field
+            if not isinstance(aninhado, serializers.BaseSerializer):
+                continue
+
+            if expandir is not None and nome not in expandir:
+                recolhido = self._recolher(nome, field)
+                if recolhido is None:
+                    del fields[nome]
+                else:
+                    fields[nome] = recolhido
+                continue
+
+            if isinstance(aninhado, DynamicFieldsMixin):
+                aninhado._especificacao = (
+                    campos.get(nome) if campos is not None else None,
+                    (expandir.get(nome) or {}) if expandir is not None else None,
+                )
+        return fields
+
+    def _especificacao_dinamica(self):
+        especificacao = getattr(self, '_especificacao', _SEM_ESPECIFICACAO)
+        if especificacao is not _SEM_ESPECIFICACAO:
+            return None if especificacao == (None, None) else especificacao
+
+        # Só o serializer raiz lê a query string; os aninhados recebem a sua parte
+        raiz = self.parent is None or (
+            isinstance(self.parent, serializers.ListSerializer) and self.parent.parent is None
+        )
+        request = self.context.get('request')
+        if not raiz or request is None or request.method not in permissions.SAFE_METHODS:
+            return None
+
+        campos = ler_caminhos(request.query_params.get('fields'))
+        expandir = ler_caminhos(request.query_params.get('expand'))
+        if campos is None and expandir is None:
+            return None
+        return campos, expandir
+
+    def _recolher(self, nome, field):
+        """
+        Troca uma relação aninhada não expandida pelo seu ID, ou None para omiti-la.
+        """
+        # Os campos ainda não foram ligados ao serializer, então o source pode estar vazio
+        source = field.source or nome
+        try:
+            model_field = self.Meta.model._meta.get_field(source)
+        except FieldDoesNotExist:
+            return None
+        if model_field.concrete and (model_field.many_to_one or model_field.one_to_one):
+            kwargs = {'source': source} if source != nome else {}
+            return serializers.PrimaryKeyRelatedField(read_only=True, **kwargs)
+        return None
+
+
+def _planejar(model, serializer, prefixo='', ajustes_prefetch=None, caminho=''):
+    """
+    Percorre os campos que o serializer vai de fato devolver e descobre o que o
+    queryset precisa: select_related, prefetch_related e as colunas para only().
+    Retorna (select, prefetch, colunas, pode_usar_only).
+
+    `prefixo` é relativo ao queryset atual; `caminho` é o caminho completo desde
+    o queryset raiz e é a chave usada em `ajustes_prefetch`.
+    """
+    select, prefetch, colunas = [], [], []
+    pode_usar_only = True
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*' or len(field.source_attrs) != 1:
+            pode_usar_only = False
+            continue
+
+        source = field.source
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            # get_<campo>_display() só depende da coluna <campo>
+            if source.startswith('get_') and source.endswith('_display'):
+                colunas.append(prefixo + source[len('get_'):-len('_display')])
+            else:
+                pode_usar_only = False
+            continue
+
+        if isinstance(field, serializers.ListSerializer) and isinstance(field.child, serializers.ModelSerializer):
+            filho = field.child
+            extras = [model_field.field.name] if model_field.one_to_many else []
+            queryset_filho = otimizar_queryset(
+                filho.Meta.model._default_manager.all(), filho, campos_extras=extras,
+                ajustes_prefetch=ajustes_prefetch, _caminho=caminho + prefixo + source + '__',
+            )
+            ajuste = (ajustes_prefetch or {}).get(caminho + prefixo + source)
+            if ajuste is not None:
+                queryset_filho = ajuste(queryset_filho)
+            prefetch.append(Prefetch(prefixo + source, queryset=queryset_filho))
+        elif isinstance(field, serializers.ModelSerializer) and (model_field.many_to_one or model_field.one_to_one):
+            select.append(prefixo + source)
+            if model_field.concrete:
+                colunas.append(prefixo + source)
+            sub_select, sub_prefetch, sub_colunas, sub_only = _planejar(
+                model_field.related_model, field, prefixo + source + '__', ajustes_prefetch, caminho
+            )
+            select.extend(sub_select)
+            prefetch.extend(sub_prefetch)
+            if sub_only:
+                colunas.extend(sub_colunas)
+        elif model_field.many_to_many or model_field.one_to_many:
+            prefetch.append(prefixo + source)
+        elif model_field.concrete:
+            colunas.append(prefixo + source)
+        else:
+            pode_usar_only = False
+
+    return select, prefetch, colunas, pode_usar_only
+
+
+def otimizar_queryset(queryset, serializer, campos_extras=(), ajustes_prefetch=None, _caminho=''):
+    """
+    Ajusta select_related/prefetch_related/only() do queryset aos campos que o
+    serializer (já filtrado por ?fields=/?expand=) vai ler. Relações que não
+    serão devolvidas não são buscadas no banco.
+
+    `campos_extras` são colunas que precisam vir mesmo fora do serializer
+    (ex: campos da ordenação do cursor, a FK usada por um prefetch).
+
+    `ajustes_prefetch` mapeia o caminho de um prefetch (ex: 'resultados_chave__checkins')
+    para uma função que recebe e devolve o queryset do Prefetch, para limitar ou
+    filtrar os filhos buscados.
+    """
+    select, prefetch, colunas, pode_usar_only = _planejar(
+        queryset.model, serializer, ajustes_prefetch=ajustes_prefetch, caminho=_caminho
+    )
+
+    # only() trabalha com nomes de campo ('objetivo'), não com attnames ('objetivo_id')
+    nomes = {f.attname: f.name for f in queryset.model._meta.concrete_fields}
+    for campo in campos_extras:
+        campo = nomes.get(campo, campo)
+        colunas.append(campo)
+        if '__' in campo:
+            select.append(campo.rsplit('__', 1)[0])
+
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if select:
+        queryset = queryset.select_related(*dict.fromkeys(select))
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if pode_usar_only:
+        queryset = queryset.only(queryset.model._meta.pk.name, *dict.fromkeys(colunas))
+    return queryset
+
+
+class SubRequisicaoSerializer(serializers.Serializer):
+    """
+    Uma chamada dentro de POST /api/batch/ (ver reune/lote.py).
+    """
+    id = serializers.CharField(required=False, max_length=100)
+    metodo = serializers.ChoiceField(choices=('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE'), default='GET')
+    url = serializers.CharField(max_length=2000)
+    corpo = serializers.JSONField(required=False, allow_null=True, default=None)
+    cabecalhos = serializers.DictField(child=serializers.CharField(), required=False, default=dict)
+
+
+class LoteSerializer(serializers.Serializer):
+    requisicoes = SubRequisicaoSerializer(many=True, allow_empty=False)
+    # Leituras (GET/HEAD) em threads paralelas; com uma escrita no lote, tudo roda em ordem
+    paralelo = serializers.BooleanField(required=False, default=False)
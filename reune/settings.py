@@ -1,3 +1,4 @@
+import sys
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -25,10 +26,13 @@ INSTALLED_APPS = [
     'okr.apps.OkrConfig',
     'clima.apps.ClimaConfig',
     'feedback.apps.FeedbackConfig',
+    'busca.apps.BuscaConfig',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Conta as consultas SQL e o tempo de cada requisição (reune/instrumentacao.py)
+    'reune.instrumentacao.MedicaoConsultasMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -68,15 +72,65 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # CONFIGURAÇÕES DO DJANGO REST FRAMEWORK
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        # Define JWT como o principal método de autenticação
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Define JWT como o principal método de autenticação. O usuário do token
+        # é resolvido por um cache local (ver usuarios/autenticacao.py)
+        'usuarios.autenticacao.JWTAutenticacaoEmCache',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         # Define que, por padrão, todos os endpoints exigem autenticação
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    # Paginação por cursor (keyset) em todas as listagens. A ordenação de cada
+    # ViewSet fica no atributo 'ordering' e o cliente pode pedir até 200 itens.
+    'DEFAULT_PAGINATION_CLASS': 'reune.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': 50,
+    # Quem vê cada linha: a 'politica_linhas' de cada ViewSet vira um WHERE (ver reune/politicas.py)
+    'DEFAULT_FILTER_BACKENDS': ['reune.politicas.FiltroPoliticaLinhas'],
+}
+
+# JWT: os tokens de /api/token/ levam colaborador, equipe e equipes lideradas
+SIMPLE_JWT = {
+    'TOKEN_OBTAIN_SERIALIZER': 'usuarios.autenticacao.TokenComClaimsSerializer',
+}
+
+# LOGS
+# 'reune.consultas' recebe uma linha JSON por requisição (fora do DEBUG) com o
+# número de consultas SQL, o tempo no banco e as consultas mais lentas. Em INFO
+# só as que fazem CONSULTAS_LOG_LIMITE consultas ou levam CONSULTAS_LOG_LIMITE_MS;
+# para ver todas, baixe o nível do logger para DEBUG.
+CONSULTAS_LOG_LIMITE = 30
+CONSULTAS_LOG_LIMITE_MS = 500
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'reune.consultas': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
 }
+# Em `manage.py test` as linhas de cada requisição só poluem a saída
+if sys.argv[1:2] == ['test']:
+    LOGGING['loggers']['reune.consultas']['level'] = 'WARNING'
+
+# CACHE
+# Arquivos em disco: funciona offline, sem serviço extra, e é compartilhado
+# entre os processos do servidor (a versão de cada model precisa ser a mesma
+# para todos). Com um único processo, a LocMemCache também serve.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+
+# OKRs
+# O progresso de KRs e Objetivos é recalculado por uma thread de fundo depois
+# do commit (okr/recalculo.py). True recalcula na hora, na própria requisição.
+OKR_RECALCULO_SINCRONO = False
 
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",    # Para você poder continuar testando na sua própria máquina
@@ -0,0 +1,30 @@
+# reune_app/reune/settings_local.py
+
+# Perfil local com SQLite, para desenvolver e medir sem o SQL Server:
+#   python manage.py migrate --settings=reune.settings_local
+#   python manage.py seed_reune --colaboradores 200 --settings=reune.settings_local
+#   python manage.py benchmark_endpoints --settings=reune.settings_local
+# O arquivo do banco pode ser trocado pela variável REUNE_SQLITE.
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import ALLOWED_HOSTS, BASE_DIR
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('REUNE_SQLITE', BASE_DIR / 'db_local.sqlite3'),
+    }
+}
+
+# Cache em memória: um único processo, e nada sobra de uma execução para a outra
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+
+# 'testserver' é o host usado pelo cliente de testes (e pelo benchmark)
+ALLOWED_HOSTS = [*ALLOWED_HOSTS, 'testserver']
@@ -0,0 +1,1221 @@
+# reune_app/reune/tests.py
+
+import asyncio
+import csv
+import io
+import json
+import logging
+import re
+import unittest
+from unittest import mock
+from datetime import date, datetime, timezone as dt_timezone
+from itertools import count
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase, APITransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from avaliacoes.models import CicloAvaliacao, Competencia, RespostaAvaliacao
+from busca.models import DocumentoBusca
+from clima.models import RegistroHumor
+from feedback.models import Feedback
+from feedback.views import FeedbackViewSet
+from okr.models import CheckIn, Objetivo, ResultadoChave
+from okr.recalculo import fila
+from okr.views import limitar_ultimos_checkins
+from usuarios import visibilidade
+from usuarios.autenticacao import JWTAutenticacaoEmCache, usuarios_autenticados
+from usuarios.models import Cargo, Colaborador, Equipe
+from .eventos import CanalEventos, canal
+from .lote import LIMITE_LOTE
+from .orcamento_consultas import OrcamentoConsultasMixin
+from .pagination import KeysetCursorPagination
+
+_sequencia = count(1)
+
+
+class OrcamentoConsultasTests(OrcamentoConsultasMixin, APITestCase):
+    """
+    Orçamento de consultas SQL de cada endpoint de listagem e detalhe. O número
+    não pode crescer com a quantidade de linhas: cada teste mede, cria mais
+    dados e mede de novo.
+    """
+    # url -> número máximo de consultas. Objetivos: visibilidade, ETag,
+    # objetivos, KRs e check-ins. Respostas e humor também leem a visibilidade
+    # (a política de linhas de reune/politicas.py)
+    ORCAMENTOS = {
+        '/api/usuarios/cargos/': 1,
+        '/api/usuarios/equipes/': 1,
+        '/api/usuarios/colaboradores/': 1,
+        '/api/avaliacoes/ciclos/': 1,
+        '/api/avaliacoes/competencias/': 1,
+        '/api/avaliacoes/respostas/': 3,
+        '/api/okr/objetivos/': 5,
+        # Só o resumo dos KRs, sem a tabela de check-ins
+        '/api/okr/objetivos/?ultimos_checkins=0': 4,
+        '/api/okr/resultados-chave/': 2,
+        '/api/okr/checkins/': 2,
+        '/api/clima/registros-humor/': 3,
+        '/api/clima/tendencias/': 1,
+        '/api/feedback/feedbacks/': 2,
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.lider = User.objects.create(username='lider')
+        self.equipe = Equipe.objects.create(nome='Equipe raiz', lider=self.lider)
+        self.ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+        self.client.force_authenticate(self.lider)
+        self.criar_organizacao(2)
+
+    def criar_organizacao(self, quantidade):
+        """
+        Cria `quantidade` colaboradores na equipe do líder, cada um com o seu
+        cargo, subequipe, objetivo (2 KRs com 2 check-ins), humor, feedback e avaliação.
+        """
+        for _ in range(quantidade):
+            n = next(_sequencia)
+            usuario = User.objects.create(username=f'usuario{n}', first_name=f'Nome {n}')
+            subequipe = Equipe.objects.create(nome=f'Equipe {n}', equipe_pai=self.equipe)
+            Colaborador.objects.create(
+                usuario=usuario, cargo=Cargo.objects.create(titulo=f'Cargo {n}'),
+                equipe=subequipe, data_admissao=date(2023, 1, 1),
+            )
+            objetivo = Objetivo.objects.create(titulo=f'Objetivo {n}', responsavel=usuario, ciclo=self.ciclo)
+            for k in range(2):
+                resultado = ResultadoChave.objects.create(
+                    objetivo=objetivo, descricao=f'KR {n}.{k}', tipo='Numérico', valor_inicial=0, valor_alvo=10
+                )
+                for valor in (3, 6):
+                    CheckIn.objects.create(
+                        resultado_chave=resultado, colaborador=usuario, valor_atual=valor,
+                        nota_confianca=7, comentario='ok',
+                    )
+            RegistroHumor.objects.create(colaborador=usuario, humor=4)
+            Feedback.objects.create(emissor=self.lider, receptor=usuario, texto='Bom trabalho')
+            RespostaAvaliacao.objects.create(
+                ciclo=self.ciclo, avaliado=usuario, avaliador=self.lider,
+                competencia=Competencia.objects.create(nome=f'Competência {n}', descricao='-'), nota=4,
+            )
+
+    def test_orcamento_das_listagens(self):
+        for url, maximo in self.ORCAMENTOS.items():
+            with self.subTest(url=url):
+                self.assertOrcamentoConsultas(url, maximo)
+
+    def test_listagens_sem_n_mais_1(self):
+        for url in self.ORCAMENTOS:
+            with self.subTest(url=url):
+                self.assertConsultasConstantes(url, lambda: self.criar_organizacao(3))
+
+    def test_orcamento_dos_detalhes(self):
+        objetivo = Objetivo.objects.first()
+        resultado = ResultadoChave.objects.first()
+        detalhes = {
+            f'/api/okr/objetivos/{objetivo.pk}/': 5,
+            f'/api/okr/resultados-chave/{resultado.pk}/': 2,
+            f'/api/okr/resultados-chave/{resultado.pk}/checkins/': 2,
+            f'/api/usuarios/colaboradores/{Colaborador.objects.first().pk}/': 1,
+            f'/api/usuarios/equipes/{self.equipe.pk}/': 1,
+        }
+        for url, maximo in detalhes.items():
+            with self.subTest(url=url):
+                self.assertOrcamentoConsultas(url, maximo)
+
+
+class MedicaoConsultasTests(OrcamentoConsultasMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.usuario = User.objects.create(username='usuario')
+        self.client.force_authenticate(self.usuario)
+
+    @override_settings(DEBUG=True)
+    def test_cabecalhos_em_debug(self):
+        response = self.client.get('/api/feedback/feedbacks/')
+        self.assertEqual(response['X-Endpoint'], 'feedback.list')
+        self.assertGreaterEqual(int(response['X-Query-Count']), 1)
+        self.assertIn('X-Query-Time-Ms', response)
+        self.assertIn('SELECT', response['X-Slowest-Queries'])
+
+    @override_settings(CONSULTAS_LOG_LIMITE=1)
+    def test_log_estruturado_fora_do_debug(self):
+        with self.assertLogs('reune.consultas', level='INFO') as logs:
+            response = self.client.get('/api/feedback/feedbacks/')
+        self.assertNotIn('X-Query-Count', response)
+        self.assertEqual(logs.records[-1].levelno, logging.INFO)
+        registro = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(registro['endpoint'], 'feedback.list')
+        self.assertEqual(registro['status'], 200)
+        self.assertEqual(registro['usuario'], self.usuario.pk)
+        self.assertGreaterEqual(registro['consultas'], 1)
+        self.assertTrue(registro['consultas_lentas'])
+
+    @override_settings(CONSULTAS_LOG_LIMITE=1000, CONSULTAS_LOG_LIMITE_MS=60_000)
+    def test_requisicao_abaixo_do_limite_so_em_debug(self):
+        with self.assertLogs('reune.consultas', level='DEBUG') as logs:
+            self.client.get('/api/feedback/feedbacks/')
+        self.assertEqual([registro.levelno for registro in logs.records], [logging.DEBUG])
+        self.assertEqual(json.loads(logs.records[0].getMessage())['endpoint'], 'feedback.list')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "O plano é lido no formato do SQLite (--settings=reune.settings_local).")
+class PlanoConsultasTests(TestCase):
+    """
+    Roda EXPLAIN nas consultas mais frequentes e falha se alguma voltar a ler a
+    tabela inteira (SCAN) ou deixar de usar o índice de Meta.indexes pensado para
+    ela: sem o composto, o SQLite ainda busca pelo índice da FK, mas ordena tudo
+    numa B-tree temporária.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='usuario')
+        cls.equipe = Equipe.objects.create(nome='Equipe')
+        cls.ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+        objetivo = Objetivo.objects.create(titulo='Objetivo', responsavel=cls.usuario, ciclo=cls.ciclo)
+        cls.resultado = ResultadoChave.objects.create(
+            objetivo=objetivo, descricao='KR', tipo='Numérico', valor_inicial=0, valor_alvo=10
+        )
+
+    def consultas_frequentes(self):
+        # nome -> (queryset, índice esperado no plano)
+        return {
+            'relatorio_avaliacao': (
+                RespostaAvaliacao.objects.filter(avaliado=self.usuario, ciclo=self.ciclo),
+                'resposta_avaliado_ciclo_idx',
+            ),
+            'objetivos_visiveis': (
+                Objetivo.objects.filter(responsavel__in=[self.usuario.pk]).order_by('-data_criacao', '-id'),
+                'objetivo_resp_data_idx',
+            ),
+            'historico_checkins': (
+                CheckIn.objects.filter(resultado_chave=self.resultado).order_by('-data_checkin', '-id'),
+                'checkin_kr_data_idx',
+            ),
+            'ultimos_checkins': (
+                limitar_ultimos_checkins(CheckIn.objects.filter(resultado_chave_id__in=[self.resultado.pk]), 5),
+                'checkin_kr_data_idx',
+            ),
+            'feedbacks_recebidos': (
+                Feedback.objects.filter(receptor=self.usuario).order_by('-data_criacao'),
+                'feedback_receptor_data_idx',
+            ),
+            'humor_da_equipe': (
+                RegistroHumor.objects.filter(equipe=self.equipe, data_registro__range=(date(2024, 1, 1), date(2024, 1, 31))),
+                'humor_equipe_data_idx',
+            ),
+        }
+
+    def plano(self, queryset):
+        # queryset.explain() gera SQL inválido quando há filtro sobre Window
+        # (a consulta vira subquery), então o EXPLAIN é montado aqui
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return '\n'.join(linha[-1] for linha in cursor.fetchall())
+
+    def test_consultas_frequentes_usam_indice(self):
+        for nome, (queryset, indice) in self.consultas_frequentes().items():
+            with self.subTest(consulta=nome):
+                plano = self.plano(queryset)
+                tabela = re.escape(queryset.model._meta.db_table)
+                self.assertNotRegex(plano, rf'\bSCAN {tabela}\b', f"Varredura completa no plano:\n{plano}")
+                self.assertRegex(plano, rf'\bSEARCH {tabela} USING (COVERING )?INDEX {indice}\b', plano)
+
+
+@override_settings(OKR_RECALCULO_SINCRONO=True)
+class EventosTests(TestCase):
+    """
+    Canal de eventos em memória e o stream SSE em /api/eventos/stream/.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lider = User.objects.create(username='lider')
+        cls.membro = User.objects.create(username='membro')
+        cls.outro = User.objects.create(username='outro')
+        equipe = Equipe.objects.create(nome='Equipe', lider=cls.lider)
+        Colaborador.objects.create(usuario=cls.membro, equipe=equipe, data_admissao=date(2023, 1, 1))
+        ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+        objetivo = Objetivo.objects.create(titulo='Objetivo', responsavel=cls.membro, ciclo=ciclo)
+        cls.resultado = ResultadoChave.objects.create(
+            objetivo=objetivo, descricao='KR', tipo='Numérico', valor_inicial=0, valor_alvo=10
+        )
+
+    def tipos_recebidos(self, usuario, desde):
+        eventos, _ = canal.eventos_desde(desde, usuario.pk)
+        return [evento.tipo for evento in eventos]
+
+    def test_retomada_pelo_ultimo_id(self):
+        canal_teste = CanalEventos(tamanho_historico=3)
+        inicio = canal_teste.ultimo_id
+        primeiro = canal_teste.publicar('a', {}, {1})
+        canal_teste.publicar('b', {}, {2})
+        canal_teste.publicar('c', {}, {1, 2})
+
+        eventos, completo = canal_teste.eventos_desde(primeiro.id, 1)
+        self.assertTrue(completo)
+        self.assertEqual([evento.tipo for evento in eventos], ['c'])
+        self.assertEqual([evento.tipo for evento in canal_teste.eventos_desde(inicio, 1)[0]], ['a', 'c'])
+
+        # O histórico cheio descarta 'a': quem parou antes dele precisa recarregar
+        canal_teste.publicar('d', {}, {1})
+        self.assertFalse(canal_teste.eventos_desde(inicio, 1)[1])
+        self.assertTrue(canal_teste.eventos_desde(primeiro.id, 1)[1])
+        # Um id de antes do processo começar também
+        self.assertFalse(canal_teste.eventos_desde(inicio - 1, 2)[1])
+
+    def test_gravacoes_publicam_para_os_interessados(self):
+        desde = canal.ultimo_id
+        with self.captureOnCommitCallbacks(execute=True):
+            CheckIn.objects.create(
+                resultado_chave=self.resultado, colaborador=self.membro, valor_atual=5, nota_confianca=4, comentario='ok'
+            )
+            Feedback.objects.create(emissor=self.lider, receptor=self.membro, texto='Bom trabalho')
+            RegistroHumor.objects.create(colaborador=self.membro, humor=4)
+
+        self.assertEqual(self.tipos_recebidos(self.membro, desde), ['checkin.criado', 'feedback.criado', 'humor.registrado'])
+        self.assertEqual(self.tipos_recebidos(self.lider, desde), ['checkin.criado', 'humor.registrado'])
+        self.assertEqual(self.tipos_recebidos(self.outro, desde), [])
+
+    def test_rollback_nao_publica(self):
+        desde = canal.ultimo_id
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Feedback.objects.create(emissor=self.lider, receptor=self.membro, texto='Rascunho')
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.tipos_recebidos(self.membro, desde), [])
+
+    async def test_stream_entrega_eventos_ao_vivo(self):
+        token = await sync_to_async(lambda: str(AccessToken.for_user(self.membro)))()
+        response = await self.async_client.get('/api/eventos/stream/', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream; charset=utf-8')
+
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+        self.assertIn(b'event: conectado', await anext(stream))
+        canal.publicar('feedback.criado', {'id': 1}, {self.outro.pk})
+        canal.publicar('feedback.criado', {'id': 2}, {self.membro.pk})
+        mensagem = await asyncio.wait_for(anext(stream), 1)
+        self.assertIn(b'event: feedback.criado\ndata: {"id":2}', mensagem)
+        await stream.aclose()
+
+    def test_retomada_pelo_last_event_id(self):
+        desde = canal.ultimo_id
+        canal.publicar('feedback.criado', {'id': 3}, {self.membro.pk})
+        self.client.force_login(self.membro)
+        # Fora do ASGI a resposta traz os eventos pendentes e termina
+        response = self.client.get('/api/eventos/stream/', headers={'Last-Event-ID': str(desde)})
+        conteudo = b''.join(response.streaming_content).decode()
+        self.assertIn('event: feedback.criado\ndata: {"id":3}', conteudo)
+        self.assertNotIn('event: reset', conteudo)
+
+        response = self.client.get('/api/eventos/stream/', headers={'Last-Event-ID': '1'})
+        self.assertIn('event: reset', b''.join(response.streaming_content).decode())
+
+
+@override_settings(OKR_RECALCULO_SINCRONO=True)
+class RecalculoProgressoTests(TestCase):
+    """
+    Progresso de KRs e Objetivos mantido pela fila de okr/recalculo.py.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='usuario')
+        cls.ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+        cls.objetivo = Objetivo.objects.create(titulo='Objetivo', responsavel=cls.usuario, ciclo=cls.ciclo)
+
+    def criar_resultado(self, valor_alvo=10):
+        return ResultadoChave.objects.create(
+            objetivo=self.objetivo, descricao='KR', tipo='Numérico', valor_inicial=0, valor_alvo=valor_alvo
+        )
+
+    def criar_checkin(self, resultado, valor):
+        return CheckIn.objects.create(
+            resultado_chave=resultado, colaborador=self.usuario, valor_atual=valor, nota_confianca=4, comentario='ok'
+        )
+
+    def progressos(self, *resultados):
+        self.objetivo.refresh_from_db()
+        return [str(ResultadoChave.objects.get(pk=kr.pk).progresso) for kr in resultados] + [str(self.objetivo.progresso)]
+
+    def test_checkin_edicao_e_exclusao_atualizam_o_progresso(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            primeiro, segundo = self.criar_resultado(), self.criar_resultado()
+            self.criar_checkin(primeiro, 5)
+        self.assertEqual(self.progressos(primeiro, segundo), ['50.00', '0.00', '25.00'])
+
+        # Mudar o alvo pela API (ou pelo inline do admin) recalcula o KR e o Objetivo
+        with self.captureOnCommitCallbacks(execute=True):
+            primeiro.valor_alvo = 20
+            primeiro.save()
+        self.assertEqual(self.progressos(primeiro, segundo), ['25.00', '0.00', '12.50'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            segundo.delete()
+        self.assertEqual(self.progressos(primeiro), ['25.00', '25.00'])
+
+    def test_comando_reconstroi_o_ciclo(self):
+        resultado = self.criar_resultado()
+        self.criar_checkin(resultado, 10)
+        # Gravações que não passaram pela fila (ex: SQL direto) deixam o progresso errado
+        ResultadoChave.objects.update(progresso=0)
+        call_command('recompute_okr_progress', ciclo=self.ciclo.pk, stdout=io.StringIO())
+        self.assertEqual(self.progressos(resultado), ['100.00', '100.00'])
+
+
+@override_settings(OKR_RECALCULO_SINCRONO=True)
+class ResumoOkrTests(APITestCase):
+    """
+    Colunas de resumo de KRs e Objetivos mantidas por okr/resumo.py.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='usuario')
+        cls.ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+        cls.objetivo = Objetivo.objects.create(titulo='Objetivo', responsavel=cls.usuario, ciclo=cls.ciclo)
+
+    def setUp(self):
+        self.client.force_authenticate(self.usuario)
+        self.primeiro, self.segundo = [
+            ResultadoChave.objects.create(
+                objetivo=self.objetivo, descricao='KR', tipo='Numérico', valor_inicial=0, valor_alvo=10
+            ) for _ in range(2)
+        ]
+
+    def criar_checkin(self, resultado, valor, nota):
+        return CheckIn.objects.create(
+            resultado_chave=resultado, colaborador=self.usuario, valor_atual=valor, nota_confianca=nota, comentario='ok'
+        )
+
+    def resumo(self, resultado):
+        resultado.refresh_from_db()
+        return resultado.num_checkins, resultado.valor_atual, resultado.ultima_nota_confianca
+
+    def test_criacao_edicao_e_exclusao_de_checkins(self):
+        self.objetivo.refresh_from_db()
+        self.assertEqual((self.objetivo.num_resultados, self.objetivo.confianca_media), (2, None))
+
+        antigo = self.criar_checkin(self.primeiro, 2, 2)
+        novo = self.criar_checkin(self.primeiro, 6, 5)
+        self.criar_checkin(self.segundo, 4, 4)
+        self.assertEqual(self.resumo(self.primeiro), (2, 6, 5))
+        self.assertEqual(self.primeiro.ultimo_checkin_em, novo.data_checkin)
+        self.objetivo.refresh_from_db()
+        self.assertEqual(str(self.objetivo.confianca_media), '4.50')
+
+        novo.nota_confianca = 3
+        novo.save()
+        self.assertEqual(self.resumo(self.primeiro), (2, 6, 3))
+
+        # Excluir o último check-in devolve o KR ao anterior; sem nenhum, os campos ficam nulos
+        novo.delete()
+        self.assertEqual(self.resumo(self.primeiro), (1, 2, 2))
+        antigo.delete()
+        self.assertEqual(self.resumo(self.primeiro), (0, None, None))
+        self.assertIsNone(self.primeiro.ultimo_checkin_em)
+        self.objetivo.refresh_from_db()
+        self.assertEqual(str(self.objetivo.confianca_media), '4.00')
+
+        self.segundo.delete()
+        self.objetivo.refresh_from_db()
+        self.assertEqual((self.objetivo.num_resultados, self.objetivo.confianca_media), (1, None))
+
+    def test_envio_em_lote_e_listagem_sem_checkins(self):
+        response = self.client.post('/api/okr/checkins/bulk/', [
+            {'resultado_chave': self.primeiro.pk, 'valor_atual': '3', 'nota_confianca': 2, 'comentario': 'a'},
+            {'resultado_chave': self.primeiro.pk, 'valor_atual': '7', 'nota_confianca': 4, 'comentario': 'b'},
+            {'resultado_chave': self.segundo.pk, 'valor_atual': '5', 'nota_confianca': 5, 'comentario': 'c'},
+        ], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.resumo(self.primeiro), (2, 7, 4))
+        self.assertEqual(self.resumo(self.segundo), (1, 5, 5))
+
+        with self.assertNumQueries(4) as consultas:
+            response = self.client.get('/api/okr/objetivos/?ultimos_checkins=0')
+        self.assertFalse(any('okr_checkin' in consulta['sql'] for consulta in consultas.captured_queries))
+        objetivo = response.data['results'][0]
+        self.assertEqual((objetivo['num_resultados'], objetivo['confianca_media']), (2, '4.50'))
+        self.assertEqual(
+            [(kr['num_checkins'], kr['valor_atual'], kr['ultima_nota_confianca'], kr['checkins']) for kr in objetivo['resultados_chave']],
+            [(2, '7.00', 4, []), (1, '5.00', 5, [])],
+        )
+
+    def test_comando_reconstroi_o_resumo(self):
+        self.criar_checkin(self.primeiro, 8, 3)
+        # Gravações que não passaram pelos signals (ex: SQL direto) deixam o resumo errado
+        ResultadoChave.objects.update(num_checkins=0, valor_atual=None, ultima_nota_confianca=None)
+        Objetivo.objects.update(num_resultados=0, confianca_media=None)
+        call_command('recompute_okr_progress', stdout=io.StringIO())
+        self.assertEqual(self.resumo(self.primeiro), (1, 8, 3))
+        self.primeiro.refresh_from_db()
+        self.assertEqual(str(self.primeiro.progresso), '80.00')
+        self.objetivo.refresh_from_db()
+        self.assertEqual((self.objetivo.num_resultados, str(self.objetivo.confianca_media)), (2, '3.00'))
+
+
+class FilaRecalculoThreadTests(TransactionTestCase):
+    """
+    A thread de fundo precisa de dados confirmados: sem o TestCase envolvendo tudo numa transação.
+    """
+
+    def test_gravacoes_proximas_geram_uma_rodada(self):
+        usuario = User.objects.create(username='usuario')
+        ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+        objetivo = Objetivo.objects.create(titulo='Objetivo', responsavel=usuario, ciclo=ciclo)
+        resultado = ResultadoChave.objects.create(
+            objetivo=objetivo, descricao='KR', tipo='Numérico', valor_inicial=0, valor_alvo=10
+        )
+        fila.aguardar()
+
+        with mock.patch.object(fila, 'processar', wraps=fila.processar) as processar:
+            for valor in (2, 4, 6, 8):
+                CheckIn.objects.create(
+                    resultado_chave=resultado, colaborador=usuario, valor_atual=valor, nota_confianca=4, comentario='ok'
+                )
+            fila.aguardar()
+
+        self.assertEqual(processar.call_count, 1)
+        objetivo.refresh_from_db()
+        self.assertEqual(str(objetivo.progresso), '80.00')
+
+
+@override_settings(OKR_RECALCULO_SINCRONO=True)
+class BuscaTests(TestCase):
+    """
+    Índice de busca textual (busca/indice.py) e o endpoint /api/busca/.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lider = User.objects.create(username='lider')
+        cls.membro = User.objects.create(username='membro')
+        cls.outro = User.objects.create(username='outro')
+        equipe = Equipe.objects.create(nome='Equipe', lider=cls.lider)
+        Colaborador.objects.create(usuario=cls.membro, equipe=equipe, data_admissao=date(2023, 1, 1))
+        cls.ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+        objetivo = Objetivo.objects.create(titulo='Objetivo', responsavel=cls.membro, ciclo=cls.ciclo)
+        cls.resultado = ResultadoChave.objects.create(
+            objetivo=objetivo, descricao='KR', tipo='Numérico', valor_inicial=0, valor_alvo=10
+        )
+
+    def setUp(self):
+        self.feedback = Feedback.objects.create(
+            emissor=self.outro, receptor=self.membro, texto='Ótima apresentação do relatório trimestral.'
+        )
+        self.checkin = CheckIn.objects.create(
+            resultado_chave=self.resultado, colaborador=self.membro, valor_atual=5, nota_confianca=3,
+            comentario='Relatório atrasado pela migração do sistema.',
+        )
+        RespostaAvaliacao.objects.create(
+            ciclo=self.ciclo, avaliado=self.membro, avaliador=self.lider, nota=4,
+            competencia=Competencia.objects.create(nome='Comunicação', descricao='-'),
+            justificativa='Relatórios bem estruturados, mas pode delegar mais.',
+        )
+        RegistroHumor.objects.create(colaborador=self.membro, humor=2, comentario='Cansado com o relatorio.')
+
+    def buscar(self, usuario, q, **params):
+        self.client.force_login(usuario)
+        response = self.client.get('/api/busca/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['resultados']
+
+    def tipos(self, usuario, q, **params):
+        return sorted(resultado['tipo'] for resultado in self.buscar(usuario, q, **params))
+
+    def test_resultados_respeitam_as_permissoes(self):
+        # Prefixo, sem acento: acha "relatório", "Relatórios" e "relatorio"
+        self.assertEqual(self.tipos(self.membro, 'relat'), ['checkin', 'feedback', 'humor'])
+        # O líder vê check-ins e humor da equipe e a avaliação que escreveu, mas não o feedback
+        self.assertEqual(self.tipos(self.lider, 'relat'), ['avaliacao', 'checkin', 'humor'])
+        self.assertEqual(self.tipos(self.outro, 'relat'), ['feedback'])
+        self.assertEqual(self.tipos(self.membro, 'relat', tipos='checkin,humor'), ['checkin', 'humor'])
+        # Todas as palavras precisam aparecer
+        self.assertEqual(self.tipos(self.membro, 'relatório migração'), ['checkin'])
+
+        resultado = self.buscar(self.membro, 'trimestral')[0]
+        self.assertEqual((resultado['tipo'], resultado['id']), ('feedback', self.feedback.pk))
+        self.assertEqual(resultado['trecho'], self.feedback.texto)
+
+    def test_indice_acompanha_edicao_exclusao_e_lote(self):
+        self.feedback.texto = 'Parabéns pela entrega.'
+        self.feedback.save()
+        self.assertEqual(self.tipos(self.membro, 'trimestral'), [])
+        self.assertEqual(self.tipos(self.membro, 'parabens'), ['feedback'])
+
+        self.checkin.delete()
+        self.assertEqual(self.tipos(self.membro, 'migração'), [])
+
+        self.client.force_login(self.membro)
+        response = self.client.post('/api/okr/checkins/bulk/', [
+            {'resultado_chave': self.resultado.pk, 'valor_atual': '6', 'nota_confianca': 4, 'comentario': 'Fornecedor entregou o lote.'},
+        ], content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.tipos(self.lider, 'fornecedor'), ['checkin'])
+
+    def test_parametros_invalidos(self):
+        self.client.force_login(self.membro)
+        self.assertEqual(self.client.get('/api/busca/', {'q': ' ! '}).status_code, 400)
+        self.assertEqual(self.client.get('/api/busca/', {'q': 'relatorio', 'tipos': 'okr'}).status_code, 400)
+
+    def test_comando_reconstroi_o_indice(self):
+        DocumentoBusca.objects.all().delete()
+        self.assertEqual(self.tipos(self.membro, 'relat'), [])
+        call_command('reindexar_busca', stdout=io.StringIO())
+        self.assertEqual(self.tipos(self.membro, 'relat'), ['checkin', 'feedback', 'humor'])
+
+
+class AutenticacaoJWTTests(OrcamentoConsultasMixin, APITestCase):
+    """
+    Autenticação JWT com o usuário resolvido pelo cache local (usuarios/autenticacao.py).
+    """
+
+    def setUp(self):
+        super().setUp()
+        # O cache local sobrevive entre os testes, mas as pks do banco se repetem
+        usuarios_autenticados.limpar()
+        self.membro = User.objects.create_user(username='membro', password='senha-segura-123')
+        self.equipe = Equipe.objects.create(nome='Equipe')
+        self.subequipe = Equipe.objects.create(nome='Subequipe', equipe_pai=self.equipe, lider=self.membro)
+        Colaborador.objects.create(usuario=self.membro, equipe=self.equipe, data_admissao=date(2023, 1, 1))
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.membro)}')
+
+    def test_token_leva_os_claims_do_usuario(self):
+        response = self.client.post('/api/token/', {'username': 'membro', 'password': 'senha-segura-123'})
+        self.assertEqual(response.status_code, 200)
+        for token in (AccessToken(response.data['access']), RefreshToken(response.data['refresh'])):
+            self.assertEqual(token['colaborador'], self.membro.pk)
+            self.assertEqual(token['equipe'], self.equipe.pk)
+            self.assertEqual(token['equipes_lideradas'], [self.subequipe.pk])
+
+    def test_leituras_autenticadas_sem_consultas(self):
+        self.assertOrcamentoConsultas('/api/usuarios/cargos/', 3)
+        # Resposta e usuário em cache: nenhuma consulta
+        self.assertOrcamentoConsultas('/api/usuarios/cargos/', 0)
+
+        usuario = JWTAutenticacaoEmCache().get_user(AccessToken.for_user(self.membro))
+        with self.assertNumQueries(0):
+            self.assertEqual((usuario.colaborador.equipe.nome, usuario.ids_equipes_lideradas), ('Equipe', (self.subequipe.pk,)))
+
+    def test_alteracoes_limpam_o_cache(self):
+        autenticacao = JWTAutenticacaoEmCache()
+        token = AccessToken.for_user(self.membro)
+        autenticacao.get_user(token)
+
+        colaborador = Colaborador.objects.get(usuario=self.membro)
+        colaborador.equipe = self.subequipe
+        colaborador.save()
+        self.assertEqual(autenticacao.get_user(token).colaborador.equipe_id, self.subequipe.pk)
+
+        self.membro.is_active = False
+        self.membro.save()
+        self.assertEqual(self.client.get('/api/usuarios/cargos/').status_code, 401)
+
+
+class PoliticaLinhasTests(APITestCase):
+    """
+    Políticas de linhas (reune/politicas.py) dos ViewSets de feedback, humor e
+    respostas de avaliação.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lider = User.objects.create(username='lider')
+        cls.membro = User.objects.create(username='membro')
+        cls.outro = User.objects.create(username='outro')
+        equipe = Equipe.objects.create(nome='Equipe', lider=cls.lider)
+        subequipe = Equipe.objects.create(nome='Subequipe', equipe_pai=equipe)
+        Colaborador.objects.create(usuario=cls.membro, equipe=subequipe, data_admissao=date(2023, 1, 1))
+        # O líder é membro da própria equipe
+        Colaborador.objects.create(usuario=cls.lider, equipe=equipe, data_admissao=date(2023, 1, 1))
+        ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+        competencia = Competencia.objects.create(nome='Comunicação', descricao='-')
+
+        cls.feedback = Feedback.objects.create(emissor=cls.outro, receptor=cls.membro, texto='Obrigado')
+        cls.humor = RegistroHumor.objects.create(colaborador=cls.membro, humor=4)
+        cls.humor_lider = RegistroHumor.objects.create(colaborador=cls.lider, humor=3)
+        cls.resposta = RespostaAvaliacao.objects.create(
+            ciclo=ciclo, avaliado=cls.membro, avaliador=cls.outro, competencia=competencia, nota=4
+        )
+        cls.resposta_lider = RespostaAvaliacao.objects.create(
+            ciclo=ciclo, avaliado=cls.lider, avaliador=cls.outro, competencia=competencia, nota=5
+        )
+
+    def setUp(self):
+        # Os IDs se repetem entre os testes: a visibilidade em cache não pode vazar
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def ids(self, usuario, url):
+        self.client.force_authenticate(usuario)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return {item['id'] for item in response.data['results']}
+
+    def test_cada_usuario_ve_so_as_suas_linhas(self):
+        esperados = {
+            '/api/feedback/feedbacks/': {
+                self.lider: set(), self.membro: {self.feedback.pk}, self.outro: {self.feedback.pk},
+            },
+            '/api/clima/registros-humor/': {
+                self.lider: {self.humor.pk, self.humor_lider.pk}, self.membro: {self.humor.pk}, self.outro: set(),
+            },
+            # O avaliado não vê as próprias respostas, nem o líder as dele
+            '/api/avaliacoes/respostas/': {
+                self.lider: {self.resposta.pk}, self.membro: set(),
+                self.outro: {self.resposta.pk, self.resposta_lider.pk},
+            },
+        }
+        # Com poucos liderados o filtro leva os IDs; com muitos, uma subquery
+        for limite in (visibilidade.LIMITE_IDS_LITERAIS, 0):
+            with mock.patch.object(visibilidade, 'LIMITE_IDS_LITERAIS', limite):
+                for url, por_usuario in esperados.items():
+                    for usuario, ids in por_usuario.items():
+                        with self.subTest(limite=limite, url=url, usuario=usuario.username):
+                            cache.clear()
+                            self.assertEqual(self.ids(usuario, url), ids)
+
+    def test_linha_fora_da_politica_responde_404(self):
+        self.client.force_authenticate(self.lider)
+        self.assertEqual(self.client.get(f'/api/feedback/feedbacks/{self.feedback.pk}/').status_code, 404)
+        self.assertEqual(self.client.delete(f'/api/avaliacoes/respostas/{self.resposta_lider.pk}/').status_code, 404)
+        self.assertTrue(RespostaAvaliacao.objects.filter(pk=self.resposta_lider.pk).exists())
+        self.assertEqual(self.client.get(f'/api/clima/registros-humor/{self.humor.pk}/').status_code, 200)
+
+
+class DashboardTests(OrcamentoConsultasMixin, APITestCase):
+    """
+    /api/dashboard/: o resumo da tela inicial, em cache por usuário.
+    """
+
+    def setUp(self):
+        super().setUp()
+        usuarios_autenticados.limpar()
+        self.membro = User.objects.create(username='membro')
+        self.colega = User.objects.create(username='colega')
+        self.equipe = Equipe.objects.create(nome='Equipe')
+        for usuario in (self.membro, self.colega):
+            Colaborador.objects.create(usuario=usuario, equipe=self.equipe, data_admissao=date(2023, 1, 1))
+        self.ciclo = CicloAvaliacao.objects.create(
+            titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30),
+            status=CicloAvaliacao.StatusChoices.ATIVO,
+        )
+        encerrado = CicloAvaliacao.objects.create(
+            titulo='Encerrado', data_inicio=date(2023, 1, 1), data_fim=date(2023, 6, 30),
+            status=CicloAvaliacao.StatusChoices.CONCLUIDO,
+        )
+        Objetivo.objects.create(titulo='Atual', responsavel=self.membro, ciclo=self.ciclo)
+        Objetivo.objects.create(titulo='Antigo', responsavel=self.membro, ciclo=encerrado)
+        RegistroHumor.objects.create(colaborador=self.membro, humor=4)
+        RegistroHumor.objects.create(colaborador=self.colega, humor=2)
+        Feedback.objects.create(emissor=self.colega, receptor=self.membro, texto='Valeu')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.membro)}')
+
+    def test_resumo_da_tela_inicial(self):
+        dados = self.client.get('/api/dashboard/').json()
+        self.assertEqual([ciclo['id'] for ciclo in dados['ciclos_ativos']], [self.ciclo.pk])
+        self.assertEqual(dados['objetivos']['total'], 1)
+        self.assertEqual([objetivo['titulo'] for objetivo in dados['objetivos']['itens']], ['Atual'])
+        self.assertEqual((dados['humor_equipe']['quantidade'], dados['humor_equipe']['media_humor']), (2, 3.0))
+        self.assertEqual(dados['feedbacks'], {'recebidos': 1, 'novos': 1})
+
+    def test_consultas_fixas_e_cache_por_usuario(self):
+        # Autenticação (usuário e equipes lideradas) e as 5 consultas do dashboard
+        self.assertOrcamentoConsultas('/api/dashboard/', 7)
+        self.assertOrcamentoConsultas('/api/dashboard/', 0)
+        self.assertConsultasConstantes('/api/dashboard/', lambda: [
+            Objetivo.objects.create(titulo=f'Objetivo {n}', responsavel=self.membro, ciclo=self.ciclo) for n in range(3)
+        ])
+
+        # Uma gravação troca a versão e o próximo acesso já vê o dado novo
+        Feedback.objects.create(emissor=self.colega, receptor=self.membro, texto='De novo')
+        self.assertEqual(self.client.get('/api/dashboard/').json()['feedbacks']['recebidos'], 2)
+
+
+class LoteTests(OrcamentoConsultasMixin, APITestCase):
+    """
+    POST /api/batch/: várias chamadas à API numa única requisição.
+    """
+
+    def setUp(self):
+        super().setUp()
+        usuarios_autenticados.limpar()
+        self.usuario = User.objects.create(username='usuario')
+        self.colega = User.objects.create(username='colega')
+        self.feedback = Feedback.objects.create(emissor=self.colega, receptor=self.usuario, texto='Valeu')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.usuario)}')
+
+    def lote(self, *requisicoes, **opcoes):
+        response = self.client.post('/api/batch/', {'requisicoes': list(requisicoes), **opcoes}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['respostas']
+
+    def test_executa_as_chamadas_em_ordem(self):
+        respostas = self.lote(
+            {'id': 'lista', 'url': '/api/feedback/feedbacks/'},
+            # View assíncrona
+            {'id': 'caixa', 'url': '/api/feedback/caixa/?limite=5'},
+            {'metodo': 'POST', 'url': '/api/feedback/feedbacks/', 'corpo': {'receptor_id': self.colega.pk, 'texto': 'Obrigado'}},
+            {'metodo': 'DELETE', 'url': f'/api/feedback/feedbacks/{self.feedback.pk}/'},
+            {'url': '/api/feedback/caixa/'},
+        )
+        self.assertEqual([resposta['status'] for resposta in respostas], [200, 200, 201, 204, 200])
+        self.assertEqual([resposta['id'] for resposta in respostas], ['lista', 'caixa', '2', '3', '4'])
+        self.assertEqual([item['id'] for item in respostas[0]['corpo']['results']], [self.feedback.pk])
+        self.assertEqual(respostas[1]['corpo']['total_recebidos'], 1)
+        self.assertEqual(respostas[2]['corpo']['texto'], 'Obrigado')
+        # A exclusão já vale para a chamada seguinte
+        self.assertEqual(respostas[4]['corpo']['total_recebidos'], 0)
+
+    def test_cabecalhos_das_sub_requisicoes(self):
+        etag = self.lote({'url': '/api/feedback/feedbacks/'})[0]['cabecalhos']['ETag']
+        resposta, = self.lote({'url': '/api/feedback/feedbacks/', 'cabecalhos': {'If-None-Match': etag}})
+        self.assertEqual((resposta['status'], resposta['corpo']), (304, None))
+
+    def test_chamadas_recusadas(self):
+        respostas = self.lote(
+            {'url': '/admin/'},
+            {'url': '/api/nada/'},
+            {'url': '/api/batch/', 'metodo': 'POST', 'corpo': {'requisicoes': []}},
+            {'url': '/api/eventos/stream/'},
+            {'url': f'/api/feedback/feedbacks/{self.feedback.pk + 100}/'},
+        )
+        self.assertEqual([resposta['status'] for resposta in respostas], [400, 404, 400, 400, 404])
+
+        excesso = [{'url': '/api/feedback/caixa/'}] * (LIMITE_LOTE + 1)
+        for corpo in ({'requisicoes': excesso}, {'requisicoes': []}, {'requisicoes': [{'metodo': 'TRACE', 'url': '/api/'}]}):
+            with self.subTest(corpo=len(corpo['requisicoes'])):
+                self.assertEqual(self.client.post('/api/batch/', corpo, format='json').status_code, 400)
+
+        self.client.credentials()
+        self.assertEqual(self.client.post('/api/batch/', {'requisicoes': [{'url': '/api/feedback/caixa/'}]}, format='json').status_code, 401)
+
+    def test_autenticacao_uma_vez_por_lote(self):
+        chamadas = [{'url': '/api/feedback/caixa/'}] * 3
+        self.lote(*chamadas)
+        # Usuário do JWT em cache: só as 3 consultas de cada caixa
+        self.assertOrcamentoConsultas(
+            '/api/batch/', 9, metodo='post', data={'requisicoes': chamadas}, format='json'
+        )
+
+
+class LoteParaleloTests(APITransactionTestCase):
+    """
+    Leituras do lote em threads: cada thread usa a sua conexão, então os dados
+    precisam estar confirmados (sem o TestCase envolvendo tudo numa transação).
+    """
+
+    def test_leituras_em_paralelo(self):
+        usuario = User.objects.create(username='usuario')
+        colega = User.objects.create(username='colega')
+        for n in range(3):
+            Feedback.objects.create(emissor=colega, receptor=usuario, texto=f'Feedback {n}')
+        self.client.force_authenticate(usuario)
+
+        requisicoes = [{'url': '/api/feedback/caixa/'}, {'url': '/api/feedback/feedbacks/'}] * 3
+        response = self.client.post('/api/batch/', {'paralelo': True, 'requisicoes': requisicoes}, format='json')
+        self.assertEqual(response.status_code, 200)
+        respostas = response.json()['respostas']
+        self.assertEqual([resposta['status'] for resposta in respostas], [200] * 6)
+        self.assertEqual({resposta['corpo']['total_recebidos'] for resposta in respostas[::2]}, {3})
+        self.assertEqual({len(resposta['corpo']['results']) for resposta in respostas[1::2]}, {3})
+
+
+class PaginacaoKeysetTests(TestCase):
+    """
+    KeysetCursorPagination com um campo anulável na ordenação: as páginas
+    atravessam a fronteira entre NULL e valores, nos dois sentidos.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        usuario = User.objects.create(username='usuario')
+        ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+        objetivo = Objetivo.objects.create(titulo='Objetivo', responsavel=usuario, ciclo=ciclo)
+        datas = [None, datetime(2024, 3, 1, tzinfo=dt_timezone.utc), None, datetime(2024, 2, 1, tzinfo=dt_timezone.utc), None,
+                 datetime(2024, 3, 1, tzinfo=dt_timezone.utc), None]
+        for n, data in enumerate(datas):
+            resultado = ResultadoChave.objects.create(
+                objetivo=objetivo, descricao=f'KR {n}', tipo='Numérico', valor_inicial=0, valor_alvo=10
+            )
+            ResultadoChave.objects.filter(pk=resultado.pk).update(ultimo_checkin_em=data)
+
+    def paginas(self, ordering):
+        """
+        Percorre todas as páginas (2 itens) para frente e depois de volta,
+        retornando os ids na ordem de cada percurso.
+        """
+        view = SimpleNamespace(ordering=ordering)
+        queryset = ResultadoChave.objects.all()
+
+        def pagina(url):
+            paginacao = KeysetCursorPagination()
+            itens = paginacao.paginate_queryset(queryset, Request(APIRequestFactory().get(url)), view)
+            return [item.pk for item in itens], paginacao
+
+        ida, url = [], '/api/?page_size=2'
+        while url:
+            ids, paginacao = pagina(url)
+            ida += ids
+            url = paginacao.get_next_link()
+        volta, url = [], paginacao.get_previous_link()
+        while url:
+            ids, paginacao = pagina(url)
+            volta = ids + volta
+            url = paginacao.get_previous_link()
+        return ida, volta
+
+    def test_paginas_atravessam_nulls(self):
+        for ordering in (('ultimo_checkin_em', 'id'), ('-ultimo_checkin_em', 'id'), ('-ultimo_checkin_em', '-id')):
+            with self.subTest(ordering=ordering):
+                esperado = list(ResultadoChave.objects.order_by(*ordering).values_list('pk', flat=True))
+                ida, volta = self.paginas(ordering)
+                self.assertEqual(ida, esperado)
+                # A volta começa antes da última página (só o 7º item)
+                self.assertEqual(volta, esperado[:-1])
+
+
+class ExportacaoTests(APITestCase):
+    """
+    GET .../export/ (ExportacaoMixin): CSV e NDJSON em streaming, os filtros
+    de filtros_exportacao e o acesso só para administradores.
+    """
+
+    URL = '/api/feedback/feedbacks/export/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', is_staff=True)
+        cls.emissor = User.objects.create(username='emissor')
+        cls.receptor = User.objects.create(username='receptor')
+        cls.feedbacks = [
+            Feedback.objects.create(emissor=cls.emissor, receptor=receptor, texto=texto)
+            for receptor, texto in ((cls.receptor, 'Ótimo, "valeu"'), (cls.admin, 'Obrigado'), (cls.receptor, 'De novo'))
+        ]
+        Feedback.objects.filter(pk=cls.feedbacks[0].pk).update(data_criacao=datetime(2024, 1, 10, tzinfo=dt_timezone.utc))
+
+    def exportar(self, usuario=None, **parametros):
+        self.client.force_authenticate(usuario or self.admin)
+        return self.client.get(self.URL, parametros)
+
+    def test_csv_em_streaming(self):
+        response = self.exportar()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="feedbacks.csv"')
+        # Um pedaço para o cabeçalho e um por linha, sem montar o arquivo inteiro
+        pedacos = list(response.streaming_content)
+        self.assertEqual(len(pedacos), 4)
+
+        conteudo = b''.join(pedacos).decode('utf-8')
+        self.assertTrue(conteudo.startswith('\ufeff'))
+        linhas = list(csv.reader(io.StringIO(conteudo.lstrip('\ufeff'))))
+        self.assertEqual(linhas[0], list(FeedbackViewSet.campos_exportacao))
+        self.assertEqual([int(linha[0]) for linha in linhas[1:]], [feedback.pk for feedback in self.feedbacks])
+        self.assertEqual(linhas[1][5], 'Ótimo, "valeu"')
+        self.assertEqual(linhas[1][6], '2024-01-10T00:00:00+00:00')
+
+    def test_ndjson_com_filtros(self):
+        response = self.exportar(format='ndjson', receptor_id=self.receptor.pk)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        registros = [json.loads(linha) for linha in b''.join(response.streaming_content).decode('utf-8').splitlines()]
+        self.assertEqual([registro['id'] for registro in registros], [self.feedbacks[0].pk, self.feedbacks[2].pk])
+        self.assertEqual(registros[0]['receptor__username'], 'receptor')
+
+        response = self.exportar(format='ndjson', receptor_id=self.receptor.pk, inicio='2024-02-01')
+        registros = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual([json.loads(linha)['id'] for linha in registros], [self.feedbacks[2].pk])
+
+    def test_filtro_invalido(self):
+        response = self.exportar(receptor_id='abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.streaming)
+        self.assertIn('receptor_id', response.json()['error'])
+
+    def test_csv_neutraliza_formulas(self):
+        textos = ['=HYPERLINK("http://exemplo.com")', '+1+1', '-2', '@SOMA(A1)', '\tTab', 'Normal = ok']
+        for texto in textos:
+            Feedback.objects.create(emissor=self.emissor, receptor=self.receptor, texto=texto)
+        conteudo = b''.join(self.exportar().streaming_content).decode('utf-8')
+        exportados = [linha[5] for linha in csv.reader(io.StringIO(conteudo.lstrip('\ufeff')))][-len(textos):]
+        self.assertEqual(exportados, ["'" + texto for texto in textos[:-1]] + ['Normal = ok'])
+        # O NDJSON não é aberto como planilha: o texto sai como foi gravado
+        conteudo = b''.join(self.exportar(format='ndjson').streaming_content).decode('utf-8')
+        self.assertEqual([json.loads(linha)['texto'] for linha in conteudo.splitlines()][-len(textos):], textos)
+
+    def test_so_administradores(self):
+        # Nem quem enviou os feedbacks exporta; o erro sai em JSON
+        response = self.exportar(self.emissor)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.URL).status_code, 401)
+
+
+class CamposDinamicosTests(APITestCase):
+    """
+    ?fields= e ?expand= (DynamicFieldsMixin) e o queryset ajustado a eles por
+    otimizar_queryset, na listagem e no detalhe de objetivos.
+    """
+
+    URL = '/api/okr/objetivos/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='usuario')
+        ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+        cls.objetivo = Objetivo.objects.create(titulo='Objetivo', descricao='Descrição', responsavel=cls.usuario, ciclo=ciclo)
+        cls.resultado = ResultadoChave.objects.create(
+            objetivo=cls.objetivo, descricao='KR', tipo='Numérico', valor_inicial=0, valor_alvo=10
+        )
+        CheckIn.objects.create(
+            resultado_chave=cls.resultado, colaborador=cls.usuario, valor_atual=5, nota_confianca=4, comentario='ok'
+        )
+
+    def setUp(self):
+        # A visibilidade fica em cache e os IDs se repetem entre os testes
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_authenticate(self.usuario)
+
+    def listar(self, **parametros):
+        response = self.client.get(self.URL, parametros)
+        self.assertEqual(response.status_code, 200)
+        item, = response.data['results']
+        return item
+
+    def test_sem_parametros_resposta_completa(self):
+        item = self.listar()
+        self.assertEqual(item['responsavel']['username'], 'usuario')
+        self.assertEqual(item['resultados_chave'][0]['checkins'][0]['colaborador']['id'], self.usuario.pk)
+
+    def test_campos_pedidos(self):
+        self.assertEqual(self.listar(fields='id,titulo'), {'id': self.objetivo.pk, 'titulo': 'Objetivo'})
+        detalhe = self.client.get(f'{self.URL}{self.objetivo.pk}/', {'fields': 'titulo,progresso'}).data
+        self.assertEqual(set(detalhe), {'titulo', 'progresso'})
+
+    def test_caminhos_aninhados(self):
+        item = self.listar(fields='id,responsavel.username,resultados_chave.progresso,resultados_chave.checkins.valor_atual')
+        self.assertEqual(set(item), {'id', 'responsavel', 'resultados_chave'})
+        self.assertEqual(item['responsavel'], {'username': 'usuario'})
+        resultado, = item['resultados_chave']
+        self.assertEqual(set(resultado), {'progresso', 'checkins'})
+        self.assertEqual(resultado['checkins'], [{'valor_atual': '5.00'}])
+
+    def test_expand_recolhe_relacoes(self):
+        # Sem expandir: a FK vira o ID e a lista de filhos sai da resposta
+        item = self.listar(expand='')
+        self.assertEqual(item['responsavel'], self.usuario.pk)
+        self.assertNotIn('resultados_chave', item)
+
+        item = self.listar(expand='resultados_chave.checkins')
+        self.assertEqual(item['responsavel'], self.usuario.pk)
+        checkin, = item['resultados_chave'][0]['checkins']
+        self.assertEqual(checkin['colaborador'], self.usuario.pk)
+        self.assertEqual(checkin['comentario'], 'ok')
+
+    def test_campos_desconhecidos_sao_ignorados(self):
+        self.assertEqual(self.listar(fields='id,inexistente,resultados_chave'), {
+            'id': self.objetivo.pk, 'resultados_chave': self.listar()['resultados_chave'],
+        })
+        self.assertEqual(self.listar(fields='id', expand='inexistente'), {'id': self.objetivo.pk})
+
+    def test_select_so_com_as_colunas_pedidas(self):
+        tabela_objetivo, tabela_resultado = Objetivo._meta.db_table, ResultadoChave._meta.db_table
+        tabela_checkin, tabela_usuario = CheckIn._meta.db_table, User._meta.db_table
+
+        def consultas(**parametros):
+            with CaptureQueriesContext(connection) as capturadas:
+                self.listar(**parametros)
+            return [consulta['sql'] for consulta in capturadas]
+
+        selects = consultas(fields='id,titulo')
+        sql_objetivo, = [sql for sql in selects if sql.startswith(f'SELECT "{tabela_objetivo}"."id"')]
+        # A data de criação entra por causa da ordenação do cursor
+        colunas = sql_objetivo[len('SELECT '):sql_objetivo.index(' FROM ')]
+        self.assertEqual(colunas, ', '.join(f'"{tabela_objetivo}"."{coluna}"' for coluna in ('id', 'titulo', 'data_criacao')))
+        self.assertNotIn(f'JOIN "{tabela_usuario}"', sql_objetivo)
+        for tabela in (tabela_resultado, tabela_checkin):
+            self.assertFalse([sql for sql in selects if f'FROM "{tabela}"' in sql])
+
+        selects = consultas(fields='id,resultados_chave.progresso')
+        sql_resultado, = [sql for sql in selects if f'FROM "{tabela_resultado}"' in sql]
+        self.assertIn(f'"{tabela_resultado}"."progresso"', sql_resultado)
+        self.assertNotIn(f'"{tabela_resultado}"."descricao"', sql_resultado)
+        self.assertFalse([sql for sql in selects if f'FROM "{tabela_checkin}"' in sql])
+
+
+@override_settings(OKR_RECALCULO_SINCRONO=True)
+class RespostaCondicionalTests(APITestCase):
+    """
+    GETs condicionais (RespostaCondicionalMixin) na listagem e no detalhe de
+    objetivos: 304 com If-None-Match e If-Modified-Since, e um ETag novo depois
+    de gravações, do recálculo da fila e de mudanças na visibilidade.
+    """
+
+    URL = '/api/okr/objetivos/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.lider = User.objects.create(username='lider')
+        cls.membro = User.objects.create(username='membro')
+        cls.equipe = Equipe.objects.create(nome='Equipe', lider=cls.lider)
+        cls.ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+        cls.objetivo = Objetivo.objects.create(titulo='Do líder', responsavel=cls.lider, ciclo=cls.ciclo)
+        Objetivo.objects.create(titulo='Do membro', responsavel=cls.membro, ciclo=cls.ciclo)
+        cls.resultado = ResultadoChave.objects.create(
+            objetivo=cls.objetivo, descricao='KR', tipo='Numérico', valor_inicial=0, valor_alvo=10
+        )
+
+    def setUp(self):
+        # A visibilidade e as versões ficam em cache e os IDs se repetem entre os testes
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_authenticate(self.lider)
+
+    def urls(self):
+        return (self.URL, f'{self.URL}{self.objetivo.pk}/')
+
+    def test_if_none_match(self):
+        for url in self.urls():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response['Cache-Control'], 'private, no-cache')
+                etag = response['ETag']
+
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertFalse(response.content)
+                self.assertEqual(response['ETag'], etag)
+                # O ETag fraco e a lista com outros valores também valem
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=f'"outro", W/{etag}').status_code, 304)
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='"outro"').status_code, 200)
+
+                # O ETag é de cada usuário: a mesma URL para outro usuário não vale
+                self.client.force_authenticate(self.membro)
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200 if url == self.URL else 404)
+                self.client.force_authenticate(self.lider)
+
+    def test_if_modified_since(self):
+        for url in self.urls():
+            with self.subTest(url=url):
+                ultima_alteracao = self.client.get(url)['Last-Modified']
+                self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=ultima_alteracao).status_code, 304)
+                self.assertEqual(
+                    self.client.get(url, HTTP_IF_MODIFIED_SINCE='Mon, 01 Jan 2024 00:00:00 GMT').status_code, 200
+                )
+                # If-None-Match tem precedência: um ETag diferente gera 200 mesmo com a data
+                response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=ultima_alteracao, HTTP_IF_NONE_MATCH='"outro"')
+                self.assertEqual(response.status_code, 200)
+
+    def test_etag_muda_depois_de_gravar(self):
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls()}
+        with self.captureOnCommitCallbacks(execute=True):
+            CheckIn.objects.create(
+                resultado_chave=self.resultado, colaborador=self.lider, valor_atual=5, nota_confianca=4, comentario='ok'
+            )
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_muda_depois_do_recalculo(self):
+        url = f'{self.URL}{self.objetivo.pk}/'
+        # Um UPDATE direto não dispara signals: o ETag continua valendo...
+        ResultadoChave.objects.filter(pk=self.resultado.pk).update(valor_atual=5)
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # ...até a fila recalcular o progresso, que troca as versões
+        with self.captureOnCommitCallbacks(execute=True):
+            fila.marcar(resultados=[self.resultado.pk])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['progresso'], '50.00')
+
+    def test_sem_304_quando_a_visibilidade_muda(self):
+        response = self.client.get(self.URL)
+        self.assertEqual([item['titulo'] for item in response.data['results']], ['Do líder'])
+
+        # Nenhum objetivo foi gravado, mas o membro entrou na equipe do líder
+        Colaborador.objects.create(usuario=self.membro, equipe=self.equipe, data_admissao=date(2023, 1, 1))
+        response = self.client.get(self.URL, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({item['titulo'] for item in response.data['results']}, {'Do líder', 'Do membro'})
+
+
+class RespostaEmCacheTests(APITestCase):
+    """
+    Respostas de list/retrieve guardadas no cache (RespostaEmCacheMixin) e
+    invalidadas pela versão do model (reune/cache.py), com cargos.
+    """
+
+    URL = '/api/usuarios/cargos/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create(username='usuario')
+        cls.cargo = Cargo.objects.create(titulo='Analista')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_authenticate(self.usuario)
+
+    def x_cache(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['X-Cache']
+
+    def urls(self):
+        return (self.URL, f'{self.URL}{self.cargo.pk}/')
+
+    def test_hit_depois_do_primeiro_acesso(self):
+        for url in self.urls():
+            with self.subTest(url=url):
+                self.assertEqual([self.x_cache(url), self.x_cache(url)], ['MISS', 'HIT'])
+        # A query string faz parte da chave
+        self.assertEqual(self.x_cache(f'{self.URL}?fields=id'), 'MISS')
+        # O HIT não consulta o banco nem muda o conteúdo
+        with self.assertNumQueries(0):
+            response = self.client.get(f'{self.URL}{self.cargo.pk}/')
+        self.assertEqual(response.data['titulo'], 'Analista')
+
+    def test_gravar_e_apagar_invalidam(self):
+        for url in self.urls():
+            self.x_cache(url)
+
+        self.cargo.titulo = 'Analista Sênior'
+        self.cargo.save()
+        for url in self.urls():
+            with self.subTest(url=url, apos='post_save'):
+                self.assertEqual(self.x_cache(url), 'MISS')
+        self.assertEqual(self.client.get(f'{self.URL}{self.cargo.pk}/').data['titulo'], 'Analista Sênior')
+
+        outro = Cargo.objects.create(titulo='Gerente')
+        self.x_cache(self.URL)
+        outro.delete()
+        with self.subTest(apos='post_delete'):
+            self.assertEqual(self.x_cache(self.URL), 'MISS')
+            self.assertEqual([item['titulo'] for item in self.client.get(self.URL).data['results']], ['Analista Sênior'])
+
+    def test_outros_models_nao_invalidam(self):
+        for url in self.urls():
+            self.x_cache(url)
+        Feedback.objects.create(emissor=self.usuario, receptor=User.objects.create(username='outro'), texto='Valeu')
+        Equipe.objects.create(nome='Equipe')
+        for url in self.urls():
+            with self.subTest(url=url):
+                self.assertEqual(self.x_cache(url), 'HIT')
@@ -2,6 +2,7 @@
 
 from django.contrib import admin
 from django.urls import path, include
+from .views import LoteViewSet, dashboard, stream_eventos
 # IMPORTE AS VIEWS DE TOKEN
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
@@ -22,4 +23,14 @@ urlpatterns = [
     path('api/avaliacoes/', include('avaliacoes.urls')),
     path('api/clima/', include('clima.urls')),
     path('api/feedback/', include('feedback.urls')),
+    path('api/busca/', include('busca.urls')),
+
+    # Resumo da tela inicial numa única chamada (ver reune/views.py)
+    path('api/dashboard/', dashboard, name='dashboard'),
+
+    # Várias chamadas à API numa só requisição (ver reune/lote.py)
+    path('api/batch/', LoteViewSet.as_view({'post': 'create'}, basename='lote'), name='batch'),
+
+    # Server-Sent Events com as novidades do usuário (ver reune/views.py)
+    path('api/eventos/stream/', stream_eventos, name='eventos-stream'),
 ]
\ No newline at end of file
@@ -0,0 +1,231 @@
+# reune_app/reune/views.py
+
+import asyncio
+import datetime
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Avg, Count, Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status, viewsets
+from rest_framework.response import Response
+
+from avaliacoes.models import CicloAvaliacao
+from clima.models import RegistroHumor, TendenciaHumor
+from feedback.models import Feedback
+from okr.models import Objetivo
+from usuarios.models import Colaborador
+from .assincrono import api_assincrona, listar
+from .cache import versoes_modelos
+from .eventos import Evento, canal, formatar_sse
+from .lote import LIMITE_LOTE, executar_lote
+from .mixins import MedicaoConsultasMixin
+from .serializers import LoteSerializer
+
+# O navegador espera isso antes de reconectar (e mandar o Last-Event-ID)
+RECONEXAO_MS = 3000
+# Comentário enviado quando não há eventos, para proxies não derrubarem a conexão
+INTERVALO_PING = 15
+# A conexão é encerrada de tempos em tempos: na reconexão o token é validado de novo
+DURACAO_MAXIMA = 5 * 60
+
+# Dashboard: segundos em cache por usuário, dias de humor e objetivos listados
+TEMPO_CACHE_DASHBOARD = 60
+DIAS_DASHBOARD = 7
+OBJETIVOS_DASHBOARD = 10
+# Qualquer gravação nestes models troca a chave do cache do dashboard
+MODELOS_DASHBOARD = (Objetivo, CicloAvaliacao, Feedback, RegistroHumor, Colaborador)
+
+
+def _inicio_stream(usuario_id, ultimo_id):
+    """
+    Primeiras mensagens de toda conexão: o intervalo de reconexão, os eventos
+    perdidos desde `ultimo_id` (ou 'reset', se já não estão no histórico) e
+    'conectado' com o id atual, para o cliente ter de onde retomar.
+    Retorna (mensagens, id atual); o que vier depois desse id chega pela fila.
+    """
+    atual = canal.ultimo_id
+    mensagens = [f'retry: {RECONEXAO_MS}\n\n']
+    if ultimo_id is not None:
+        eventos, completo = canal.eventos_desde(ultimo_id, usuario_id)
+        if not completo:
+            mensagens.append(formatar_sse(Evento(atual, 'reset', {}, frozenset())))
+        mensagens.extend(formatar_sse(evento) for evento in eventos if evento.id <= atual)
+    mensagens.append(formatar_sse(Evento(atual, 'conectado', {}, frozenset())))
+    return mensagens, atual
+
+
+async def _stream(usuario_id, ultimo_id):
+    # Assina antes de ler o histórico: nada publicado no meio fica de fora
+    assinatura = canal.assinar(usuario_id)
+    try:
+        mensagens, enviado_ate = _inicio_stream(usuario_id, ultimo_id)
+        for mensagem in mensagens:
+            yield mensagem
+
+        loop = asyncio.get_running_loop()
+        fim = loop.time() + DURACAO_MAXIMA
+        while (restante := fim - loop.time()) > 0:
+            try:
+                evento = await asyncio.wait_for(assinatura.fila.get(), min(INTERVALO_PING, restante))
+            except asyncio.TimeoutError:
+                evento = None
+            if assinatura.atrasada:
+                yield formatar_sse(Evento(canal.ultimo_id, 'reset', {}, frozenset()))
+                return
+            if evento is None:
+                yield ': ping\n\n'
+            elif evento.id > enviado_ate:
+                yield formatar_sse(evento)
+    finally:
+        canal.cancelar(assinatura)
+
+
+@api_assincrona('eventos.stream')
+async def stream_eventos(request, usuario):
+    """
+    Server-Sent Events (text/event-stream) com o que interessa ao usuário:
+    'feedback.criado', 'checkin.criado' e 'humor.registrado', cada um com os
+    IDs para o cliente atualizar só o que mudou.
+    Exemplo de URL: /api/eventos/stream/  (retomada: cabeçalho Last-Event-ID ou ?ultimo_id=)
+
+    Um evento 'reset' avisa que houve perda (reinício do servidor, histórico
+    cheio) e que as listas devem ser recarregadas. No WSGI (runserver) não há
+    conexão longa: a resposta traz só os eventos pendentes e termina, e o
+    EventSource reconecta depois de RECONEXAO_MS, como num polling.
+    """
+    ultimo_id = request.headers.get('Last-Event-ID') or request.GET.get('ultimo_id')
+    try:
+        ultimo_id = int(ultimo_id) if ultimo_id else None
+    except ValueError:
+        ultimo_id = None
+
+    if isinstance(request, ASGIRequest):
+        conteudo = _stream(usuario.pk, ultimo_id)
+    else:
+        conteudo, _ = _inicio_stream(usuario.pk, ultimo_id)
+    response = StreamingHttpResponse(conteudo, content_type='text/event-stream; charset=utf-8')
+    response['Cache-Control'] = 'no-cache'
+    # Não deixa proxies (nginx) acumularem os eventos antes de repassar
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def _montar_dashboard(usuario):
+    """
+    Os dados do dashboard em 5 consultas independentes: ciclos ativos, resumo e
+    lista dos objetivos do usuário nesses ciclos, humor diário da equipe dele
+    (lido do TendenciaHumor) e totais de feedbacks recebidos. O asyncio.gather
+    só as agrupa; o ORM assíncrono as executa uma de cada vez.
+    """
+    hoje = timezone.localdate()
+    inicio = hoje - datetime.timedelta(days=DIAS_DASHBOARD - 1)
+    ativo = CicloAvaliacao.StatusChoices.ATIVO
+    objetivos = Objetivo.objects.filter(responsavel_id=usuario.pk, ciclo__status=ativo).order_by()
+
+    ciclos, resumo, itens, dias, feedbacks = await asyncio.gather(
+        listar(
+            CicloAvaliacao.objects.filter(status=ativo).order_by('-data_inicio', '-id')
+            .values('id', 'titulo', 'data_inicio', 'data_fim')
+        ),
+        objetivos.aaggregate(
+            total=Count('id'),
+            concluidos=Count('id', filter=Q(progresso__gte=100)),
+            progresso_medio=Avg('progresso'),
+        ),
+        listar(
+            objetivos.order_by('-data_criacao', '-id')
+            .values('id', 'titulo', 'ciclo_id', 'progresso', 'confianca_media')[:OBJETIVOS_DASHBOARD]
+        ),
+        listar(
+            TendenciaHumor.objects.filter(
+                granularidade=TendenciaHumor.GranularidadeChoices.DIA,
+                equipe__membros__usuario_id=usuario.pk, inicio__gte=inicio,
+            ).order_by('inicio').values('inicio', 'quantidade', 'soma_humor')
+        ),
+        Feedback.objects.filter(receptor_id=usuario.pk).aaggregate(
+            recebidos=Count('id'),
+            # Não há marcação de leitura: "novos" são os dos últimos DIAS_DASHBOARD dias
+            novos=Count('id', filter=Q(data_criacao__date__gte=inicio)),
+        ),
+    )
+    if resumo['progresso_medio'] is not None:
+        resumo['progresso_medio'] = round(resumo['progresso_medio'], 2)
+    quantidade = sum(dia['quantidade'] for dia in dias)
+
+    return {
+        'ciclos_ativos': ciclos,
+        'objetivos': {**resumo, 'itens': itens},
+        'humor_equipe': {
+            'inicio': inicio,
+            'quantidade': quantidade,
+            'media_humor': round(sum(dia['soma_humor'] for dia in dias) / quantidade, 2) if quantidade else None,
+            'dias': [
+                {
+                    'inicio': dia['inicio'],
+                    'quantidade': dia['quantidade'],
+                    'media_humor': round(dia['soma_humor'] / dia['quantidade'], 2) if dia['quantidade'] else None,
+                } for dia in dias
+            ],
+        },
+        'feedbacks': feedbacks,
+        'gerado_em': timezone.now(),
+    }
+
+
+@api_assincrona('dashboard')
+async def dashboard(request, usuario):
+    """
+    Tudo o que a tela inicial mostra, numa única chamada: progresso dos
+    objetivos do usuário nos ciclos ativos, humor da equipe nos últimos
+    DIAS_DASHBOARD dias, feedbacks recebidos (e os novos) e os ciclos ativos.
+    Exemplo de URL: /api/dashboard/
+
+    O resultado fica TEMPO_CACHE_DASHBOARD segundos no cache, por usuário. A
+    chave inclui a versão dos MODELOS_DASHBOARD (ver reune/cache.py): uma
+    gravação neles já produz um dashboard novo na próxima chamada.
+    """
+    versoes = await sync_to_async(versoes_modelos)(MODELOS_DASHBOARD)
+    chave = f"dashboard:{usuario.pk}:{'.'.join(str(versao) for versao in versoes)}"
+    dados = await cache.aget(chave)
+    if dados is None:
+        dados = await _montar_dashboard(usuario)
+        await cache.aset(chave, dados, TEMPO_CACHE_DASHBOARD)
+    return dados
+
+
+class LoteViewSet(MedicaoConsultasMixin, viewsets.ViewSet):
+    """
+    Várias chamadas à API numa única requisição (uma só autenticação e uma só
+    viagem pela rede), executadas no próprio processo pelas views das rotas.
+    Exemplo: POST /api/batch/
+    Corpo: {"paralelo": true, "requisicoes": [
+        {"id": "recebidos", "url": "/api/feedback/caixa/?limite=10"},
+        {"url": "/api/usuarios/colaboradores/?page_size=100", "cabecalhos": {"If-None-Match": "\"abc\""}}
+    ]}
+
+    Aceita até LIMITE_LOTE chamadas de GET, HEAD, POST, PUT, PATCH e DELETE em
+    /api/. As escritas rodam em ordem e cada uma vale por si (não há transação
+    do lote todo). A resposta é sempre 200, com o status, os cabeçalhos e o
+    corpo de cada chamada em "respostas", na ordem recebida.
+    """
+
+    def create(self, request):
+        serializer = LoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        itens = serializer.validated_data['requisicoes']
+        if len(itens) > LIMITE_LOTE:
+            return Response(
+                {"error": f"O lote aceita no máximo {LIMITE_LOTE} requisições."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        respostas = executar_lote(request, itens, serializer.validated_data['paralelo'])
+        return Response({
+            'respostas': [
+                {'id': item.get('id', str(posicao)), **resposta}
+                for posicao, (item, resposta) in enumerate(zip(itens, respostas))
+            ],
+        })
@@ -67,4 +67,18 @@ apiClient.interceptors.response.use(
   }
 );
 
+// As listagens da API são paginadas por cursor ({ next, previous, results }).
+// Para listas pequenas usadas em selects (ciclos, competências, colaboradores)
+// seguimos os links 'next' até o fim e devolvemos todos os itens.
+export const fetchAllPages = async (url, config = {}) => {
+  const itens = [];
+  let proxima = url;
+  while (proxima) {
+    const response = await apiClient.get(proxima, config);
+    itens.push(...response.data.results);
+    proxima = response.data.next;
+  }
+  return itens;
+};
+
 export default apiClient;
\ No newline at end of file
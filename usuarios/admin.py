@@ -1,8 +1,19 @@
 # reune_app/usuarios/admin.py
 
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from .importacao import ErroImportacao, importar_colaboradores, ler_planilha
 from .models import Cargo, Equipe, Colaborador
 
+
+class ImportarColaboradoresForm(forms.Form):
+    arquivo = forms.FileField(label="Arquivo do RH (.csv ou .xlsx)")
+
 @admin.register(Cargo)
 class CargoAdmin(admin.ModelAdmin):
     """
@@ -16,9 +27,9 @@ class EquipeAdmin(admin.ModelAdmin):
     """
     Configuração do painel Admin para o modelo Equipe.
     """
-    list_display = ('nome', 'lider')
+    list_display = ('nome', 'lider', 'equipe_pai')
     search_fields = ('nome',)
-    autocomplete_fields = ('lider',) # Cria um campo de busca para selecionar o líder
+    autocomplete_fields = ('lider', 'equipe_pai') # Cria um campo de busca para selecionar o líder e a equipe superior
     list_per_page = 20
 
 @admin.register(Colaborador)
@@ -31,6 +42,46 @@ class ColaboradorAdmin(admin.ModelAdmin):
     list_filter = ('equipe', 'cargo', 'data_admissao')
     autocomplete_fields = ('usuario', 'cargo', 'equipe') # Facilita a busca para preencher os campos
     list_per_page = 25
+    change_list_template = 'admin/usuarios/colaborador/change_list.html'
+
+    def get_urls(self):
+        urls = [
+            path('importar/', self.admin_site.admin_view(self.importar_view), name='usuarios_colaborador_importar'),
+        ]
+        return urls + super().get_urls()
+
+    def importar_view(self, request):
+        """
+        Importa colaboradores em lote a partir de um CSV/XLSX (mesmo formato do
+        comando 'importar_colaboradores'), com o botão "Importar do RH" da listagem.
+        """
+        if not self.has_add_permission(request) or not self.has_change_permission(request):
+            raise PermissionDenied
+
+        form = ImportarColaboradoresForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            arquivo = form.cleaned_data['arquivo']
+            try:
+                with transaction.atomic():
+                    resultado = importar_colaboradores(ler_planilha(arquivo.file, arquivo.name))
+            except ErroImportacao as erro:
+                self.message_user(request, str(erro), messages.ERROR)
+            else:
+                self.message_user(request, (
+                    f"{resultado['inseridos']} inseridos, {resultado['atualizados']} atualizados, "
+                    f"{resultado['ignorados']} ignorados."
+                ), messages.SUCCESS)
+                for numero, mensagem in resultado['erros'][:20]:
+                    self.message_user(request, f"Linha {numero}: {mensagem}", messages.WARNING)
+                return redirect('admin:usuarios_colaborador_changelist')
+
+        contexto = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': "Importar colaboradores",
+            'form': form,
+        }
+        return TemplateResponse(request, 'admin/usuarios/colaborador/importar.html', contexto)
 
     @admin.display(description='Nome do Colaborador', ordering='usuario__first_name')
     def get_full_name(self, obj):
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class UsuariosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'usuarios'
\ No newline at end of file
+    name = 'usuarios'
+
+    def ready(self):
+        # Registra os signals da hierarquia de equipes e da visibilidade de objetivos
+        from . import signals  # noqa: F401
\ No newline at end of file
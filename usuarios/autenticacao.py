@@ -0,0 +1,143 @@
+# reune_app/usuarios/autenticacao.py
+
+import copy
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import Equipe
+
+# Segundos que um usuário resolvido fica no cache local. Os signals limpam o
+# cache do próprio processo na hora; nos demais workers o limite é este
+TEMPO_CACHE = 30
+MAXIMO_USUARIOS = 10000
+
+
+def carregar_usuario(usuario_id):
+    """
+    O usuário com o colaborador e a equipe já carregados (um JOIN) e os IDs
+    das equipes que ele lidera em `ids_equipes_lideradas`: 2 consultas.
+    """
+    usuario = User.objects.select_related('colaborador__equipe').get(**{api_settings.USER_ID_FIELD: usuario_id})
+    usuario.ids_equipes_lideradas = tuple(Equipe.objects.filter(lider_id=usuario.pk).order_by('pk').values_list('pk', flat=True))
+    return usuario
+
+
+def claims_do_usuario(usuario):
+    """
+    Claims extras dos tokens: o colaborador, a equipe e as equipes lideradas.
+    Servem ao frontend; no servidor a fonte é sempre o usuário resolvido.
+    """
+    colaborador = getattr(usuario, 'colaborador', None)
+    equipes_lideradas = getattr(usuario, 'ids_equipes_lideradas', None)
+    if equipes_lideradas is None:
+        equipes_lideradas = Equipe.objects.filter(lider_id=usuario.pk).order_by('pk').values_list('pk', flat=True)
+    return {
+        'colaborador': colaborador.pk if colaborador else None,
+        'equipe': colaborador.equipe_id if colaborador else None,
+        'equipes_lideradas': list(equipes_lideradas),
+    }
+
+
+class CacheUsuarios:
+    """
+    Cache local (no processo) dos usuários resolvidos pela autenticação, por
+    TEMPO_CACHE segundos. Cada requisição recebe uma cópia, para que nada do
+    que uma view altere em request.user vaze para as outras.
+    """
+
+    def __init__(self, tempo=TEMPO_CACHE, maximo=MAXIMO_USUARIOS):
+        self.tempo = tempo
+        self.maximo = maximo
+        self._trava = threading.Lock()
+        self._itens = {}
+        # Uma leitura do banco que começou antes de uma limpeza não é guardada
+        self._geracao = 0
+
+    def obter(self, usuario_id, carregar):
+        agora = time.monotonic()
+        # O claim do token traz o ID como texto; os signals, como inteiro
+        chave = str(usuario_id)
+        with self._trava:
+            item = self._itens.get(chave)
+            geracao = self._geracao
+        if item is not None and item[0] > agora:
+            return copy.deepcopy(item[1])
+
+        usuario = carregar(usuario_id)
+        with self._trava:
+            if geracao == self._geracao:
+                if len(self._itens) >= self.maximo:
+                    self._itens.clear()
+                self._itens[chave] = (agora + self.tempo, usuario)
+        return copy.deepcopy(usuario)
+
+    def limpar(self, usuario_id=None):
+        """
+        Descarta um usuário (ou todos, sem `usuario_id`). Chamado pelos signals
+        de User, Colaborador e Equipe; repete depois do commit, para não guardar
+        de novo o que outra requisição leu antes da alteração ser confirmada.
+        """
+        self._descartar(usuario_id)
+        transaction.on_commit(lambda: self._descartar(usuario_id))
+
+    def _descartar(self, usuario_id):
+        with self._trava:
+            self._geracao += 1
+            if usuario_id is None:
+                self._itens.clear()
+            else:
+                self._itens.pop(str(usuario_id), None)
+
+
+usuarios_autenticados = CacheUsuarios()
+
+
+class JWTAutenticacaoEmCache(JWTAuthentication):
+    """
+    JWTAuthentication que resolve o usuário pelo cache local: com o cache
+    quente, autenticar não faz nenhuma consulta, e request.user já traz
+    colaborador, equipe e ids_equipes_lideradas sem consultas extras.
+    As mesmas verificações do simplejwt (usuário ativo, senha trocada) valem.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            usuario_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as erro:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from erro
+
+        try:
+            usuario = usuarios_autenticados.obter(usuario_id, carregar_usuario)
+        except User.DoesNotExist as erro:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from erro
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not usuario.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(usuario.password)
+        ):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return usuario
+
+
+class TokenComClaimsSerializer(TokenObtainPairSerializer):
+    """
+    /api/token/: o par de tokens leva também os claims de claims_do_usuario()
+    (o access herda os claims do refresh, inclusive em /api/token/refresh/).
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for claim, valor in claims_do_usuario(user).items():
+            token[claim] = valor
+        return token
@@ -0,0 +1,87 @@
+# reune_app/usuarios/hierarquia.py
+
+from django.db import transaction
+
+from .models import Equipe, HierarquiaEquipe
+
+
+def inserir_equipe(equipe):
+    """
+    Cria as linhas da tabela de fechamento para uma equipe nova: ela mesma
+    (profundidade 0) e cada ancestral da equipe pai, um nível mais fundo.
+    """
+    linhas = [HierarquiaEquipe(ancestral_id=equipe.pk, descendente_id=equipe.pk, profundidade=0)]
+    if equipe.equipe_pai_id:
+        linhas.extend(
+            HierarquiaEquipe(ancestral_id=ancestral_id, descendente_id=equipe.pk, profundidade=profundidade + 1)
+            for ancestral_id, profundidade in HierarquiaEquipe.objects.filter(
+                descendente_id=equipe.equipe_pai_id
+            ).values_list('ancestral_id', 'profundidade')
+        )
+    HierarquiaEquipe.objects.bulk_create(linhas, ignore_conflicts=True)
+
+
+def mover_equipe(equipe):
+    """
+    Reposiciona a subárvore de `equipe` abaixo do seu novo `equipe_pai`.
+
+    As ligações entre a subárvore e os antigos ancestrais são apagadas e as
+    ligações com os novos ancestrais são criadas: três consultas, qualquer que
+    seja o tamanho da subárvore.
+    """
+    subarvore = list(
+        HierarquiaEquipe.objects.filter(ancestral_id=equipe.pk).values_list('descendente_id', 'profundidade')
+    )
+    ids_subarvore = [descendente_id for descendente_id, _ in subarvore]
+    if equipe.equipe_pai_id in ids_subarvore:
+        raise ValueError("A equipe superior não pode ser a própria equipe nem uma das suas subequipes.")
+
+    with transaction.atomic():
+        HierarquiaEquipe.objects.filter(descendente_id__in=ids_subarvore).exclude(
+            ancestral_id__in=ids_subarvore
+        ).delete()
+        if equipe.equipe_pai_id:
+            ancestrais = HierarquiaEquipe.objects.filter(
+                descendente_id=equipe.equipe_pai_id
+            ).values_list('ancestral_id', 'profundidade')
+            HierarquiaEquipe.objects.bulk_create([
+                HierarquiaEquipe(
+                    ancestral_id=ancestral_id, descendente_id=descendente_id,
+                    profundidade=profundidade_ancestral + profundidade + 1,
+                )
+                for ancestral_id, profundidade_ancestral in ancestrais
+                for descendente_id, profundidade in subarvore
+            ])
+
+
+def desligar_subequipes(equipe):
+    """
+    Antes de apagar uma equipe, separa as suas subequipes dos ancestrais dela.
+    As ligações com a própria equipe saem pelo CASCADE.
+    """
+    HierarquiaEquipe.objects.filter(
+        descendente_id__in=HierarquiaEquipe.objects.filter(ancestral_id=equipe.pk).values('descendente_id'),
+        ancestral_id__in=HierarquiaEquipe.objects.filter(descendente_id=equipe.pk).exclude(
+            ancestral_id=equipe.pk
+        ).values('ancestral_id'),
+    ).delete()
+
+
+def reconstruir_hierarquia(batch_size=1000):
+    """
+    Apaga e recalcula a tabela de fechamento a partir de Equipe.equipe_pai.
+    Retorna o número de linhas gravadas. Ciclos no cadastro são interrompidos.
+    """
+    pais = dict(Equipe.objects.values_list('id', 'equipe_pai_id'))
+    linhas = []
+    for equipe_id in pais:
+        atual, profundidade, visitadas = equipe_id, 0, set()
+        while atual is not None and atual not in visitadas:
+            visitadas.add(atual)
+            linhas.append(HierarquiaEquipe(ancestral_id=atual, descendente_id=equipe_id, profundidade=profundidade))
+            atual, profundidade = pais.get(atual), profundidade + 1
+
+    with transaction.atomic():
+        HierarquiaEquipe.objects.all().delete()
+        HierarquiaEquipe.objects.bulk_create(linhas, batch_size=batch_size)
+    return len(linhas)
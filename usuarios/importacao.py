@@ -0,0 +1,285 @@
+# reune_app/usuarios/importacao.py
+
+import csv
+import io
+import unicodedata
+from datetime import date, datetime
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from reune.cache import invalidar_modelo
+from .autenticacao import usuarios_autenticados
+from .models import Cargo, Colaborador, Equipe, HierarquiaEquipe
+from .visibilidade import invalidar_visibilidade
+
+# Nomes de coluna aceitos (já normalizados: minúsculas, sem acento) -> campo
+COLUNAS = {
+    'username': 'username', 'usuario': 'username', 'login': 'username',
+    'email': 'email', 'e-mail': 'email',
+    'first_name': 'first_name', 'nome': 'first_name',
+    'last_name': 'last_name', 'sobrenome': 'last_name',
+    'cargo': 'cargo', 'equipe': 'equipe', 'departamento': 'equipe',
+    'data_admissao': 'data_admissao', 'admissao': 'data_admissao',
+    'data_nascimento': 'data_nascimento', 'nascimento': 'data_nascimento',
+}
+FORMATOS_DATA = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y')
+
+
+class ErroImportacao(Exception):
+    pass
+
+
+def _normalizar(texto):
+    texto = unicodedata.normalize('NFKD', str(texto or '')).encode('ascii', 'ignore').decode()
+    return texto.strip().lower().replace(' ', '_')
+
+
+def _texto(valor):
+    return '' if valor is None else str(valor).strip()
+
+
+def _data(valor):
+    if valor in (None, ''):
+        return None
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(str(valor).strip(), formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"data inválida: {valor!r}")
+
+
+def ler_planilha(arquivo, nome_arquivo):
+    """
+    Lê um CSV (separado por vírgula ou ponto e vírgula) ou XLSX e gera um
+    dicionário por linha com os campos de COLUNAS. `arquivo` é um arquivo binário.
+    """
+    if nome_arquivo.lower().endswith('.xlsx'):
+        linhas = _linhas_xlsx(arquivo)
+    else:
+        linhas = _linhas_csv(arquivo)
+
+    cabecalho = next(linhas, None)
+    if cabecalho is None:
+        raise ErroImportacao("O arquivo está vazio.")
+    campos = [COLUNAS.get(_normalizar(coluna)) for coluna in cabecalho]
+    if 'username' not in campos and 'email' not in campos:
+        raise ErroImportacao("O arquivo precisa de uma coluna 'username' ou 'email'.")
+
+    for valores in linhas:
+        if not any(_texto(valor) for valor in valores):
+            continue
+        yield {campo: valor for campo, valor in zip(campos, valores) if campo}
+
+
+def _linhas_csv(arquivo):
+    texto = io.TextIOWrapper(arquivo, encoding='utf-8-sig', newline='')
+    amostra = texto.read(4096)
+    texto.seek(0)
+    try:
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=',;\t')
+    except csv.Error:
+        dialeto = csv.excel
+    yield from csv.reader(texto, dialeto)
+
+
+def _linhas_xlsx(arquivo):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ErroImportacao("Para importar arquivos .xlsx instale o pacote 'openpyxl'.")
+    planilha = load_workbook(arquivo, read_only=True, data_only=True).active
+    yield from planilha.iter_rows(values_only=True)
+
+
+def _em_lotes(iteravel, tamanho):
+    iterador = iter(iteravel)
+    while lote := list(islice(iterador, tamanho)):
+        yield lote
+
+
+def importar_colaboradores(linhas, tamanho_lote=1000):
+    """
+    Importa (ou atualiza) usuários e colaboradores a partir das linhas de
+    ler_planilha(), em lotes. O usuário é localizado pelo username ou, na falta
+    dele, pelo e-mail; rodar o mesmo arquivo de novo não muda nada.
+
+    Cada lote faz um número fixo de consultas: busca/cria cargos e equipes uma
+    vez, depois bulk_create/bulk_update de User e Colaborador.
+    Retorna {'inseridos', 'atualizados', 'ignorados', 'erros': [(linha, mensagem)]}.
+    """
+    resultado = {'inseridos': 0, 'atualizados': 0, 'ignorados': 0, 'erros': []}
+    equipes_novas = []
+    numero = 1  # A linha 1 é o cabeçalho
+    for lote in _em_lotes(linhas, tamanho_lote):
+        numerados = list(enumerate(lote, numero + 1))
+        numero += len(lote)
+        with transaction.atomic():
+            equipes_novas.extend(_importar_lote(numerados, resultado))
+
+    # bulk_create/bulk_update não disparam signals: ajusta hierarquia e caches aqui
+    HierarquiaEquipe.objects.bulk_create(
+        [HierarquiaEquipe(ancestral_id=pk, descendente_id=pk, profundidade=0) for pk in equipes_novas],
+        ignore_conflicts=True,
+    )
+    for model in (User, Colaborador, Cargo, Equipe):
+        invalidar_modelo(model)
+    invalidar_visibilidade()
+    usuarios_autenticados.limpar()
+    return resultado
+
+
+def _validar(numerados, resultado):
+    """
+    Converte e valida as linhas do lote. Retorna {chave: linha}; quando a mesma
+    pessoa aparece mais de uma vez, vale a última ocorrência.
+    """
+    validas = {}
+    for numero, linha in numerados:
+        try:
+            username = _texto(linha.get('username'))
+            email = _texto(linha.get('email')).lower()
+            if not username and not email:
+                raise ValueError("informe username ou e-mail")
+            dados = {
+                'numero': numero,
+                'username': username,
+                'email': email,
+                'first_name': _texto(linha.get('first_name'))[:150],
+                'last_name': _texto(linha.get('last_name'))[:150],
+                'cargo': _texto(linha.get('cargo')),
+                'equipe': _texto(linha.get('equipe')),
+                'data_admissao': _data(linha.get('data_admissao')),
+                'data_nascimento': _data(linha.get('data_nascimento')),
+            }
+        except ValueError as erro:
+            resultado['ignorados'] += 1
+            resultado['erros'].append((numero, str(erro)))
+            continue
+        chave = username.lower() or email
+        if chave in validas:
+            resultado['ignorados'] += 1
+        validas[chave] = dados
+    return validas
+
+
+def _buscar_ou_criar(model, campo, nomes):
+    """
+    {nome: pk} para cada nome, criando os que ainda não existem (2 ou 3 consultas).
+    Retorna também os pks criados.
+    """
+    nomes = {nome for nome in nomes if nome}
+    if not nomes:
+        return {}, []
+    existentes = dict(model.objects.filter(**{f'{campo}__in': nomes}).values_list(campo, 'pk'))
+    faltando = nomes - existentes.keys()
+    if not faltando:
+        return existentes, []
+    model.objects.bulk_create([model(**{campo: nome}) for nome in faltando], ignore_conflicts=True)
+    criados = dict(model.objects.filter(**{f'{campo}__in': faltando}).values_list(campo, 'pk'))
+    existentes.update(criados)
+    return existentes, list(criados.values())
+
+
+def _importar_lote(numerados, resultado):
+    validas = _validar(numerados, resultado)
+    if not validas:
+        return []
+
+    cargos, _ = _buscar_ou_criar(Cargo, 'titulo', (dados['cargo'] for dados in validas.values()))
+    equipes, equipes_novas = _buscar_ou_criar(Equipe, 'nome', (dados['equipe'] for dados in validas.values()))
+
+    # Usuários: procura pelo username e, para quem não tem, pelo e-mail (sem
+    # diferenciar maiúsculas: o do arquivo já vem em minúsculas)
+    usernames = {dados['username'] for dados in validas.values() if dados['username']}
+    emails = {dados['email'] for dados in validas.values() if not dados['username']}
+    existentes = User.objects.annotate(email_minusculo=Lower('email')).filter(
+        Q(username__in=usernames) | Q(email_minusculo__in=emails)
+    ).only('id', 'username', 'email', 'first_name', 'last_name')
+    por_username = {usuario.username: usuario for usuario in existentes}
+    por_email = {usuario.email.lower(): usuario for usuario in por_username.values() if usuario.email}
+
+    novos, alterados, usuario_de = [], {}, {}
+    senha = make_password(None)
+    for chave, dados in validas.items():
+        usuario = por_username.get(dados['username']) if dados['username'] else por_email.get(dados['email'])
+        if usuario is None:
+            if dados['data_admissao'] is None:
+                resultado['ignorados'] += 1
+                resultado['erros'].append((dados['numero'], "data de admissão obrigatória para novos colaboradores"))
+                continue
+            usuario = User(
+                username=dados['username'] or dados['email'], email=dados['email'], password=senha,
+                first_name=dados['first_name'], last_name=dados['last_name'],
+            )
+            novos.append(usuario)
+        else:
+            for campo in ('email', 'first_name', 'last_name'):
+                # Colunas vazias não apagam o que já está cadastrado; o e-mail
+                # só muda se não for o mesmo com outras maiúsculas
+                atual = getattr(usuario, campo)
+                if campo == 'email':
+                    atual = atual.lower()
+                if dados[campo] and atual != dados[campo]:
+                    setattr(usuario, campo, dados[campo])
+                    alterados[usuario.pk] = usuario
+        usuario_de[chave] = usuario
+
+    if novos:
+        User.objects.bulk_create(novos)
+        # Nem todo banco devolve as pks no INSERT em lote: relê pelos usernames
+        pks = dict(User.objects.filter(username__in=[usuario.username for usuario in novos]).values_list('username', 'pk'))
+        for usuario in novos:
+            usuario.pk = pks[usuario.username]
+    if alterados:
+        User.objects.bulk_update(list(alterados.values()), ['email', 'first_name', 'last_name'])
+
+    # Colaboradores
+    colaboradores = Colaborador.objects.in_bulk([usuario.pk for usuario in usuario_de.values()])
+    ids_novos = {usuario.pk for usuario in novos}
+    criar, atualizar = [], []
+    for chave, usuario in usuario_de.items():
+        dados = validas[chave]
+        valores = {
+            'cargo_id': cargos.get(dados['cargo']),
+            'equipe_id': equipes.get(dados['equipe']),
+            'data_admissao': dados['data_admissao'],
+            'data_nascimento': dados['data_nascimento'],
+        }
+        colaborador = colaboradores.get(usuario.pk)
+        if colaborador is None:
+            if valores['data_admissao'] is None:
+                resultado['ignorados'] += 1
+                resultado['erros'].append((dados['numero'], "data de admissão obrigatória para novos colaboradores"))
+                continue
+            criar.append(Colaborador(usuario_id=usuario.pk, **valores))
+            resultado['inseridos'] += 1
+            continue
+
+        mudou = False
+        for campo, valor in valores.items():
+            if valor is not None and getattr(colaborador, campo) != valor:
+                setattr(colaborador, campo, valor)
+                mudou = True
+        if mudou:
+            atualizar.append(colaborador)
+        if usuario.pk in ids_novos:
+            resultado['inseridos'] += 1
+        elif mudou or usuario.pk in alterados:
+            resultado['atualizados'] += 1
+        else:
+            resultado['ignorados'] += 1
+
+    Colaborador.objects.bulk_create(criar)
+    if atualizar:
+        Colaborador.objects.bulk_update(atualizar, ['cargo', 'equipe', 'data_admissao', 'data_nascimento'])
+    return equipes_novas
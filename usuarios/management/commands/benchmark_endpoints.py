@@ -0,0 +1,201 @@
+# reune_app/usuarios/management/commands/benchmark_endpoints.py
+
+import io
+import json
+import logging
+import platform
+import statistics
+import time
+import tracemalloc
+from importlib import import_module
+
+import django
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import NoReverseMatch, reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from reune.instrumentacao import medir_consultas
+from usuarios.models import Equipe
+
+# Módulos de URL cujos routers são medidos
+MODULOS_URLS = ('usuarios.urls', 'okr.urls', 'avaliacoes.urls', 'clima.urls', 'feedback.urls')
+
+
+def percentil(valores, p):
+    """
+    Percentil por interpolação linear (p entre 0 e 100).
+    """
+    ordenados = sorted(valores)
+    if len(ordenados) == 1:
+        return ordenados[0]
+    posicao = (len(ordenados) - 1) * p / 100
+    baixo = int(posicao)
+    alto = min(baixo + 1, len(ordenados) - 1)
+    return ordenados[baixo] + (ordenados[alto] - ordenados[baixo]) * (posicao - baixo)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede todos os endpoints dos routers (list e detail) em vários tamanhos de base, "
+        "gerados pelo seed_reune, e grava p50/p95, consultas SQL e pico de memória em JSON. "
+        "Apaga o banco configurado: use com --settings=reune.settings_local."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanhos', default='25,100,400', help="Números de colaboradores, separados por vírgula.")
+        parser.add_argument('--repeticoes', type=int, default=20, help="Requisições medidas por endpoint.")
+        parser.add_argument('--page-size', type=int, default=50, help="Itens por página nas listagens.")
+        parser.add_argument('--saida', help="Arquivo JSON de saída (padrão: imprime na tela).")
+        parser.add_argument('--comparar', help="JSON de uma execução anterior, para calcular a variação do p50.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError(
+                "O benchmark apaga e recria os dados do banco. Rode com --settings=reune.settings_local (SQLite)."
+            )
+        try:
+            tamanhos = [int(valor) for valor in options['tamanhos'].split(',') if valor.strip()]
+        except ValueError:
+            raise CommandError("--tamanhos deve ser uma lista de inteiros, ex: 25,100,400.")
+        if not tamanhos or min(tamanhos) < 1 or options['repeticoes'] < 1:
+            raise CommandError("Informe tamanhos e repetições maiores que zero.")
+
+        resultado = {
+            'gerado_em': timezone.now().isoformat(),
+            'ambiente': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'banco': f'{connection.vendor} {connection.Database.sqlite_version}',
+            },
+            'repeticoes': options['repeticoes'],
+            'page_size': options['page_size'],
+            'tamanhos': {},
+        }
+        # Uma linha de log por requisição só atrapalharia a medição
+        logger = logging.getLogger('reune.consultas')
+        desligado, logger.disabled = logger.disabled, True
+        try:
+            for tamanho in tamanhos:
+                self.stderr.write(f"Gerando base com {tamanho} colaboradores...")
+                call_command('flush', interactive=False, verbosity=0)
+                cache.clear()
+                call_command('seed_reune', colaboradores=tamanho, stdout=io.StringIO())
+                resultado['tamanhos'][str(tamanho)] = self.medir_tamanho(options)
+        finally:
+            logger.disabled = desligado
+
+        # Um endpoint que respondeu erro mediu o erro, não a listagem ou o detalhe
+        resultado['endpoints_com_erro'] = sorted({
+            f'{nome} ({tamanho}: {medicao["status"]})'
+            for tamanho, medicoes in resultado['tamanhos'].items()
+            for nome, medicao in medicoes.items() if not medicao['valido']
+        })
+        for endpoint in resultado['endpoints_com_erro']:
+            self.stderr.write(self.style.WARNING(f"Resposta de erro, tempos descartados: {endpoint}"))
+
+        if options['comparar']:
+            self.comparar(resultado, options['comparar'])
+
+        saida = json.dumps(resultado, ensure_ascii=False, indent=2)
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                arquivo.write(saida + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Resultado gravado em {options['saida']}."))
+        else:
+            self.stdout.write(saida)
+
+    def primeira_pk_visivel(self, viewset, usuario):
+        """
+        Menor pk que o `usuario` consegue abrir no detalhe: o queryset do
+        ViewSet passa pelos mesmos filtros (e pela politica_linhas) do retrieve.
+        """
+        request = Request(APIRequestFactory().get('/'))
+        request.user = usuario
+        view = viewset(request=request, args=(), kwargs={}, format_kwarg=None, action='retrieve')
+        return view.filter_queryset(view.get_queryset()).order_by('pk').values_list('pk', flat=True).first()
+
+    def endpoints(self, usuario):
+        """
+        (nome, url) de cada rota dos routers: a listagem e o detalhe do primeiro
+        objeto visível para o `usuario`, quando o ViewSet tem queryset.
+        """
+        rotas = []
+        for modulo in MODULOS_URLS:
+            for _, viewset, basename in import_module(modulo).router.registry:
+                rotas.append((f'{basename}-list', reverse(f'{basename}-list')))
+                if getattr(viewset, 'queryset', None) is None:
+                    continue
+                pk = self.primeira_pk_visivel(viewset, usuario)
+                if pk is None:
+                    continue
+                try:
+                    rotas.append((f'{basename}-detail', reverse(f'{basename}-detail', kwargs={'pk': pk})))
+                except NoReverseMatch:
+                    pass
+        return rotas
+
+    def medir_tamanho(self, options):
+        # O líder da equipe raiz vê os objetivos de toda a organização
+        raiz = Equipe.objects.filter(equipe_pai__isnull=True, lider__isnull=False).order_by('pk').first()
+        usuario = raiz.lider if raiz else User.objects.order_by('pk').first()
+        client = APIClient()
+        client.force_authenticate(usuario)
+
+        medicoes = {}
+        for nome, url in self.endpoints(usuario):
+            url_medida = f'{url}?page_size={options["page_size"]}' if nome.endswith('-list') else url
+            # Primeira chamada fora da medição: aquece caches e imports
+            client.get(url_medida)
+
+            tempos, consultas, status = [], [], set()
+            for _ in range(options['repeticoes']):
+                with medir_consultas() as medicao:
+                    inicio = time.perf_counter()
+                    response = client.get(url_medida)
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+                consultas.append(medicao.total)
+                status.add(response.status_code)
+
+            # O tracemalloc deixa cada alocação bem mais lenta: a memória é
+            # medida numa requisição à parte, fora dos tempos
+            tracemalloc.start()
+            client.get(url_medida)
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            medicoes[nome] = {
+                'url': url_medida,
+                'status': max(status),
+                'valido': max(status) < 400,
+                'p50_ms': round(percentil(tempos, 50), 2),
+                'p95_ms': round(percentil(tempos, 95), 2),
+                'media_ms': round(statistics.fmean(tempos), 2),
+                'consultas': max(consultas),
+                'pico_memoria_kb': round(pico / 1024, 1),
+            }
+            self.stderr.write(
+                f"  {nome:32} p50={medicoes[nome]['p50_ms']:8.2f}ms  p95={medicoes[nome]['p95_ms']:8.2f}ms  "
+                f"consultas={medicoes[nome]['consultas']}" + ('' if medicoes[nome]['valido'] else f"  ERRO {max(status)}")
+            )
+        return medicoes
+
+    def comparar(self, resultado, caminho):
+        """
+        Acrescenta a cada endpoint a variação percentual do p50 contra uma execução anterior.
+        """
+        with open(caminho, encoding='utf-8') as arquivo:
+            anterior = json.load(arquivo)
+        for tamanho, medicoes in resultado['tamanhos'].items():
+            antigas = anterior.get('tamanhos', {}).get(tamanho, {})
+            for nome, medicao in medicoes.items():
+                base = antigas.get(nome)
+                # Medições de respostas de erro não servem de base nem de comparação
+                if medicao['valido'] and base and base.get('valido', True) and base.get('p50_ms'):
+                    medicao['variacao_p50_pct'] = round((medicao['p50_ms'] / base['p50_ms'] - 1) * 100, 1)
+                    medicao['variacao_consultas'] = medicao['consultas'] - base['consultas']
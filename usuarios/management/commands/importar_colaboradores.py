@@ -0,0 +1,43 @@
+# reune_app/usuarios/management/commands/importar_colaboradores.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from usuarios.importacao import ErroImportacao, importar_colaboradores, ler_planilha
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa colaboradores de um CSV/XLSX do sistema de RH (colunas: username e/ou email, "
+        "nome, sobrenome, cargo, equipe, data_admissao, data_nascimento). Pode ser rodado "
+        "de novo com o mesmo arquivo: quem já existe é atualizado ou ignorado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help="Caminho do arquivo .csv ou .xlsx.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Linhas processadas por lote.")
+        parser.add_argument('--simular', action='store_true', help="Processa tudo e desfaz no final (nada é gravado).")
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        try:
+            with open(options['arquivo'], 'rb') as arquivo, transaction.atomic():
+                resultado = importar_colaboradores(
+                    ler_planilha(arquivo, options['arquivo']), tamanho_lote=options['batch_size']
+                )
+                if options['simular']:
+                    transaction.set_rollback(True)
+        except FileNotFoundError:
+            raise CommandError(f"Arquivo não encontrado: {options['arquivo']}")
+        except ErroImportacao as erro:
+            raise CommandError(str(erro))
+
+        for numero, mensagem in resultado['erros']:
+            self.stderr.write(f"Linha {numero}: {mensagem}")
+        prefixo = "[simulação] " if options['simular'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefixo}{resultado['inseridos']} inseridos, {resultado['atualizados']} atualizados, "
+            f"{resultado['ignorados']} ignorados em {time.perf_counter() - inicio:.1f}s."
+        ))
@@ -0,0 +1,18 @@
+# reune_app/usuarios/management/commands/reconstruir_hierarquia_equipes.py
+
+from django.core.management.base import BaseCommand
+
+from usuarios.hierarquia import reconstruir_hierarquia
+from usuarios.visibilidade import invalidar_visibilidade
+
+
+class Command(BaseCommand):
+    help = "Recalcula do zero a tabela HierarquiaEquipe a partir de Equipe.equipe_pai."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Tamanho dos lotes de INSERT.")
+
+    def handle(self, *args, **options):
+        total = reconstruir_hierarquia(batch_size=options['batch_size'])
+        invalidar_visibilidade()
+        self.stdout.write(self.style.SUCCESS(f"{total} linhas de hierarquia gravadas."))
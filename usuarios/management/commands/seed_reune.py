@@ -0,0 +1,270 @@
+# reune_app/usuarios/management/commands/seed_reune.py
+
+import random
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from avaliacoes.models import CicloAvaliacao, Competencia, RespostaAvaliacao
+from avaliacoes.resumo import reconstruir_resumo
+from busca.indice import reindexar
+from clima.models import RegistroHumor
+from clima.tendencias import reconstruir_tendencias
+from feedback.models import Feedback
+from okr.models import CheckIn, Objetivo, ResultadoChave
+from okr.progresso import calcular_progresso
+from okr.resumo import reconstruir_resumo_okr
+from reune.cache import invalidar_modelo
+from usuarios.hierarquia import reconstruir_hierarquia
+from usuarios.models import Cargo, Colaborador, Equipe
+from usuarios.visibilidade import invalidar_visibilidade
+
+NOMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Elisa', 'Fábio', 'Gabriela', 'Heitor', 'Isabela', 'João', 'Larissa', 'Marcos']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Costa', 'Almeida', 'Ribeiro', 'Carvalho']
+COMPETENCIAS = ['Comunicação', 'Trabalho em Equipe', 'Liderança', 'Resolução de Problemas', 'Proatividade', 'Conhecimento Técnico']
+# Peso de cada humor (1 a 5): a maioria dos registros fica entre neutro e feliz
+PESOS_HUMOR = [5, 10, 30, 40, 15]
+
+MODELOS_GERADOS = (
+    User, Cargo, Equipe, Colaborador, CicloAvaliacao, Competencia, Objetivo,
+    ResultadoChave, CheckIn, RegistroHumor, Feedback, RespostaAvaliacao,
+)
+
+
+@contextmanager
+def sem_auto_now_add(*models):
+    """
+    Desliga temporariamente o auto_now_add dos models, para gravar datas no
+    passado (histórico de humor, check-ins ao longo do ciclo etc.).
+    """
+    campos = [
+        campo for model in models for campo in model._meta.concrete_fields
+        if getattr(campo, 'auto_now_add', False)
+    ]
+    for campo in campos:
+        campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo in campos:
+            campo.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera uma organização sintética (usuários, equipes, OKRs, humor, feedbacks, "
+        "avaliações 360) com bulk_create, para reproduzir volumes de produção localmente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--colaboradores', type=int, default=100, help="Número de colaboradores.")
+        parser.add_argument('--equipes', type=int, help="Número de equipes (padrão: 1 para cada 8 colaboradores).")
+        parser.add_argument('--ciclos', type=int, default=2, help="Ciclos de avaliação (semestres).")
+        parser.add_argument('--objetivos', type=int, default=2, help="Objetivos por colaborador em cada ciclo.")
+        parser.add_argument('--krs', type=int, default=3, help="Resultados-chave por objetivo.")
+        parser.add_argument('--checkins', type=int, default=5, help="Check-ins por resultado-chave.")
+        parser.add_argument('--dias-humor', type=int, default=60, help="Dias de histórico de humor por colaborador.")
+        parser.add_argument('--feedbacks', type=int, default=3, help="Feedbacks enviados por colaborador.")
+        parser.add_argument('--avaliadores', type=int, default=3, help="Avaliadores (360) por colaborador em cada ciclo.")
+        parser.add_argument('--prefixo', default='seed', help="Prefixo dos usernames e nomes gerados.")
+        parser.add_argument('--limpar', action='store_true', help="Apaga antes os dados gerados com o mesmo prefixo.")
+        parser.add_argument('--semente', type=int, default=42, help="Semente do gerador aleatório.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Tamanho dos lotes de INSERT.")
+
+    def handle(self, *args, **options):
+        self.aleatorio = random.Random(options['semente'])
+        self.batch_size = options['batch_size']
+        prefixo = options['prefixo']
+
+        with transaction.atomic():
+            if options['limpar']:
+                self.limpar(prefixo)
+            with sem_auto_now_add(*MODELOS_GERADOS):
+                totais = self.gerar(options, prefixo)
+
+        # bulk_create não dispara signals: recalcula as tabelas derivadas e os caches
+        reconstruir_hierarquia(batch_size=self.batch_size)
+        reconstruir_resumo(batch_size=self.batch_size)
+        reconstruir_resumo_okr(batch_size=self.batch_size)
+        reindexar(tamanho_lote=self.batch_size)
+        reconstruir_tendencias(batch_size=self.batch_size)
+        for model in MODELOS_GERADOS:
+            invalidar_modelo(model)
+        invalidar_visibilidade()
+
+        for nome, total in totais.items():
+            self.stdout.write(f"{nome}: {total}")
+        self.stdout.write(self.style.SUCCESS("Organização sintética gerada."))
+
+    def limpar(self, prefixo):
+        # Objetivos, check-ins, humor, feedbacks e respostas saem junto com os usuários (CASCADE)
+        User.objects.filter(username__startswith=prefixo).delete()
+        for model, campo in ((Equipe, 'nome'), (Cargo, 'titulo'), (Competencia, 'nome'), (CicloAvaliacao, 'titulo')):
+            model.objects.filter(**{f'{campo}__startswith': prefixo}).delete()
+
+    def inserir(self, model, objetos):
+        """
+        bulk_create que garante a pk nos objetos, mesmo em bancos que não a
+        devolvem no INSERT em lote (as novas linhas são lidas em ordem de pk).
+        """
+        if connection.features.can_return_rows_from_bulk_insert:
+            return model.objects.bulk_create(objetos, batch_size=self.batch_size)
+        ultimo = model.objects.aggregate(maximo=Max('pk'))['maximo'] or 0
+        model.objects.bulk_create(objetos, batch_size=self.batch_size)
+        novos = model.objects.filter(pk__gt=ultimo).order_by('pk').values_list('pk', flat=True)
+        for objeto, pk in zip(objetos, novos):
+            objeto.pk = pk
+        return objetos
+
+    def momento(self, inicio, fim):
+        """
+        Um datetime aleatório entre duas datas, no fuso do projeto.
+        """
+        dias = max((fim - inicio).days, 0)
+        dia = inicio + timedelta(days=self.aleatorio.randint(0, dias))
+        return timezone.make_aware(datetime.combine(dia, time(self.aleatorio.randint(8, 18), self.aleatorio.randint(0, 59))))
+
+    def gerar(self, options, prefixo):
+        aleatorio = self.aleatorio
+        hoje = timezone.localdate()
+        quantidade = options['colaboradores']
+        senha = make_password(None)
+
+        usuarios = self.inserir(User, [
+            User(
+                username=f'{prefixo}{i:06d}', password=senha,
+                first_name=aleatorio.choice(NOMES), last_name=aleatorio.choice(SOBRENOMES),
+                email=f'{prefixo}{i:06d}@exemplo.com',
+            ) for i in range(quantidade)
+        ])
+
+        cargos = self.inserir(Cargo, [Cargo(titulo=f'{prefixo} Cargo {i}') for i in range(max(5, quantidade // 20))])
+
+        # Equipes em árvore: cada equipe tem até 3 subequipes
+        total_equipes = options['equipes'] or max(1, quantidade // 8)
+        equipes = self.inserir(Equipe, [Equipe(nome=f'{prefixo} Equipe {i}') for i in range(total_equipes)])
+        for i, equipe in enumerate(equipes):
+            equipe.equipe_pai_id = equipes[(i - 1) // 3].pk if i else None
+
+        colaboradores = []
+        equipe_de = {}
+        for i, usuario in enumerate(usuarios):
+            equipe = equipes[i % total_equipes]
+            equipe_de[usuario.pk] = equipe.pk
+            if i < total_equipes:
+                # O primeiro membro de cada equipe é o líder
+                equipe.lider_id = usuario.pk
+            colaboradores.append(Colaborador(
+                usuario_id=usuario.pk, cargo_id=aleatorio.choice(cargos).pk, equipe_id=equipe.pk,
+                data_admissao=hoje - timedelta(days=aleatorio.randint(30, 3650)),
+                data_nascimento=date(aleatorio.randint(1965, 2003), aleatorio.randint(1, 12), aleatorio.randint(1, 28)),
+            ))
+        Equipe.objects.bulk_update(equipes, ['equipe_pai', 'lider'], batch_size=self.batch_size)
+        Colaborador.objects.bulk_create(colaboradores, batch_size=self.batch_size)
+
+        # Ciclos semestrais, do mais antigo ao atual
+        ciclos = []
+        for i in reversed(range(options['ciclos'])):
+            inicio = hoje - timedelta(days=182 * (i + 1))
+            ciclos.append(CicloAvaliacao(
+                titulo=f'{prefixo} Ciclo {options["ciclos"] - i}', data_inicio=inicio, data_fim=inicio + timedelta(days=181),
+                status=CicloAvaliacao.StatusChoices.ATIVO if i == 0 else CicloAvaliacao.StatusChoices.CONCLUIDO,
+            ))
+        ciclos = self.inserir(CicloAvaliacao, ciclos)
+        competencias = self.inserir(Competencia, [
+            Competencia(nome=f'{prefixo} {nome}', descricao=f'Competência de {nome.lower()}.') for nome in COMPETENCIAS
+        ])
+
+        # OKRs: o progresso de KRs e objetivos já sai calculado a partir dos check-ins
+        objetivos = []
+        for usuario in usuarios:
+            for ciclo in ciclos:
+                for i in range(options['objetivos']):
+                    objetivos.append(Objetivo(
+                        titulo=f'Objetivo {i + 1} de {usuario.first_name}', responsavel_id=usuario.pk, ciclo_id=ciclo.pk,
+                        data_criacao=self.momento(ciclo.data_inicio, ciclo.data_inicio + timedelta(days=15)),
+                    ))
+        objetivos = self.inserir(Objetivo, objetivos)
+
+        resultados, valores_checkins = [], []
+        for objetivo in objetivos:
+            progressos = []
+            for i in range(options['krs']):
+                alvo = Decimal(aleatorio.choice([10, 50, 100, 1000]))
+                valores = sorted(Decimal(aleatorio.randint(0, int(alvo))) for _ in range(options['checkins']))
+                valor_atual = valores[-1] if valores else Decimal('0')
+                progresso = calcular_progresso(Decimal('0'), alvo, valor_atual)
+                progressos.append(progresso)
+                resultados.append(ResultadoChave(
+                    objetivo_id=objetivo.pk, descricao=f'Resultado-chave {i + 1}',
+                    tipo=aleatorio.choice(ResultadoChave.TipoChoices.values),
+                    valor_inicial=Decimal('0'), valor_alvo=alvo, progresso=progresso,
+                ))
+                valores_checkins.append((objetivo, valores))
+            objetivo.progresso = (sum(progressos) / len(progressos)).quantize(Decimal('0.01')) if progressos else Decimal('0')
+        Objetivo.objects.bulk_update(objetivos, ['progresso'], batch_size=self.batch_size)
+        resultados = self.inserir(ResultadoChave, resultados)
+
+        checkins = []
+        for resultado, (objetivo, valores) in zip(resultados, valores_checkins):
+            inicio = objetivo.data_criacao.date()
+            for passo, valor in enumerate(valores, 1):
+                checkins.append(CheckIn(
+                    resultado_chave_id=resultado.pk, colaborador_id=objetivo.responsavel_id, valor_atual=valor,
+                    nota_confianca=aleatorio.randint(1, 10), comentario=f'Atualização {passo}.',
+                    data_checkin=self.momento(inicio + timedelta(days=14 * (passo - 1)), inicio + timedelta(days=14 * passo)),
+                ))
+        CheckIn.objects.bulk_create(checkins, batch_size=self.batch_size)
+
+        humores = [
+            RegistroHumor(
+                colaborador_id=usuario.pk, equipe_id=equipe_de[usuario.pk], data_registro=hoje - timedelta(days=dia),
+                humor=aleatorio.choices(range(1, 6), weights=PESOS_HUMOR)[0],
+            )
+            for usuario in usuarios for dia in range(options['dias_humor'])
+            if aleatorio.random() < 0.8  # nem todo mundo registra o humor todo dia
+        ]
+        RegistroHumor.objects.bulk_create(humores, batch_size=self.batch_size)
+
+        feedbacks = []
+        if quantidade > 1:
+            for usuario in usuarios:
+                for _ in range(options['feedbacks']):
+                    receptor = aleatorio.choice(usuarios)
+                    while receptor.pk == usuario.pk:
+                        receptor = aleatorio.choice(usuarios)
+                    feedbacks.append(Feedback(
+                        emissor_id=usuario.pk, receptor_id=receptor.pk, texto=f'Obrigado pela ajuda, {receptor.first_name}!',
+                        data_criacao=self.momento(hoje - timedelta(days=180), hoje),
+                    ))
+        Feedback.objects.bulk_create(feedbacks, batch_size=self.batch_size)
+
+        # Avaliação 360: cada avaliado recebe notas de alguns colegas (e a autoavaliação)
+        respostas = []
+        for ciclo in ciclos:
+            for avaliado in usuarios:
+                avaliadores = aleatorio.sample(usuarios, min(options['avaliadores'], quantidade))
+                if avaliado not in avaliadores:
+                    avaliadores.append(avaliado)
+                for avaliador in avaliadores:
+                    for competencia in competencias:
+                        respostas.append(RespostaAvaliacao(
+                            ciclo_id=ciclo.pk, avaliado_id=avaliado.pk, avaliador_id=avaliador.pk,
+                            competencia_id=competencia.pk, nota=aleatorio.randint(1, 5),
+                            data_resposta=self.momento(ciclo.data_fim - timedelta(days=20), ciclo.data_fim),
+                        ))
+        RespostaAvaliacao.objects.bulk_create(respostas, batch_size=self.batch_size)
+
+        return {
+            'Usuários/colaboradores': len(usuarios), 'Cargos': len(cargos), 'Equipes': len(equipes),
+            'Ciclos': len(ciclos), 'Competências': len(competencias), 'Objetivos': len(objetivos),
+            'Resultados-chave': len(resultados), 'Check-ins': len(checkins), 'Registros de humor': len(humores),
+            'Feedbacks': len(feedbacks), 'Respostas de avaliação': len(respostas),
+        }
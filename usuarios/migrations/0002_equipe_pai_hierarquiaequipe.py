@@ -0,0 +1,46 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def popular_hierarquia(apps, schema_editor):
+    # Toda equipe existente é raiz: só a ligação com ela mesma (profundidade 0)
+    Equipe = apps.get_model('usuarios', 'Equipe')
+    HierarquiaEquipe = apps.get_model('usuarios', 'HierarquiaEquipe')
+    HierarquiaEquipe.objects.bulk_create(
+        (
+            HierarquiaEquipe(ancestral_id=equipe_id, descendente_id=equipe_id, profundidade=0)
+            for equipe_id in Equipe.objects.values_list('id', flat=True).iterator(chunk_size=1000)
+        ),
+        batch_size=1000,
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipe',
+            name='equipe_pai',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='subequipes', to='usuarios.equipe', verbose_name='Equipe Superior'),
+        ),
+        migrations.CreateModel(
+            name='HierarquiaEquipe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profundidade', models.PositiveIntegerField(default=0, verbose_name='Profundidade')),
+                ('ancestral', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendentes_hierarquia', to='usuarios.equipe', verbose_name='Equipe Ancestral')),
+                ('descendente', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestrais_hierarquia', to='usuarios.equipe', verbose_name='Equipe Descendente')),
+            ],
+            options={
+                'verbose_name': 'Hierarquia de Equipe',
+                'verbose_name_plural': 'Hierarquia de Equipes',
+                'unique_together': {('ancestral', 'descendente')},
+            },
+        ),
+        migrations.RunPython(popular_hierarquia, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 # reune_app/usuarios/models.py
 
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -20,6 +21,7 @@ class Cargo(models.Model):
 class Equipe(models.Model):
     nome = models.CharField(max_length=255, unique=True, verbose_name="Nome da Equipe")
     lider = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='equipes_lideradas', verbose_name="Líder")
+    equipe_pai = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='subequipes', verbose_name="Equipe Superior")
     descricao = models.TextField(blank=True, null=True, verbose_name="Descrição")
 
     class Meta:
@@ -30,6 +32,37 @@ class Equipe(models.Model):
     def __str__(self):
         return self.nome
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Guarda os valores carregados para que os signals saibam o líder/pai antigo
+        instance = super().from_db(db, field_names, values)
+        instance._valores_originais = dict(zip(field_names, values))
+        return instance
+
+    def clean(self):
+        # Uma equipe não pode ficar abaixo dela mesma nem de uma das suas subequipes
+        if self.equipe_pai_id and self.pk and HierarquiaEquipe.objects.filter(
+            ancestral_id=self.pk, descendente_id=self.equipe_pai_id
+        ).exists():
+            raise ValidationError({'equipe_pai': "A equipe superior não pode ser a própria equipe nem uma das suas subequipes."})
+
+# Tabela de fechamento (closure table) da hierarquia de equipes: uma linha para
+# cada par (ancestral, descendente), incluindo a própria equipe com profundidade 0.
+# Permite buscar todas as subequipes de uma equipe, em qualquer nível, com um
+# único JOIN. Mantida pelos signals de Equipe (ver usuarios/hierarquia.py).
+class HierarquiaEquipe(models.Model):
+    ancestral = models.ForeignKey(Equipe, on_delete=models.CASCADE, related_name='descendentes_hierarquia', verbose_name="Equipe Ancestral")
+    descendente = models.ForeignKey(Equipe, on_delete=models.CASCADE, related_name='ancestrais_hierarquia', verbose_name="Equipe Descendente")
+    profundidade = models.PositiveIntegerField(default=0, verbose_name="Profundidade")
+
+    class Meta:
+        verbose_name = "Hierarquia de Equipe"
+        verbose_name_plural = "Hierarquia de Equipes"
+        unique_together = ('ancestral', 'descendente')
+
+    def __str__(self):
+        return f"{self.ancestral} > {self.descendente} ({self.profundidade})"
+
 # Modelo que estende o usuário padrão do Django com informações de RH
 class Colaborador(models.Model):
     # Relação 1-para-1 com o sistema de autenticação do Django
@@ -47,4 +80,11 @@ class Colaborador(models.Model):
 
     def __str__(self):
         # Retorna o nome completo do usuário, ou o username se não houver nome
-        return self.usuario.get_full_name() or self.usuario.username
\ No newline at end of file
+        return self.usuario.get_full_name() or self.usuario.username
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Guarda os valores carregados para que os signals saibam a equipe antiga
+        instance = super().from_db(db, field_names, values)
+        instance._valores_originais = dict(zip(field_names, values))
+        return instance
@@ -1,24 +1,32 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Colaborador, Cargo, Equipe
+from .models import Colaborador, Cargo, Equipe, HierarquiaEquipe
+from reune.serializers import DynamicFieldsMixin
 
-class CargoSerializer(serializers.ModelSerializer):
+class CargoSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Cargo
         fields = '__all__'
 
-class EquipeSerializer(serializers.ModelSerializer):
+class EquipeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Equipe
         fields = '__all__'
 
+    def validate_equipe_pai(self, value):
+        if value is not None and self.instance is not None and HierarquiaEquipe.objects.filter(
+            ancestral_id=self.instance.pk, descendente_id=value.pk
+        ).exists():
+            raise serializers.ValidationError("A equipe superior não pode ser a própria equipe nem uma das suas subequipes.")
+        return value
+
 # Serializer para o modelo User, para mostrar detalhes dentro do Colaborador
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'email']
 
-class ColaboradorSerializer(serializers.ModelSerializer):
+class ColaboradorSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     # Usamos os serializers aninhados para mostrar os dados completos, não apenas os IDs
     usuario = UserSerializer(read_only=True)
     cargo = CargoSerializer(read_only=True)
@@ -0,0 +1,87 @@
+# reune_app/usuarios/signals.py
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from reune.cache import invalidar_modelo, versionar_modelos
+from .autenticacao import usuarios_autenticados
+from .hierarquia import desligar_subequipes, inserir_equipe, mover_equipe
+from .models import Cargo, Colaborador, Equipe
+from .visibilidade import invalidar_visibilidade
+
+# Versões usadas pelo cache de respostas e pelos ETags (ver reune/cache.py)
+versionar_modelos(Cargo, Equipe, Colaborador, User)
+
+
+def _mudou(instance, campo):
+    originais = getattr(instance, '_valores_originais', None) or {}
+    return campo not in originais or originais[campo] != getattr(instance, campo)
+
+
+def _guardar_valores(instance, *campos):
+    originais = getattr(instance, '_valores_originais', None) or {}
+    originais.update({campo: getattr(instance, campo) for campo in campos})
+    instance._valores_originais = originais
+
+
+@receiver(post_save, sender=Equipe)
+def atualizar_hierarquia_ao_salvar(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        inserir_equipe(instance)
+    elif _mudou(instance, 'equipe_pai_id'):
+        mover_equipe(instance)
+    if created or _mudou(instance, 'equipe_pai_id') or _mudou(instance, 'lider_id'):
+        invalidar_visibilidade()
+    _guardar_valores(instance, 'equipe_pai_id', 'lider_id')
+
+
+@receiver(post_save, sender=Colaborador)
+def invalidar_visibilidade_ao_salvar(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created or _mudou(instance, 'equipe_id'):
+        invalidar_visibilidade()
+    _guardar_valores(instance, 'equipe_id')
+
+
+@receiver(pre_delete, sender=Equipe)
+def desligar_subequipes_ao_apagar(sender, instance, **kwargs):
+    # As subequipes viram raiz (equipe_pai é SET_NULL, feito sem signals)
+    desligar_subequipes(instance)
+
+
+@receiver(post_delete, sender=Equipe)
+@receiver(post_delete, sender=Colaborador)
+def invalidar_visibilidade_ao_apagar(sender, instance, **kwargs):
+    # As linhas de HierarquiaEquipe saem junto com a equipe (CASCADE)
+    invalidar_visibilidade()
+
+
+@receiver(post_delete, sender=User)
+def invalidar_equipes_ao_apagar_usuario(sender, instance, **kwargs):
+    # Equipe.lider vira NULL por um UPDATE, sem passar pelos signals de Equipe
+    invalidar_modelo(Equipe)
+
+
+# Cache local da autenticação (ver usuarios/autenticacao.py)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def limpar_usuario_autenticado(sender, instance, **kwargs):
+    usuarios_autenticados.limpar(instance.pk)
+
+
+@receiver(post_save, sender=Colaborador)
+@receiver(post_delete, sender=Colaborador)
+def limpar_colaborador_autenticado(sender, instance, **kwargs):
+    usuarios_autenticados.limpar(instance.usuario_id)
+
+
+@receiver(post_save, sender=Equipe)
+@receiver(post_delete, sender=Equipe)
+def limpar_lideres_autenticados(sender, instance, **kwargs):
+    # O nome da equipe vai junto com os membros e o líder muda as equipes_lideradas: limpa tudo
+    usuarios_autenticados.limpar()
@@ -0,0 +1,375 @@
+# reune_app/usuarios/tests.py
+
+import io
+import json
+import os
+import tempfile
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from avaliacoes.models import CicloAvaliacao, Competencia, RespostaAvaliacao, ResumoAvaliacao
+from busca.indice import Tipo
+from busca.models import DocumentoBusca
+from feedback.models import Feedback
+from okr.models import CheckIn, ResultadoChave
+from .autenticacao import JWTAutenticacaoEmCache, usuarios_autenticados
+from .importacao import ErroImportacao, importar_colaboradores, ler_planilha
+from .models import Cargo, Colaborador, Equipe, HierarquiaEquipe
+from .visibilidade import CHAVE_VERSAO, ids_visiveis
+
+
+class RelatorioAvaliacaoTests(APITestCase):
+    """
+    Relatórios coletivos de avaliação: o da equipe só para os líderes dela (ou
+    de uma equipe acima) e o do ciclo inteiro só para administradores.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.diretor = User.objects.create(username='diretor')
+        cls.lider = User.objects.create(username='lider')
+        cls.membro = User.objects.create(username='membro')
+        cls.admin = User.objects.create(username='admin', is_staff=True)
+        diretoria = Equipe.objects.create(nome='Diretoria', lider=cls.diretor)
+        cls.equipe = Equipe.objects.create(nome='Equipe', lider=cls.lider, equipe_pai=diretoria)
+        # O líder também é membro da equipe que lidera
+        for usuario in (cls.lider, cls.membro):
+            Colaborador.objects.create(usuario=usuario, equipe=cls.equipe, data_admissao=date(2023, 1, 1))
+
+        cls.ciclo = CicloAvaliacao.objects.create(titulo='Ciclo', data_inicio=date(2024, 1, 1), data_fim=date(2024, 6, 30))
+        competencia = Competencia.objects.create(nome='Comunicação', descricao='-')
+        for avaliado, avaliador in ((cls.membro, cls.lider), (cls.lider, cls.diretor)):
+            RespostaAvaliacao.objects.create(
+                ciclo=cls.ciclo, avaliado=avaliado, avaliador=avaliador, competencia=competencia, nota=4,
+                justificativa=f'Sobre {avaliado.username}',
+            )
+
+    def setUp(self):
+        # A visibilidade fica em cache e os IDs se repetem entre os testes
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def relatorio(self, usuario, url):
+        self.client.force_authenticate(usuario)
+        return self.client.get(url, {'ciclo_id': self.ciclo.pk})
+
+    def colaboradores(self, usuario, url):
+        response = self.relatorio(usuario, url)
+        self.assertEqual(response.status_code, 200)
+        return {item['colaborador_id']: item['comentarios'] for item in response.data['colaboradores']}
+
+    def test_relatorio_da_equipe_so_para_os_lideres(self):
+        url = f'/api/usuarios/equipes/{self.equipe.pk}/relatorio-avaliacao/'
+        self.assertEqual(self.relatorio(self.membro, url).status_code, 403)
+
+        # O líder não vê o próprio relatório; o líder da equipe acima vê os dois
+        self.assertEqual(self.colaboradores(self.lider, url), {self.membro.pk: ['Sobre membro']})
+        self.assertEqual(set(self.colaboradores(self.diretor, url)), {self.membro.pk, self.lider.pk})
+        self.assertEqual(set(self.colaboradores(self.admin, url)), {self.membro.pk, self.lider.pk})
+
+    def test_relatorio_do_ciclo_so_para_administradores(self):
+        url = '/api/usuarios/colaboradores/relatorio-avaliacao/'
+        for usuario in (self.membro, self.lider):
+            with self.subTest(usuario=usuario.username):
+                self.assertEqual(self.relatorio(usuario, url).status_code, 403)
+        self.assertEqual(set(self.colaboradores(self.admin, url)), {self.membro.pk, self.lider.pk})
+
+    def test_comentarios_ignoram_justificativas_vazias(self):
+        for nome, justificativa in (('Liderança', None), ('Entrega', '')):
+            RespostaAvaliacao.objects.create(
+                ciclo=self.ciclo, avaliado=self.membro, avaliador=self.lider, nota=3,
+                competencia=Competencia.objects.create(nome=nome, descricao='-'), justificativa=justificativa,
+            )
+        colaborador = Colaborador.objects.get(usuario=self.membro)
+        response = self.relatorio(self.admin, f'/api/usuarios/colaboradores/{colaborador.pk}/relatorio-avaliacao/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['comentarios'], ['Sobre membro'])
+        self.assertEqual(len(response.data['sumario']), 3)
+        url = f'/api/usuarios/equipes/{self.equipe.pk}/relatorio-avaliacao/'
+        self.assertEqual(self.colaboradores(self.lider, url), {self.membro.pk: ['Sobre membro']})
+
+
+# Como sai do sistema de RH: ponto e vírgula, cabeçalhos com acento e datas dd/mm/aaaa
+PLANILHA = """Usuário;E-mail;Nome;Sobrenome;Cargo;Equipe;Admissão
+ana;ana@empresa.com;Ana;Souza;Analista;Financeiro;01/02/2023
+bruno;bruno@empresa.com;Bruno;Lima;Gerente;Financeiro;2022-05-10
+;carla@empresa.com;Carla;;Analista;Vendas;15-03-2024
+"""
+
+
+class ImportacaoColaboradoresTests(TestCase):
+    """
+    Importação de colaboradores do RH (usuarios/importacao.py), pelo comando
+    importar_colaboradores e pela tela "Importar do RH" do admin.
+    """
+
+    def importar(self, conteudo, nome_arquivo='rh.csv'):
+        return importar_colaboradores(ler_planilha(io.BytesIO(conteudo.encode('utf-8-sig')), nome_arquivo))
+
+    def test_arquivo_valido(self):
+        resultado = self.importar(PLANILHA)
+        self.assertEqual(resultado, {'inseridos': 3, 'atualizados': 0, 'ignorados': 0, 'erros': []})
+
+        ana = Colaborador.objects.select_related('usuario', 'cargo', 'equipe').get(usuario__username='ana')
+        self.assertEqual((ana.usuario.email, ana.usuario.get_full_name()), ('ana@empresa.com', 'Ana Souza'))
+        self.assertEqual((ana.cargo.titulo, ana.equipe.nome, ana.data_admissao), ('Analista', 'Financeiro', date(2023, 2, 1)))
+        self.assertFalse(ana.usuario.has_usable_password())
+        # Sem username, o e-mail vira o login
+        self.assertEqual(Colaborador.objects.get(usuario__username='carla@empresa.com').data_admissao, date(2024, 3, 15))
+        self.assertEqual(sorted(Cargo.objects.values_list('titulo', flat=True)), ['Analista', 'Gerente'])
+        # As equipes criadas entram na hierarquia (bulk_create não dispara signals)
+        for equipe in Equipe.objects.all():
+            self.assertTrue(HierarquiaEquipe.objects.filter(ancestral=equipe, descendente=equipe, profundidade=0).exists())
+
+    def test_linhas_invalidas_e_repetidas(self):
+        existente = Equipe.objects.create(nome='Financeiro')
+        User.objects.create(username='dora', email='dora@empresa.com')
+        resultado = self.importar("""username;email;equipe;data_admissao
+;;Financeiro;01/01/2023
+eva;;Financeiro;31/02/2023
+fabio;;Financeiro;
+ana;;Vendas;01/01/2023
+Ana;;Financeiro;01/02/2023
+;dora@empresa.com;Financeiro;01/03/2023
+""")
+        self.assertEqual(sorted(numero for numero, _ in resultado['erros']), [2, 3, 4])
+        erros = dict(resultado['erros'])
+        self.assertIn('username ou e-mail', erros[2])
+        self.assertIn('data inválida', erros[3])
+        self.assertIn('data de admissão obrigatória', erros[4])
+        self.assertFalse(User.objects.filter(username__in=['eva', 'fabio']).exists())
+
+        # "ana" e "Ana" são a mesma pessoa: vale a última linha
+        self.assertEqual((resultado['inseridos'], resultado['ignorados']), (2, 4))
+        self.assertEqual(list(User.objects.filter(username__iexact='ana').values_list('username', flat=True)), ['Ana'])
+        # A equipe que já existe é reaproveitada; dora foi encontrada pelo e-mail
+        self.assertEqual(Equipe.objects.count(), 1)
+        self.assertEqual(
+            set(Colaborador.objects.values_list('usuario__username', 'equipe_id')), {('Ana', existente.pk), ('dora', existente.pk)}
+        )
+
+    def test_reimportar_nao_muda_nada(self):
+        self.importar(PLANILHA)
+        usuarios = list(User.objects.order_by('pk').values())
+        colaboradores = list(Colaborador.objects.order_by('pk').values())
+
+        self.assertEqual(self.importar(PLANILHA), {'inseridos': 0, 'atualizados': 0, 'ignorados': 3, 'erros': []})
+        self.assertEqual(list(User.objects.order_by('pk').values()), usuarios)
+        self.assertEqual(list(Colaborador.objects.order_by('pk').values()), colaboradores)
+        self.assertEqual((Cargo.objects.count(), Equipe.objects.count()), (2, 2))
+
+        # Uma mudança só atualiza a linha dela; colunas vazias não apagam nada
+        resultado = self.importar("username;cargo;equipe;nome\nana;Gerente;;\n")
+        self.assertEqual((resultado['inseridos'], resultado['atualizados']), (0, 1))
+        ana = Colaborador.objects.select_related('usuario', 'cargo', 'equipe').get(usuario__username='ana')
+        self.assertEqual((ana.cargo.titulo, ana.equipe.nome, ana.usuario.first_name), ('Gerente', 'Financeiro', 'Ana'))
+
+    def test_email_com_maiusculas_encontra_o_usuario(self):
+        joao = User.objects.create(username='joao', email='Joao@Empresa.com')
+        resultado = self.importar("email;nome;equipe;data_admissao\nJOAO@empresa.com;João;Vendas;01/01/2023\n")
+        self.assertEqual((resultado['inseridos'], resultado['erros']), (1, []))
+        self.assertEqual(list(User.objects.values_list('pk', flat=True)), [joao.pk])
+        joao.refresh_from_db()
+        self.assertEqual((joao.email, joao.first_name, joao.colaborador.equipe.nome), ('Joao@Empresa.com', 'João', 'Vendas'))
+
+    def test_limpa_o_cache_de_usuarios_autenticados(self):
+        # O cache local sobrevive entre os testes, mas as pks do banco se repetem
+        usuarios_autenticados.limpar()
+        ana = User.objects.create(username='ana')
+        Colaborador.objects.create(usuario=ana, equipe=Equipe.objects.create(nome='Antiga'), data_admissao=date(2023, 1, 1))
+        autenticacao, token = JWTAutenticacaoEmCache(), AccessToken.for_user(ana)
+        self.assertEqual(autenticacao.get_user(token).colaborador.equipe.nome, 'Antiga')
+
+        # bulk_update não dispara os signals que limpariam o cache
+        self.importar(PLANILHA)
+        self.assertEqual(autenticacao.get_user(token).colaborador.equipe.nome, 'Financeiro')
+
+    def test_arquivo_sem_coluna_de_usuario(self):
+        with self.assertRaisesMessage(ErroImportacao, "coluna 'username' ou 'email'"):
+            self.importar("nome;equipe\nAna;Financeiro\n")
+
+    def test_comando(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8', delete=False) as arquivo:
+            arquivo.write(PLANILHA)
+        self.addCleanup(os.remove, arquivo.name)
+
+        saida = io.StringIO()
+        call_command('importar_colaboradores', arquivo.name, simular=True, stdout=saida)
+        self.assertIn('[simulação] 3 inseridos', saida.getvalue())
+        self.assertFalse(User.objects.exists())
+
+        saida = io.StringIO()
+        call_command('importar_colaboradores', arquivo.name, batch_size=2, stdout=saida)
+        self.assertIn('3 inseridos, 0 atualizados, 0 ignorados', saida.getvalue())
+        self.assertEqual(Colaborador.objects.count(), 3)
+
+        with self.assertRaisesMessage(CommandError, 'Arquivo não encontrado'):
+            call_command('importar_colaboradores', arquivo.name + '.inexistente')
+
+    def test_importacao_pelo_admin(self):
+        url = reverse('admin:usuarios_colaborador_importar')
+        arquivo = SimpleUploadedFile('rh.csv', PLANILHA.encode('utf-8'), content_type='text/csv')
+
+        # Só quem pode incluir e alterar colaboradores no admin
+        self.client.force_login(User.objects.create(username='comum', is_staff=True))
+        self.assertEqual(self.client.post(url, {'arquivo': arquivo}).status_code, 403)
+        self.assertFalse(Colaborador.objects.exists())
+
+        self.client.force_login(User.objects.create(username='admin', is_staff=True, is_superuser=True))
+        arquivo.seek(0)
+        response = self.client.post(url, {'arquivo': arquivo}, follow=True)
+        self.assertRedirects(response, reverse('admin:usuarios_colaborador_changelist'))
+        self.assertIn('3 inseridos, 0 atualizados, 0 ignorados.', [str(mensagem) for mensagem in response.context['messages']])
+        self.assertEqual(Colaborador.objects.count(), 3)
+
+
+class ComandosBaseSinteticaTests(TestCase):
+    """
+    Smoke tests dos comandos seed_reune e benchmark_endpoints com bases pequenas.
+    """
+
+    def test_seed_reune(self):
+        opcoes = {'colaboradores': 10, 'equipes': 3, 'ciclos': 1, 'dias_humor': 3, 'stdout': io.StringIO()}
+        call_command('seed_reune', **opcoes)
+        # Rodar de novo com --limpar troca os dados em vez de duplicá-los
+        call_command('seed_reune', limpar=True, **opcoes)
+
+        self.assertEqual((User.objects.count(), Colaborador.objects.count(), Equipe.objects.count()), (10, 10, 3))
+        # A raiz e as duas subequipes: 3 linhas de profundidade 0 e 2 de profundidade 1
+        self.assertEqual(
+            sorted(HierarquiaEquipe.objects.values_list('profundidade', flat=True)), [0, 0, 0, 1, 1]
+        )
+        self.assertEqual(Equipe.objects.filter(lider__isnull=True).count(), 0)
+        # As tabelas derivadas saem reconstruídas a partir do que foi gerado
+        self.assertEqual(
+            ResumoAvaliacao.objects.aggregate(total=Sum('quantidade'))['total'], RespostaAvaliacao.objects.count()
+        )
+        self.assertEqual(ResultadoChave.objects.aggregate(total=Sum('num_checkins'))['total'], CheckIn.objects.count())
+        self.assertEqual(DocumentoBusca.objects.filter(tipo=Tipo.FEEDBACK).count(), Feedback.objects.count())
+
+    def test_benchmark_endpoints(self):
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as arquivo:
+            pass
+        self.addCleanup(os.remove, arquivo.name)
+        call_command(
+            'benchmark_endpoints', tamanhos='8', repeticoes=1, saida=arquivo.name, stdout=io.StringIO(), stderr=io.StringIO()
+        )
+        with open(arquivo.name, encoding='utf-8') as saida:
+            resultado = json.load(saida)
+
+        medicoes = resultado['tamanhos']['8']
+        self.assertEqual(resultado['endpoints_com_erro'], [])
+        # O detalhe usa um registro que o usuário do benchmark pode abrir (politica_linhas)
+        self.assertEqual(medicoes['respostaavaliacao-detail']['status'], 200)
+        for nome, medicao in medicoes.items():
+            with self.subTest(endpoint=nome):
+                self.assertTrue(medicao['valido'])
+                self.assertLessEqual(medicao['p50_ms'], medicao['p95_ms'])
+
+
+class HierarquiaEquipeTests(APITestCase):
+    """
+    Tabela de fechamento das equipes (usuarios/hierarquia.py) mantida pelos
+    signals: mover e apagar equipes, ciclos recusados, o comando de
+    reconstrução e o cache de visibilidade.
+    """
+
+    def setUp(self):
+        # A visibilidade fica em cache e os IDs se repetem entre os testes
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # diretoria > vendas > sul > porto_alegre; suporte fica à parte
+        self.diretoria = Equipe.objects.create(nome='Diretoria')
+        self.vendas = Equipe.objects.create(nome='Vendas', equipe_pai=self.diretoria)
+        self.sul = Equipe.objects.create(nome='Sul', equipe_pai=self.vendas)
+        self.porto_alegre = Equipe.objects.create(nome='Porto Alegre', equipe_pai=self.sul)
+        self.suporte = Equipe.objects.create(nome='Suporte')
+
+    def ancestrais(self, equipe):
+        return dict(HierarquiaEquipe.objects.filter(descendente=equipe).values_list('ancestral__nome', 'profundidade'))
+
+    def fechamento(self):
+        return set(HierarquiaEquipe.objects.values_list('ancestral_id', 'descendente_id', 'profundidade'))
+
+    def assertIgualAoReconstruido(self):
+        incremental = self.fechamento()
+        call_command('reconstruir_hierarquia_equipes', stdout=io.StringIO())
+        self.assertEqual(self.fechamento(), incremental)
+
+    def test_criar_equipes(self):
+        self.assertEqual(self.ancestrais(self.porto_alegre), {'Porto Alegre': 0, 'Sul': 1, 'Vendas': 2, 'Diretoria': 3})
+        self.assertIgualAoReconstruido()
+
+    def test_mover_subarvore(self):
+        self.vendas.equipe_pai = self.suporte
+        self.vendas.save()
+        self.assertEqual(self.ancestrais(self.porto_alegre), {'Porto Alegre': 0, 'Sul': 1, 'Vendas': 2, 'Suporte': 3})
+        self.assertEqual(self.ancestrais(self.sul), {'Sul': 0, 'Vendas': 1, 'Suporte': 2})
+        self.assertEqual(set(HierarquiaEquipe.objects.filter(ancestral=self.diretoria).values_list('descendente_id', flat=True)),
+                         {self.diretoria.pk})
+        self.assertIgualAoReconstruido()
+
+        # Virar raiz separa a subárvore de todos os ancestrais
+        self.sul.equipe_pai = None
+        self.sul.save()
+        self.assertEqual(self.ancestrais(self.porto_alegre), {'Porto Alegre': 0, 'Sul': 1})
+        self.assertIgualAoReconstruido()
+
+    def test_ciclo_recusado(self):
+        antes = self.fechamento()
+        for nova_superior in (self.porto_alegre, self.vendas):
+            with self.subTest(nova_superior=nova_superior.nome):
+                self.vendas.equipe_pai = nova_superior
+                with self.assertRaises(ValidationError):
+                    self.vendas.full_clean()
+                with self.assertRaises(ValueError), transaction.atomic():
+                    self.vendas.save()
+                self.assertEqual(self.fechamento(), antes)
+        self.vendas.refresh_from_db()
+        self.assertEqual(self.vendas.equipe_pai, self.diretoria)
+
+        self.client.force_authenticate(User.objects.create(username='admin', is_staff=True))
+        response = self.client.patch(f'/api/usuarios/equipes/{self.vendas.pk}/', {'equipe_pai': self.sul.pk}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('equipe_pai', response.data)
+        self.assertEqual(self.fechamento(), antes)
+
+    def test_apagar_equipe_do_meio(self):
+        self.vendas.delete()
+        self.sul.refresh_from_db()
+        self.assertIsNone(self.sul.equipe_pai)
+        self.assertEqual(self.ancestrais(self.porto_alegre), {'Porto Alegre': 0, 'Sul': 1})
+        self.assertEqual(self.ancestrais(self.diretoria), {'Diretoria': 0})
+        self.assertIgualAoReconstruido()
+
+    def test_mudancas_invalidam_a_visibilidade(self):
+        lider, membro = User.objects.create(username='lider'), User.objects.create(username='membro')
+        self.diretoria.lider = lider
+        self.diretoria.save()
+        Colaborador.objects.create(usuario=membro, equipe=self.porto_alegre, data_admissao=date(2023, 1, 1))
+        self.assertEqual(ids_visiveis(lider), {lider.pk, membro.pk})
+
+        # Mudar só o nome não troca a versão do cache
+        versao = cache.get(CHAVE_VERSAO)
+        self.sul.nome = 'Região Sul'
+        self.sul.save()
+        self.assertEqual(cache.get(CHAVE_VERSAO), versao)
+
+        self.vendas.equipe_pai = self.suporte
+        self.vendas.save()
+        self.assertEqual(ids_visiveis(lider), {lider.pk})
+
+        self.suporte.lider = lider
+        self.suporte.save()
+        self.assertEqual(ids_visiveis(lider), {lider.pk, membro.pk})
@@ -1,33 +1,143 @@
 # reune_app/usuarios/views.py
 
-from rest_framework import viewsets, status
+from rest_framework import permissions, viewsets, status
 from rest_framework.decorators import action # <-- IMPORTE O 'action'
 from rest_framework.response import Response # <-- IMPORTE O 'Response'
 from .models import Colaborador, Cargo, Equipe
 from .serializers import ColaboradorSerializer, CargoSerializer, EquipeSerializer
+from .visibilidade import filtro_visiveis, lidera_equipe
+from django.contrib.auth.models import User
+from reune.mixins import MedicaoConsultasMixin, QuerysetOtimizadoMixin, RespostaCondicionalMixin, RespostaEmCacheMixin
 # Importando modelos de outros apps que vamos precisar
-from avaliacoes.models import CicloAvaliacao, RespostaAvaliacao
-from django.db.models import Avg
+from avaliacoes.models import CicloAvaliacao, RespostaAvaliacao, ResumoAvaliacao
 
-class CargoViewSet(viewsets.ModelViewSet):
+
+def gerar_relatorio_coletivo(ciclo, *filtros, **filtro_avaliado):
+    """
+    Monta o relatório de avaliação de vários colaboradores de uma vez.
+    `filtros` (Qs) e `filtro_avaliado` restringem os avaliados
+    (ex: avaliado__colaborador__equipe=equipe).
+
+    São sempre duas consultas, não importa o tamanho do grupo: uma sobre o
+    ResumoAvaliacao (médias por colaborador e competência, já com os nomes via
+    JOIN) e outra para os comentários. Os dados são agrupados em Python.
+    """
+    resumos = ResumoAvaliacao.objects.filter(
+        *filtros, ciclo=ciclo, quantidade__gt=0, **filtro_avaliado
+    ).values(
+        'avaliado_id', 'avaliado__username', 'avaliado__first_name', 'avaliado__last_name',
+        'competencia__nome', 'quantidade', 'soma_notas'
+    ).order_by('avaliado__first_name', 'avaliado__last_name', 'avaliado_id', 'competencia__nome')
+
+    comentarios = RespostaAvaliacao.objects.filter(
+        *filtros, ciclo=ciclo, **filtro_avaliado
+    ).exclude(justificativa__isnull=True).exclude(justificativa__exact='').values_list(
+        'avaliado_id', 'justificativa'
+    ).order_by('avaliado_id', 'id')
+
+    colaboradores = {}
+    for item in resumos:
+        dados = colaboradores.setdefault(item['avaliado_id'], {
+            'colaborador_id': item['avaliado_id'],
+            'colaborador': f"{item['avaliado__first_name']} {item['avaliado__last_name']}".strip() or item['avaliado__username'],
+            'sumario': [],
+            'comentarios': [],
+        })
+        dados['sumario'].append({
+            'competencia': item['competencia__nome'],
+            'media_notas': round(item['soma_notas'] / item['quantidade'], 2),
+        })
+
+    for avaliado_id, justificativa in comentarios:
+        if avaliado_id in colaboradores:
+            colaboradores[avaliado_id]['comentarios'].append(justificativa)
+
+    return {
+        'ciclo_avaliacao': ciclo.titulo,
+        'colaboradores': list(colaboradores.values()),
+    }
+
+
+def buscar_ciclo(request):
+    """
+    Lê o parâmetro obrigatório 'ciclo_id'. Retorna (ciclo, None) ou (None, Response de erro).
+    """
+    ciclo_id = request.query_params.get('ciclo_id', None)
+    if not ciclo_id:
+        return None, Response(
+            {"error": "O parâmetro 'ciclo_id' é obrigatório."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        return CicloAvaliacao.objects.get(pk=ciclo_id), None
+    except (CicloAvaliacao.DoesNotExist, ValueError):
+        return None, Response(
+            {"error": f"Ciclo de avaliação com id={ciclo_id} não encontrado."},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+class CargoViewSet(MedicaoConsultasMixin, RespostaCondicionalMixin, RespostaEmCacheMixin, QuerysetOtimizadoMixin, viewsets.ModelViewSet):
     """
     API endpoint que permite que cargos sejam visualizados ou editados.
     """
     queryset = Cargo.objects.all().order_by('titulo')
     serializer_class = CargoSerializer
+    ordering = ('titulo', 'id')
     # Futuramente, adicionaremos permissões aqui
 
-class EquipeViewSet(viewsets.ModelViewSet):
+class EquipeViewSet(MedicaoConsultasMixin, RespostaCondicionalMixin, RespostaEmCacheMixin, QuerysetOtimizadoMixin, viewsets.ModelViewSet):
     """
     API endpoint que permite que equipes sejam visualizadas ou editadas.
     """
     queryset = Equipe.objects.all().order_by('nome')
     serializer_class = EquipeSerializer
+    ordering = ('nome', 'id')
     # Futuramente, adicionaremos permissões aqui
 
-class ColaboradorViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'], url_path='relatorio-avaliacao')
+    def relatorio_avaliacao(self, request, pk=None):
+        """
+        Relatório de avaliação de todos os membros de uma equipe em um ciclo.
+        Exemplo de URL: /api/usuarios/equipes/3/relatorio-avaliacao/?ciclo_id=2
+
+        Só para os líderes da equipe ou de uma equipe acima dela (e para
+        administradores). Como nas respostas de avaliação, o líder não vê o
+        próprio relatório, mesmo sendo membro da equipe.
+        """
+        equipe = self.get_object()
+        if not request.user.is_staff and not lidera_equipe(request.user, equipe.pk):
+            return Response(
+                {"error": "Apenas os líderes desta equipe ou de uma equipe acima dela podem ver o relatório."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        ciclo, erro = buscar_ciclo(request)
+        if erro:
+            return erro
+
+        filtros = () if request.user.is_staff else (filtro_visiveis(request.user, 'avaliado', incluir_proprio=False),)
+        dados_relatorio = gerar_relatorio_coletivo(ciclo, *filtros, avaliado__colaborador__equipe=equipe)
+        dados_relatorio['equipe'] = equipe.nome
+        return Response(dados_relatorio)
+
+class ColaboradorViewSet(MedicaoConsultasMixin, RespostaCondicionalMixin, QuerysetOtimizadoMixin, viewsets.ModelViewSet):
     queryset = Colaborador.objects.select_related('usuario', 'cargo', 'equipe').all()
     serializer_class = ColaboradorSerializer
+    ordering = ('usuario__first_name', 'usuario__last_name', 'usuario_id')
+    modelos_validador = (Colaborador, User, Cargo, Equipe)
+
+    @action(detail=False, methods=['get'], url_path='relatorio-avaliacao',
+            permission_classes=[permissions.IsAdminUser])
+    def relatorio_avaliacao_ciclo(self, request):
+        """
+        Relatório de avaliação de todos os colaboradores avaliados em um ciclo.
+        Exemplo de URL: /api/usuarios/colaboradores/relatorio-avaliacao/?ciclo_id=2
+        Só administradores (is_staff) podem ver o ciclo inteiro.
+        """
+        ciclo, erro = buscar_ciclo(request)
+        if erro:
+            return erro
+
+        return Response(gerar_relatorio_coletivo(ciclo))
 
     @action(detail=True, methods=['get'], url_path='relatorio-avaliacao')
     def relatorio_avaliacao(self, request, pk=None):
@@ -50,23 +160,28 @@ class ColaboradorViewSet(viewsets.ModelViewSet):
             
         try:
             ciclo = CicloAvaliacao.objects.get(pk=ciclo_id)
-            # 3. Filtra todas as respostas de avaliação para este colaborador neste ciclo
-            respostas = RespostaAvaliacao.objects.filter(
-                avaliado=colaborador.usuario,
-                ciclo=ciclo
+            # 3. Lê o resumo já agregado (contagem e soma das notas por competência),
+            # mantido pelos signals de RespostaAvaliacao. O custo não cresce com o
+            # número de avaliadores.
+            sumario_competencias = list(
+                ResumoAvaliacao.objects.filter(
+                    avaliado=colaborador.usuario,
+                    ciclo=ciclo,
+                    quantidade__gt=0
+                ).values('competencia__nome', 'quantidade', 'soma_notas').order_by('competencia__nome')
             )
 
-            if not respostas.exists():
+            if not sumario_competencias:
                 return Response(
                     {"message": "Nenhuma avaliação encontrada para este colaborador neste ciclo."},
                     status=status.HTTP_404_NOT_FOUND
                 )
 
-            # 4. Agrupa as respostas por competência para calcular as médias
-            # O .values() agrupa, o .annotate() calcula a média para cada grupo
-            sumario_competencias = respostas.values('competencia__nome').annotate(
-                media_notas=Avg('nota')
-            ).order_by('competencia__nome')
+            # 4. As respostas só são lidas para os comentários escritos
+            respostas = RespostaAvaliacao.objects.filter(
+                avaliado=colaborador.usuario,
+                ciclo=ciclo
+            )
 
             # 5. Monta a resposta final em um formato legível
             dados_relatorio = {
@@ -75,10 +190,10 @@ class ColaboradorViewSet(viewsets.ModelViewSet):
                 'sumario': [
                     {
                         'competencia': item['competencia__nome'],
-                        'media_notas': round(item['media_notas'], 2)
+                        'media_notas': round(item['soma_notas'] / item['quantidade'], 2)
                     } for item in sumario_competencias
                 ],
-                'comentarios': list(respostas.exclude(justificativa__exact='')
+                'comentarios': list(respostas.exclude(justificativa__isnull=True).exclude(justificativa__exact='')
                                               .values_list('justificativa', flat=True))
             }
             
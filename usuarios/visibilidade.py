@@ -0,0 +1,115 @@
+# reune_app/usuarios/visibilidade.py
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Colaborador, Equipe, HierarquiaEquipe
+
+CHAVE_VERSAO = 'visibilidade:versao'
+TEMPO_CACHE = 60 * 10
+# Acima disso a lista de IDs vira uma subquery (o SQL Server aceita ~2100 parâmetros)
+LIMITE_IDS_LITERAIS = 1000
+
+
+def invalidar_visibilidade():
+    """
+    Invalida o conjunto visível de todos os usuários de uma vez, trocando a
+    versão que faz parte da chave do cache. Chamado pelos signals sempre que
+    muda a equipe de um colaborador, o líder ou a equipe superior de uma equipe.
+    """
+    try:
+        cache.incr(CHAVE_VERSAO)
+    except ValueError:
+        cache.set(CHAVE_VERSAO, 1, None)
+
+
+def _chave(usuario_id):
+    versao = cache.get_or_set(CHAVE_VERSAO, 1, None)
+    return f'visibilidade:{versao}:{usuario_id}'
+
+
+def membros_visiveis(usuario_id):
+    """
+    Subquery com os IDs dos colaboradores das equipes lideradas pelo usuário
+    e de todas as suas subequipes, em qualquer nível (via HierarquiaEquipe).
+    """
+    return Colaborador.objects.filter(
+        equipe__ancestrais_hierarquia__ancestral__lider_id=usuario_id
+    ).values('usuario_id')
+
+
+def ids_visiveis(usuario):
+    """
+    Conjunto (em cache) dos IDs de usuários cujos objetivos `usuario` pode ver:
+    ele mesmo e os membros das equipes que lidera, incluindo as subequipes.
+    """
+    if not usuario.is_authenticated:
+        return frozenset()
+    chave = _chave(usuario.pk)
+    ids = cache.get(chave)
+    if ids is None:
+        ids = frozenset(membros_visiveis(usuario.pk).values_list('usuario_id', flat=True)) | {usuario.pk}
+        cache.set(chave, ids, TEMPO_CACHE)
+    return ids
+
+
+def lidera_equipe(usuario, equipe_id):
+    """
+    Se o usuário lidera a equipe ou alguma equipe acima dela, em uma consulta.
+    """
+    return HierarquiaEquipe.objects.filter(descendente_id=equipe_id, ancestral__lider_id=usuario.pk).exists()
+
+
+def ve_equipe(usuario, equipe_id):
+    """
+    Se o usuário é membro da equipe ou lidera ela ou alguma equipe acima dela,
+    em uma consulta.
+    """
+    return Equipe.objects.filter(pk=equipe_id).filter(
+        Q(membros__usuario_id=usuario.pk) | Q(ancestrais_hierarquia__ancestral__lider_id=usuario.pk)
+    ).exists()
+
+
+def usuarios_que_veem(usuario_id):
+    """
+    O inverso de ids_visiveis(): o próprio usuário e os líderes da equipe dele
+    e de todas as equipes acima, em uma consulta. Usado para decidir quem
+    recebe os eventos (ver reune/eventos.py) sobre os dados de `usuario_id`.
+    """
+    lideres = HierarquiaEquipe.objects.filter(
+        descendente__membros__usuario_id=usuario_id, ancestral__lider__isnull=False
+    ).values_list('ancestral__lider_id', flat=True)
+    return {usuario_id, *lideres}
+
+
+def filtro_visiveis(usuario, campo='responsavel', incluir_proprio=True):
+    """
+    Q dos registros cujo `campo` (um FK para User) é visível para o usuário,
+    como um único "campo_id IN (...)". Sem `incluir_proprio`, só os dos
+    membros das equipes que ele lidera. Se não houver nenhum, o Q não casa
+    com nada (e o ORM nem chega a consultar o banco).
+    """
+    ids = ids_visiveis(usuario)
+    if not incluir_proprio:
+        ids = ids - {usuario.pk}
+    if not ids:
+        return Q(pk__in=[])
+    if len(ids) == 1:
+        return Q(**{f'{campo}_id': next(iter(ids))})
+    if len(ids) <= LIMITE_IDS_LITERAIS:
+        return Q(**{f'{campo}_id__in': sorted(ids)})
+    liderados = Q(**{f'{campo}_id__in': membros_visiveis(usuario.pk)})
+    if incluir_proprio:
+        return Q(**{f'{campo}_id': usuario.pk}) | liderados
+    # O líder também pode ser membro de uma das equipes que lidera
+    return liderados & ~Q(**{f'{campo}_id': usuario.pk})
+
+
+def filtrar_visiveis(queryset, usuario, campo='responsavel'):
+    """
+    Restringe o queryset aos registros cujo `campo` (um FK para User) é visível
+    para o usuário (ver filtro_visiveis()).
+    """
+    if not usuario.is_authenticated:
+        return queryset.none()
+    return queryset.filter(filtro_visiveis(usuario, campo))